@@ -11,14 +11,57 @@ import re
 import calendar
 from pathlib import Path
 from datetime import datetime
-from github import Github
-from github import Auth
+import openpyxl
 from openpyxl.styles import Font, PatternFill, Border, Side, Alignment
+from pandas.io.parsers import TextParser
 from st_aggrid import AgGrid, GridOptionsBuilder
 from st_aggrid import JsCode
 import time
 from st_aggrid import GridUpdateMode
 import uuid
+import hashlib
+import threading
+import tempfile
+from collections import namedtuple
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+# Parser / pembaca file yang juga dijalankan worker process pool ada di
+# modul terpisah (tanpa streamlit) → worker tidak menjalankan skrip ini
+from ikpa_workers import (
+    DIGIPAY_COLUMNS,
+    DIGIPAY_UNIQUE_KEY,
+    PARQUET_AVAILABLE,
+    SATKER_ID,
+    SATKER_ID_UNKNOWN,
+    VALID_MONTHS,
+    compile_reference_index,
+    configure_workers,
+    copy_on_write_active,
+    cow_copy,
+    create_satker_column,
+    digipay_sheet_frame,
+    excel_cell_value,
+    excel_engine,
+    git_blob_sha,
+    iter_excel_chunks,
+    map_reference_short_names,
+    normalize_kode_satker,
+    normalize_kode_satker_series,
+    parse_pool_context,
+    prepare_ikpa_upload,
+    read_table_bytes,
+    read_workbook,
+    satker_id_series,
+    satker_ids,
+    sidecar_files,
+    sidecar_name,
+    to_parquet_bytes,
+    without_satker_id,
+)
 
 
 st.markdown("""
@@ -65,12 +108,10 @@ def add_notification(msg):
 
 
 def render_table_pin_satker(df):
-    df = df.copy()
-
     if "__rowNum__" in df.columns:
         df = df.drop(columns="__rowNum__")
 
-    df = df.loc[:, ~df.columns.duplicated()].copy()
+    df = df.loc[:, ~df.columns.duplicated()]
     df.insert(0, "__rowNum__", range(1, len(df) + 1))
 
     def calc_grid_height(df, row_height=45, header_height=40, max_height=600):
@@ -722,16 +763,207 @@ MONTH_ORDER = {
 TEMPLATE_PATH = r"C:\Users\KEMENKEU\Desktop\INDIKATOR PELAKSANAAN ANGGARAN.xlsx"
 
 
-# Normalize kode satker
-def normalize_kode_satker(k, width=6):
-    if pd.isna(k):
-        return ''
-    s = str(k).strip()
-    digits = re.findall(r'\d+', s)
-    if not digits:
-        return ''
-    kod = digits[0].zfill(width)
-    return kod
+# ================================
+# KUNCI INTEGER SATKER (satker_id)
+# ================================
+# Kode satker 6 digit → int32. Kunci diturunkan dari kode (bukan nomor urut)
+# sehingga tetap sama walau referensi / DIPA dimuat ulang atau belakangan;
+# tiap dataset cukup diberi satker_id sekali saat dipublish, join berikutnya
+# cukup lookup integer (tanpa normalisasi + hash teks kode lagi).
+# SATKER_ID / satker_id_series / satker_ids: ikpa_workers.
+
+# dataset fakta → kandidat kolom kode satker (satker_id ditempel saat publish)
+SATKER_KEYED_DATASETS = {
+    "data_storage": ("Kode Satker",),
+    "DATA_DIPA_by_year": ("Kode Satker",),
+    "kkp_master": ("Kode Satker",),
+    "digipay_master": ("KDSATKER", "Kode Satker"),
+    "cms_master": ("KODE SATKER", "Kode Satker"),
+}
+
+
+def attach_satker_id(df, kode_cols=("Kode Satker",)):
+    """Salinan df + kolom satker_id (int32); df yang sudah punya dikembalikan apa adanya."""
+    if not isinstance(df, pd.DataFrame):
+        return df
+    if SATKER_ID in df.columns and df[SATKER_ID].dtype == "int32":
+        return df
+
+    kode_col = next((c for c in kode_cols if c in df.columns), None)
+    if kode_col is None:
+        return df
+    return df.assign(**{SATKER_ID: satker_id_series(df[kode_col]).to_numpy()})
+
+
+def with_satker_ids(name, value):
+    """Tempel satker_id pada dataset fakta `name` (DataFrame atau dict DataFrame)."""
+    kode_cols = SATKER_KEYED_DATASETS.get(name)
+    if kode_cols is None:
+        return value
+    if isinstance(value, dict):
+        return {key: attach_satker_id(df, kode_cols) for key, df in value.items()}
+    return attach_satker_id(value, kode_cols)
+
+
+def satker_lookup(ids, key_ids, values):
+    """
+    Left join integer: nilai `values` (sejajar `key_ids`) untuk tiap satker_id
+    di `ids`. Kunci ganda → baris pertama; tidak ketemu / -1 → NaN.
+    """
+    key_ids = np.asarray(key_ids)
+    values = pd.Series(np.asarray(values))
+
+    keep = (key_ids != SATKER_ID_UNKNOWN) & ~pd.Index(key_ids).duplicated()
+    index = pd.Index(key_ids[keep])
+    values = values[keep].reset_index(drop=True)
+
+    # posisi -1 tidak ada di RangeIndex → NaN
+    return values.reindex(index.get_indexer(np.asarray(ids))).to_numpy()
+
+
+
+# ================================
+# SKEMA RINGKAS PERIODE IKPA (data_storage)
+# ================================
+# Tiap periode disimpan sekali di store bersama dalam bentuk ringkas:
+# - teks berulang (nama, kode, bulan, BA, sumber) → categorical
+# - Tahun angka → int16; bilangan bulat lain di-downcast
+# - float → float32 bila kembali persis setelah dibulatkan IKPA_DECIMALS
+# - kolom turunan (Satker, Period, ...) dibuang bila sama persis dengan
+#   hasil hitung ulang; dibentuk lagi oleh expand_ikpa_period saat render.
+# Dtype & urutan kolom asli disimpan di df.attrs → expand kembali persis.
+IKPA_SCHEMA_ATTR = "ikpa_schema"
+IKPA_DERIVED_COLUMNS = ["Uraian Satker Final", "Satker", "Period", "Period_Sort"]
+IKPA_CATEGORY_COLUMNS = [
+    "Kode KPPN", "Kode BA", "Kode Satker", "Uraian Satker", "Uraian Satker-RINGKAS",
+    "Bulan", "Source", "Jenis Satker",
+]
+
+
+def ikpa_display_columns(df):
+    """Kolom turunan periode IKPA, dihitung dari kolom dasar (dtype asli)."""
+    ringkas = df["Uraian Satker-RINGKAS"]
+    bulan = df["Bulan"].astype(str)
+    tahun = df["Tahun"].astype(str)
+    period = bulan + " " + tahun
+
+    # satu periode per frame → label Period_Sort dihitung per pasangan unik
+    labels = {
+        f"{b} {t}": f"{int(t):04d}-{MONTH_ORDER.get(b, 0):02d}"
+        for b, t in set(zip(bulan, tahun))
+    }
+
+    return {
+        "Uraian Satker Final": ringkas,
+        "Satker": ringkas.astype(str) + " (" + df["Kode Satker"].astype(str) + ")",
+        "Period": period,
+        "Period_Sort": period.map(labels),
+    }
+
+
+def _compact_column(s):
+    """Satu kolom → dtype ringkas, atau None bila tidak bisa tanpa kehilangan nilai."""
+    if s.name in IKPA_CATEGORY_COLUMNS and s.dtype == object:
+        return s.astype("category")
+
+    if s.name == "Tahun" and s.dtype == object:
+        tahun = pd.to_numeric(s, errors="coerce")
+        if tahun.notna().all() and tahun.between(0, np.iinfo(np.int16).max).all():
+            compact = tahun.astype("int16")
+            if compact.astype(str).astype(object).equals(s):
+                return compact
+        return s.astype("category")
+
+    if pd.api.types.is_integer_dtype(s) and s.name != SATKER_ID:
+        compact = pd.to_numeric(s, downcast="integer")
+        return compact if compact.dtype != s.dtype else None
+
+    if s.dtype == "float64":
+        compact = s.astype("float32")
+        restored = compact.astype("float64").round(IKPA_DECIMALS)
+        if np.array_equal(restored.to_numpy(), s.to_numpy(), equal_nan=True):
+            return compact
+
+    return None
+
+
+def compact_ikpa_period(df):
+    """
+    Periode IKPA → bentuk ringkas untuk disimpan (lihat komentar di atas).
+    Frame yang sudah ringkas dikembalikan apa adanya.
+    """
+    if not isinstance(df, pd.DataFrame) or IKPA_SCHEMA_ATTR in df.attrs:
+        return df
+    if not df.columns.is_unique:
+        return df
+
+    schema = tuple((col, str(df[col].dtype)) for col in df.columns)
+
+    drop = []
+    try:
+        derived = ikpa_display_columns(df)
+    except (KeyError, TypeError, ValueError):
+        derived = {}
+    for col, values in derived.items():
+        if col in df.columns and df[col].equals(values.rename(col)):
+            drop.append(col)
+
+    compact = {}
+    for col in df.columns:
+        if col not in drop:
+            s = _compact_column(df[col])
+            compact[col] = df[col] if s is None else s
+
+    out = pd.DataFrame(compact, index=df.index)
+    out.attrs[IKPA_SCHEMA_ATTR] = schema
+    return out
+
+
+def expand_ikpa_period(df):
+    """
+    Periode tersimpan → frame tampilan lengkap (dtype asli, kolom turunan
+    dihitung ulang di posisi aslinya). Selalu mengembalikan frame baru.
+    """
+    schema = df.attrs.get(IKPA_SCHEMA_ATTR)
+    if schema is None:
+        return cow_copy(df)
+
+    dtypes = dict(schema)
+    columns = {}
+    for col in df.columns:
+        s = df[col]
+        dtype = dtypes.get(col)
+        if dtype is None or str(s.dtype) == dtype:
+            columns[col] = s
+        elif dtype == "object" and pd.api.types.is_integer_dtype(s):
+            columns[col] = s.astype(str).astype(object)
+        elif dtype == "float64" and s.dtype == "float32":
+            columns[col] = s.astype("float64").round(IKPA_DECIMALS)
+        else:
+            columns[col] = s.astype(dtype)
+
+    # Copy-on-Write: kolom yang tidak berubah berbagi data dengan snapshot
+    out = pd.DataFrame(columns, index=df.index, copy=not copy_on_write_active())
+
+    derived = [col for col, _ in schema if col in IKPA_DERIVED_COLUMNS and col not in out.columns]
+    if derived:
+        values = ikpa_display_columns(out)
+        previous = None
+        for col, _ in schema:
+            if col in derived:
+                at = out.columns.get_loc(previous) + 1 if previous is not None else 0
+                out.insert(at, col, values[col])
+            if col in out.columns:
+                previous = col
+
+    return out
+
+
+def compact_dataset(name, value):
+    """Simpan periode dataset `name` dalam skema ringkas (saat ini: data_storage)."""
+    if name != "data_storage" or not isinstance(value, dict):
+        return value
+    return {key: compact_ikpa_period(df) for key, df in value.items()}
 
 
 @st.cache_data
@@ -749,14 +981,14 @@ def load_reference_satker():
             "Template_Data_Referensi.xlsx"
         )
 
-        ref = pd.read_excel(url, dtype=str)
+        ref = read_workbook(url, dtype=str)
 
         # ===============================
         # NORMALISASI WAJIB
         # ===============================
         ref["Kode Satker"] = (
             ref["Kode Satker"]
-            .apply(normalize_kode_satker)
+            .pipe(normalize_kode_satker_series)
             .astype(str)
             .str.strip()
         )
@@ -784,6 +1016,123 @@ def load_reference_satker():
         return pd.DataFrame(columns=["Kode Satker", "Uraian Satker-SINGKAT"])
 
 
+# ================================
+# DATASET STORE BERSAMA (SEMUA SESI)
+# ================================
+# Dataset besar disimpan SEKALI per proses sebagai snapshot read-only.
+# Sesi hanya memegang referensi ke snapshot (st.session_state.<nama>) +
+# state filter miliknya sendiri. Perubahan admin → publish versi baru
+# (salinan dict baru, snapshot lama tidak pernah diubah).
+class DatasetStore:
+    """Snapshot dataset versioned; publish = ganti snapshot secara atomik."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loading_locks = {}
+        self._derived = {}
+        self._state = (0, {})
+
+    def current(self):
+        """(versi, snapshot) — dibaca dalam 1 operasi sehingga selalu konsisten."""
+        return self._state
+
+    def publish(self, **datasets):
+        """
+        Publish dataset sebagai versi baru. Dataset fakta diberi satker_id dan
+        disimpan dalam skema ringkas DI SINI, sehingga semua jalur publish
+        (publish_datasets, update_dataset, job prefetch) ter-key sama.
+        """
+        datasets = {
+            name: compact_dataset(name, with_satker_ids(name, value))
+            for name, value in datasets.items()
+        }
+        with self._lock:
+            version, snapshot = self._state
+            new_snapshot = dict(snapshot)
+            new_snapshot.update(datasets)
+            self._state = (version + 1, new_snapshot)
+            return self._state
+
+    def update(self, name, fn):
+        """Read-modify-write dataset `name` terhadap versi TERBARU."""
+        with self._lock:
+            return self.publish(**{name: fn(self._state[1].get(name))})
+
+    def loading(self, name):
+        """Lock per dataset supaya loader yang sama tidak jalan dobel."""
+        with self._lock:
+            return self._loading_locks.setdefault(name, threading.Lock())
+
+    def derived(self, name, source, build):
+        """
+        build(source) dibangun sekali per objek `source` (snapshot dataset
+        bersifat read-only → objek baru = versi baru) dan dibagi ke semua sesi.
+        `source` boleh tuple beberapa snapshot (dibandingkan per elemen).
+        """
+        cached = self._derived.get(name)
+        if cached is not None and self._same_source(cached[0], source):
+            return cached[1]
+
+        with self.loading(f"derived:{name}"):
+            cached = self._derived.get(name)
+            if cached is None or not self._same_source(cached[0], source):
+                cached = (source, build(source))
+                self._derived[name] = cached
+
+        return cached[1]
+
+    @staticmethod
+    def _same_source(a, b):
+        if isinstance(a, tuple) and isinstance(b, tuple):
+            return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+        return a is b
+
+
+@st.cache_resource
+def get_dataset_store():
+    return DatasetStore()
+
+
+def attach_datasets():
+    """Arahkan session_state ke snapshot terbaru (hanya jika versi berubah)."""
+    version, snapshot = get_dataset_store().current()
+    if st.session_state.get("_dataset_version") == version:
+        return
+
+    for name, value in snapshot.items():
+        st.session_state[name] = value
+    st.session_state["_dataset_version"] = version
+
+
+def publish_datasets(**datasets):
+    """Ganti dataset secara utuh untuk semua sesi."""
+    get_dataset_store().publish(**datasets)
+    attach_datasets()
+
+
+def update_dataset(name, fn):
+    """Publish fn(nilai_terbaru) sebagai versi baru dataset `name`."""
+    get_dataset_store().update(name, fn)
+    attach_datasets()
+
+
+def update_dataset_items(name, set_items=None, remove=()):
+    """Publish salinan dataset dict `name` dengan key diganti / dihapus."""
+    def apply(current):
+        new = dict(current or {})
+        for key in remove:
+            new.pop(key, None)
+        new.update(set_items or {})
+        return new
+
+    update_dataset(name, apply)
+
+
+def dataset_loaded(name):
+    """True jika dataset `name` sudah pernah dipublish di proses ini."""
+    return name in get_dataset_store().current()[1]
+
+
 # ================================
 # INIT SESSION STATE 
 # ================================
@@ -809,6 +1158,9 @@ if "data_storage_kkp" not in st.session_state:
 if "data_storage_digipay" not in st.session_state:
     st.session_state.data_storage_digipay = {}
 
+# Dataset yang sudah dimuat proses ini (dibagi ke semua sesi)
+attach_datasets()
+
 # Log aktivitas
 if "activity_log" not in st.session_state:
     st.session_state.activity_log = []
@@ -825,12 +1177,6 @@ def log_activity(menu, action, detail=""):
     )
 
 
-# reference
-if "_reference_loaded" not in st.session_state:
-    st.session_state.reference_df = load_reference_satker()
-    st.session_state["_reference_loaded"] = True
-
-
 def clean_invalid_satker_rows(df):
     df = df.copy()
 
@@ -862,50 +1208,15 @@ def fix_missing_month(df):
     df["Bulan"] = df["Bulan"].astype(str).str.upper()
     return df
 
-def fix_dipa_header(df_raw):
-    """
-    Adapter kecil:
-    - Cari baris header DIPA
-    - Jadikan header
-    - Kembalikan df siap masuk standardize_dipa()
-    """
-    for i in range(min(10, len(df_raw))):
-        row = df_raw.iloc[i].astype(str).str.lower()
-        if row.str.contains("satker").any() and row.str.contains("pagu").any():
-            df = df_raw.iloc[i+1:].copy()
-            df.columns = df_raw.iloc[i]
-            return df.reset_index(drop=True)
-
-    # fallback → biar standardize_dipa yang handle
-    return df_raw
-
-# ============================================================
-# 🔍 DETEKSI FORMAT DIPA OMSPAN
-# ============================================================
-def is_omspan_dipa(df_raw):
-    cols = df_raw.astype(str).apply(lambda x: " ".join(x), axis=1).str.upper()
-    return (
-        cols.str.contains("OMSPAN").any() or
-        cols.str.contains("PAGU_RUPIAH").any() or
-        cols.str.contains("KODE_SATKER").any()
-    )
-
-
 # ============================================================
 # 🔄 ADAPTER DIPA OMSPAN → FORMAT DIPA STANDAR (FINAL)
 # ============================================================
 def adapt_dipa_omspan(df_raw):
-    df = df_raw.copy()
-
-    # 🔹 cari header otomatis
-    for i in range(15):
-        row = " ".join(df.iloc[i].astype(str).str.upper())
-        if "SATKER" in row and "PAGU" in row:
-            df.columns = df.iloc[i]
-            df = df.iloc[i+1:]
-            break
-
-    df = df.dropna(how="all")
+    """
+    df_raw: DataFrame OMSPAN yang header-nya sudah dipasang
+    (baris header dicari oleh registry DIPA_FORMATS).
+    """
+    df = df_raw.dropna(how="all")
 
     def find(names):
         for c in df.columns:
@@ -1150,6 +1461,120 @@ def standardize_dipa(df_raw):
 
     return out
 
+
+# ============================================================
+# 🧬 REGISTRY FORMAT DIPA (FINGERPRINT → PARSER)
+# ============================================================
+# Satu entri per layout DIPA; urutan dict = prioritas (entri pertama yang cocok dipakai).
+#   marker : grup keyword yang wajib muncul di baris mana pun (None = cukup header)
+#   header : grup keyword yang wajib muncul di SATU baris → baris header
+#   parser : parser(grid, header_row) → DataFrame format standardize_dipa
+# Grup = tuple alternatif (cukup salah satu). Hanya DIPA_FINGERPRINT_ROWS baris
+# pertama yang diperiksa, sekali jalan untuk semua format → layout baru = 1 entri.
+DIPA_FINGERPRINT_ROWS = 15
+
+DipaFormat = namedtuple("DipaFormat", ["label", "marker", "header", "parser"])
+
+
+def parse_dipa_span(grid, header_row):
+    """Layout SPAN / hasil dashboard: header dari fingerprint → standardize_dipa."""
+    return standardize_dipa(frame_from_grid(grid, header_row, dtype=str))
+
+
+def parse_dipa_omspan(grid, header_row):
+    """Layout OMSPAN: adapter ke kolom standar → standardize_dipa."""
+    df_adapted = adapt_dipa_omspan(frame_from_grid(grid, header_row, dtype=str))
+    if df_adapted.empty:
+        return df_adapted
+
+    return standardize_dipa(df_adapted)
+
+
+DIPA_FORMATS = {
+    "omspan": DipaFormat(
+        "OMSPAN",
+        [("OMSPAN", "PAGU_RUPIAH", "KODE_SATKER")],
+        [("SATKER",), ("PAGU",)],
+        parse_dipa_omspan,
+    ),
+    "span_informasi_revisi": DipaFormat(
+        "SPAN 2022–2024 (Informasi Revisi DIPA)",
+        None,
+        [("SATKER",), ("NO. DIPA",), ("REVISI TERAKHIR",)],
+        parse_dipa_span,
+    ),
+    "span_detail_revisi": DipaFormat(
+        "SPAN 2025 (Detail Revisi DIPA)",
+        None,
+        [("SATKER",), ("KODE STATUS HISTORY",), ("PAGU BELANJA",)],
+        parse_dipa_span,
+    ),
+    "dashboard": DipaFormat(
+        "hasil olahan dashboard",
+        None,
+        [("KODE SATKER",), ("TOTAL PAGU",), ("NO DIPA",)],
+        parse_dipa_span,
+    ),
+    # fallback: layout SPAN lain yang punya kolom Satker & Pagu
+    "standar": DipaFormat(
+        "standar",
+        None,
+        [("SATKER",), ("PAGU",)],
+        parse_dipa_span,
+    ),
+}
+
+DIPA_FINGERPRINT_KEYWORDS = list(dict.fromkeys(
+    kw
+    for fmt in DIPA_FORMATS.values()
+    for group in (fmt.marker or []) + fmt.header
+    for kw in group
+))
+
+
+def keyword_groups_row(hits, groups):
+    """
+    Posisi baris pertama di `hits` (hasil header_keyword_hits) yang
+    memuat minimal satu keyword dari SETIAP grup. None jika tidak ada.
+    """
+    mask = np.ones(len(hits), dtype=bool)
+    for group in groups:
+        mask &= hits[list(group)].to_numpy().any(axis=1)
+
+    found = np.flatnonzero(mask)
+    return int(found[0]) if len(found) else None
+
+
+def detect_dipa_format(grid):
+    """
+    (kunci DIPA_FORMATS, baris header) untuk grid mentah,
+    atau (None, None) jika tidak ada format yang cocok.
+    """
+    hits = header_keyword_hits(
+        grid, DIPA_FINGERPRINT_KEYWORDS, max_rows=DIPA_FINGERPRINT_ROWS
+    )
+
+    for key, fmt in DIPA_FORMATS.items():
+        if fmt.marker and not all(
+            hits[list(group)].to_numpy().any() for group in fmt.marker
+        ):
+            continue
+
+        header_row = keyword_groups_row(hits, fmt.header)
+        if header_row is not None:
+            return key, header_row
+
+    return None, None
+
+
+def dipa_upload_format(uploaded_file):
+    """detect_dipa_format untuk file upload, di-cache per SHA isi file."""
+    return upload_cached(
+        uploaded_file,
+        "dipa_format",
+        lambda content: detect_dipa_format(read_upload_grid(uploaded_file)),
+    )
+
 #Normalisasi kode BA
 def normalize_kode_ba(x):
     try:
@@ -1157,6 +1582,116 @@ def normalize_kode_ba(x):
     except:
         return None
 
+
+def int_like_series(values):
+    """
+    Hasil int(v) per sel sebagai float (NaN jika int() gagal):
+    angka dibulatkan ke nol, teks hanya jika berupa bilangan bulat utuh
+    (teks di-parse sekali per nilai unik).
+    """
+    values = pd.Series(values)
+    is_text = values.map(type).eq(str).to_numpy()
+    number = np.full(len(values), np.nan)
+
+    if (~is_text).any():
+        number[~is_text] = np.trunc(pd.to_numeric(values[~is_text], errors="coerce"))
+
+    if is_text.any():
+        codes, uniques = pd.factorize(values[is_text])
+        text = pd.Series(uniques, dtype=object).str.strip()
+        text = text.where(text.str.fullmatch(r"[+-]?\d+(?:_\d+)*"))
+        parsed = pd.to_numeric(text.str.replace("_", "", regex=False), errors="coerce")
+        number[is_text] = parsed.to_numpy(dtype=float)[codes]
+
+    number[~np.isfinite(number)] = np.nan
+    return pd.Series(number, index=values.index)
+
+
+# |angka| < 2**53: float dari int_like_series = int(x) persis (muat di int64)
+KODE_EXACT_LIMIT = 2 ** 53
+
+
+def normalize_kode_ba_series(values):
+    """
+    Versi Series dari normalize_kode_ba (gagal → None), hasil sama persis.
+    Nilai di luar jalur vektor (angka ≥ 2**53, teks digit non-ASCII, teks
+    bukan angka, tipe lain) diproses normalize_kode_ba per nilai unik.
+    """
+    values = pd.Series(values)
+    number = int_like_series(values)
+    fast = (number.abs() < KODE_EXACT_LIMIT).to_numpy()
+
+    kode = np.full(len(number), None, dtype=object)
+    if fast.any():
+        codes, uniques = pd.factorize(number[fast].astype("int64"))
+        kode[fast] = pd.Series(uniques).astype(str).str.zfill(3).to_numpy(dtype=object)[codes]
+
+    rest = ~fast & values.notna().to_numpy()
+    if rest.any():
+        codes, uniques = pd.factorize(values[rest])
+        kode[rest] = np.array([normalize_kode_ba(v) for v in uniques], dtype=object)[codes]
+
+    return pd.Series(kode, index=values.index)
+
+
+# ===============================
+# ANGKA FORMAT INDONESIA
+# ===============================
+# "1.234.567" → 1234567, "12.500,75" → 12500.75, "95,5" → 95.5, "95.5" → 95.5
+ID_THOUSANDS_PATTERN = r"[+-]?\d{1,3}(?:\.\d{3})+(?:,\d+)?"
+
+
+def parse_id_numbers(values, thousands=True):
+    """
+    Angka format Indonesia → float untuk Series atau blok kolom DataFrame
+    sekaligus. Titik = pemisah ribuan (hanya jika berpola ribuan), koma =
+    desimal; sel yang sudah angka dipakai apa adanya, kosong / teks lain → NaN.
+    Kolom ber-dtype numerik dikembalikan tanpa diubah.
+
+    thousands=False → titik selalu desimal ("95.125" → 95.125, "1.234.567"
+    → NaN), hanya koma yang diganti titik: untuk kolom nilai/skor yang tidak
+    pernah berisi pemisah ribuan (IKPA KPPN).
+    """
+    if isinstance(values, pd.Series):
+        return parse_id_numbers(values.to_frame(), thousands).iloc[:, 0]
+
+    out = values.copy()
+    cols = [
+        i for i, dtype in enumerate(values.dtypes)
+        if not pd.api.types.is_numeric_dtype(dtype)
+    ]
+    if not cols or values.empty:
+        return out
+
+    # semua kolom teks diproses sebagai satu array (urut kolom)
+    flat = pd.Series(values.iloc[:, cols].to_numpy(dtype=object).ravel(order="F"))
+    if pd.api.types.infer_dtype(flat, skipna=False) == "string":
+        is_text = np.ones(len(flat), dtype=bool)
+    else:
+        is_text = flat.map(type).eq(str).to_numpy()
+    number = np.full(len(flat), np.nan)
+
+    if (~is_text).any():
+        number[~is_text] = pd.to_numeric(flat[~is_text], errors="coerce").astype(float)
+
+    if is_text.any():
+        # regex hanya sekali per teks unik
+        codes, uniques = pd.factorize(flat[is_text])
+        text = pd.Series(uniques, dtype=object).str.strip()
+        if thousands:
+            ribuan = text.str.fullmatch(ID_THOUSANDS_PATTERN)
+            text = text.where(~ribuan, text.str.replace(".", "", regex=False))
+        text = text.str.replace(",", ".", regex=False)
+        parsed = pd.to_numeric(text, errors="coerce").astype(float)
+        number[is_text] = parsed.to_numpy()[codes]
+
+    number = number.reshape(len(values), len(cols), order="F")
+    for j, i in enumerate(cols):
+        out.isetitem(i, number[:, j])
+
+    return out
+
+
 # ===============================
 # LOAD DATA REFERENSI BA (GITHUB)
 # ===============================
@@ -1166,8 +1701,8 @@ def load_reference_ba():
         "Diahayuningtyas092/IKPA_BATURAJA/main/templates/"
         "Template_Data_Referensi.xlsx"
     )
-    ref = pd.read_excel(url, sheet_name=0, dtype=str)
-    ref['Kode BA'] = ref['Kode BA'].apply(normalize_kode_ba)
+    ref = read_workbook(url, sheet_name=0, dtype=str)
+    ref['Kode BA'] = normalize_kode_ba_series(ref['Kode BA'])
     ref['Nama BA'] = ref['K/L'].astype(str).str.strip()
     return ref
 
@@ -1182,7 +1717,7 @@ def apply_filter_ba(df):
     selected_ba = st.session_state.get("filter_ba_main", ["SEMUA BA"])
     if not selected_ba or "SEMUA BA" in selected_ba:
         return df
-    return df[df['Kode BA'].astype(str).isin(selected_ba)].copy()
+    return df[df['Kode BA'].astype(str).isin(selected_ba)]
 
 # Konfigurasi halaman
 st.set_page_config(
@@ -1516,7 +2051,7 @@ def extract_kode_from_satker_field(s, width=6):
 def register_ikpa_satker(df_final, month, year, source="Manual"):
     key = (month, str(year))
 
-    df = df_final.copy()
+    df = cow_copy(df_final)
 
     df["Source"] = source
     df["Period"] = f"{month} {year}"
@@ -1547,240 +2082,344 @@ def register_ikpa_satker(df_final, month, year, source="Manual"):
             .astype(int)
         )
 
-    st.session_state.data_storage[key] = df
+    update_dataset_items("data_storage", {key: df})
 
 
-def find_header_row_by_keywords(uploaded_file, keywords, max_rows=15):
-    """
-    Mencari baris header Excel berdasarkan BANYAK keyword kolom
-    (contoh: 'Nama KPPN', 'KPPN', 'Nama Kantor', dll)
-    """
-    import pandas as pd
+# ============================================================
+#  ENGINE EXCEL (SEMUA BACA EXCEL LEWAT read_workbook)
+# ============================================================
+# EXCEL_ENGINE di Streamlit Secrets:
+#   "auto"     → calamine jika python-calamine terpasang, selain itu default pandas
+#   "calamine" → sama dengan auto (tetap fallback jika belum terpasang)
+#   "openpyxl" → selalu default pandas (openpyxl untuk xlsx, xlrd untuk xls)
+# (excel_engine / read_workbook di ikpa_workers; nilai diteruskan ke worker pool)
+EXCEL_ENGINE = str(st.secrets.get("EXCEL_ENGINE", "auto")).lower()
+configure_workers(excel_engine=EXCEL_ENGINE)
 
-    uploaded_file.seek(0)
-    preview = pd.read_excel(
-        uploaded_file,
+
+# ============================================================
+#  PEMBACA WORKBOOK UPLOAD (SEKALI BACA)
+# ============================================================
+# Grid mentah per isi file disimpan di session → preview, validasi,
+# deteksi header dan proses (juga setelah rerun) tidak membaca ulang Excel.
+UPLOAD_GRID_CACHE_SIZE = 4
+
+
+def read_excel_grid(source, sheet_name=0):
+    """Satu-satunya pembacaan Excel untuk grid mentah (tanpa cache)."""
+    return read_workbook(
+        source,
+        sheet_name=sheet_name,
         header=None,
-        nrows=max_rows
+        dtype=object,
+        na_filter=False,
     )
 
-    keywords = [k.upper() for k in keywords]
-
-    for i in range(preview.shape[0]):
-        row_values = (
-            preview.iloc[i]
-            .astype(str)
-            .str.upper()
-            .str.strip()
-        )
 
-        if any(
-            any(k in cell for cell in row_values)
-            for k in keywords
-        ):
-            return i
+def upload_cached(uploaded_file, name, build):
+    """
+    Hasil build(content) per isi file upload, disimpan di session
+    (UPLOAD_GRID_CACHE_SIZE entri terakhir). Hasil dipakai bersama →
+    jangan diubah in-place.
+    """
+    content = uploaded_file.getvalue()
+    key = (git_blob_sha(content), name)
 
-    return None
+    cache = st.session_state.setdefault("_upload_cache", {})
+    if key not in cache:
+        cache[key] = build(content)
+        while len(cache) > UPLOAD_GRID_CACHE_SIZE:
+            cache.pop(next(iter(cache)))
 
+    return cache[key]
 
 
-def process_excel_digipay(uploaded_file, upload_year):
+def read_upload_grid(uploaded_file, sheet_name=0):
     """
-    Parser DIGIPAY stabil
-    - Tidak pakai break
-    - Tidak berhenti di tengah
-    - Filter tahun langsung saat parsing
+    Grid mentah sheet upload: header=None, dtype object, tanpa konversi NA
+    (sel kosong = ""). sheet_name=None → dict {nama_sheet: grid}.
     """
+    return upload_cached(
+        uploaded_file,
+        ("grid", sheet_name),
+        lambda content: read_excel_grid(io.BytesIO(content), sheet_name),
+    )
 
-    df_raw = pd.read_excel(uploaded_file, header=None)
-    processed_rows = []
 
-    for i in range(len(df_raw)):
+def frame_from_grid(grid, header_row=None, dtype=None):
+    """
+    DataFrame dari grid mentah, identik dengan
+    read_workbook(file, header=header_row, dtype=dtype)
+    (NA, "Unnamed: i", kolom duplikat, inferensi tipe).
+    """
+    rows = grid.to_numpy(dtype=object).tolist()
+    if header_row is not None:
+        rows = rows[header_row:]
+    if not rows:
+        return pd.DataFrame()
 
-        row = df_raw.iloc[i]
+    return TextParser(
+        rows,
+        header=None if header_row is None else 0,
+        dtype=dtype,
+        skip_blank_lines=False,
+    ).read()
 
-        # =============================
-        # Ambil Tahun
-        # =============================
-        try:
-            tahun_row = int(row[0])
-        except:
-            continue
 
-        # Skip jika bukan tahun yang dipilih
-        if tahun_row != upload_year:
-            continue
+def header_keyword_hits(grid, keywords, max_rows=15, exact=False):
+    """
+    Tabel bool baris × keyword untuk `max_rows` baris pertama
+    (None = semua baris). Tidak peka huruf besar/kecil; exact=True →
+    sel harus sama persis, selain itu cukup memuat keyword.
+    """
+    head = grid if max_rows is None else grid.iloc[:max_rows]
+    if head.empty:
+        return pd.DataFrame(False, index=range(len(head)), columns=list(keywords))
+
+    cells = head.astype(str).apply(lambda col: col.str.strip().str.upper())
+    # pemisah \x1f → keyword tidak bisa cocok melintasi dua sel
+    row_text = cells.agg("\x1f".join, axis=1)
+
+    hits = {}
+    for kw in keywords:
+        k = str(kw).strip().upper()
+        if exact:
+            hits[kw] = cells.eq(k).any(axis=1).to_numpy()
+        else:
+            hits[kw] = row_text.str.contains(k, regex=False).to_numpy()
 
-        # =============================
-        # Ambil Kode Satker
-        # =============================
-        kode_satker = normalize_kode_satker(str(row[3]).strip())
-
-        # Lewati jika kosong / invalid
-        if (
-            not kode_satker
-            or not kode_satker.isdigit()
-            or len(kode_satker) != 6
-            or kode_satker == "000000"
-        ):
-            continue
+    return pd.DataFrame(hits, index=range(len(head)), columns=list(keywords))
 
-        # =============================
-        # Simpan data valid
-        # =============================
-        processed_rows.append({
-            "Tahun": tahun_row,
-            "Kode Satker": kode_satker,
-            "Nama Satker": str(row[4]).strip(),
-            "Nilai Digipay": row[5],
-        })
 
-    df_final = pd.DataFrame(processed_rows)
+def find_header_row(grid, keywords, max_rows=15, min_hits=None, exact=False):
+    """
+    Posisi baris pertama yang memuat minimal `min_hits` keyword
+    (default: semua keyword). None jika tidak ada.
+    """
+    hits = header_keyword_hits(grid, keywords, max_rows=max_rows, exact=exact)
+    need = len(keywords) if min_hits is None else min_hits
 
-    return df_final
+    found = np.flatnonzero(hits.sum(axis=1).to_numpy() >= need)
+    return int(found[0]) if len(found) else None
 
 
-# ===============================
-# PARSER IKPA SATKER (INI KUNCI)
-# ===============================
-def process_excel_file(uploaded_file, upload_year):
+def find_header_row_by_keywords(uploaded_file, keywords, max_rows=15):
     """
-    PARSER IKPA SATKER — SATU-SATUNYA YANG BOLEH MEMBACA EXCEL MENTAH
-    (Sudah difilter baris invalid & bulan dinormalisasi)
+    Mencari baris header Excel berdasarkan BANYAK keyword kolom
+    (contoh: 'Nama KPPN', 'KPPN', 'Nama Kantor', dll)
     """
-    df_raw = pd.read_excel(uploaded_file, header=None)
-
-    # ===============================
-    # 1️⃣ AMBIL BULAN (AMAN)
-    # ===============================
-    try:
-        month_text = str(df_raw.iloc[1, 0])
-        month_raw = month_text.split(":")[-1].strip().upper()
-    except Exception:
-        month_raw = "JULI"
+    grid = read_upload_grid(uploaded_file)
+    return find_header_row(grid, keywords, max_rows=max_rows, min_hits=1)
 
-    month = VALID_MONTHS.get(month_raw, "JULI")
 
-    # ===============================
-    # 2️⃣ DATA MULAI BARIS KE-5
-    # ===============================
-    df_data = df_raw.iloc[4:].reset_index(drop=True)
-    df_data.columns = range(len(df_data.columns))
 
-    processed_rows = []
-    i = 0
+# ============================================================
+#  PEMBACA STREAMING (UPLOAD KKP / DIGIPAY BESAR)
+# ============================================================
+# Upload xlsx ≥ UPLOAD_STREAM_MIN_MB dibaca streaming (openpyxl read_only)
+# per UPLOAD_CHUNK_ROWS baris; tiap chunk langsung dinormalisasi & difilter
+# sehingga yang tertahan di memori hanya 1 chunk mentah + baris valid.
+UPLOAD_STREAM_MIN_MB = float(st.secrets.get("UPLOAD_STREAM_MIN_MB", 20))
+UPLOAD_CHUNK_ROWS = int(st.secrets.get("UPLOAD_CHUNK_ROWS", 20_000))
+configure_workers(chunk_rows=UPLOAD_CHUNK_ROWS)
 
-    while i + 3 < len(df_data):
 
-        nilai = df_data.iloc[i]
-        bobot = df_data.iloc[i + 1]
-        nilai_akhir = df_data.iloc[i + 2]
-        nilai_aspek = df_data.iloc[i + 3]
+def use_streaming_upload(uploaded_file):
+    """True jika upload xlsx cukup besar untuk mode streaming."""
+    name = str(getattr(uploaded_file, "name", "")).lower()
+    size = getattr(uploaded_file, "size", None)
+    if size is None:
+        size = len(uploaded_file.getvalue())
+    return name.endswith(".xlsx") and size >= UPLOAD_STREAM_MIN_MB * 1024 * 1024
 
-        # ===============================
-        # 🔴 FILTER AWAL (CEGAH NILAI/BOBOT)
-        # ===============================
-        kode_satker = (
-            str(nilai[3])
-            .replace("\u00a0", "")   # hapus NBSP (spasi tak terlihat dari Excel)
-            .strip()                # hapus spasi kiri/kanan
-        )
 
-        kode_satker = normalize_kode_satker(kode_satker)
+# ============================================================
+#  UPLOAD DIGIPAY ADMIN (MULTI SHEET → DATABASE KPPN 109)
+# ============================================================
+def process_digipay_upload(uploaded_file, streaming=None, chunk_rows=None,
+                           on_sheet=None):
+    """
+    Semua sheet upload DIGIPAY → baris KPPN 109 BATURAJA yang sudah dibayar,
+    unik per DIGIPAY_UNIQUE_KEY. streaming=None → otomatis menurut ukuran file.
 
-        uraian_satker = str(nilai[4]).strip()
+    Tiap sheet dibaca + dinormalisasi paralel (get_parse_pool, lihat
+    digipay_sheet_frame); hasil digabung berurutan sheet begitu tersedia.
+    on_sheet(hasil, selesai, total) dipanggil di thread utama tiap sheet selesai
+    (hasil: index, sheet, rows, valid, seconds).
+    """
+    if streaming is None:
+        streaming = use_streaming_upload(uploaded_file)
 
-        if (
-            not kode_satker.isdigit()
-            or len(kode_satker) != 6
-            or kode_satker == "000000"
-            or uraian_satker.upper() in ["NILAI", "BOBOT", "NILAI AKHIR"]
-        ):
-            i += 4
-            continue
+    content = uploaded_file.getvalue()
+    sheet_names = excel_sheet_names(content)
 
-        row = {
-            "No": nilai[0],
-            "Kode KPPN": str(nilai[1]).strip("'"),
-            "Kode BA": str(nilai[2]).strip("'"),
-            "Kode Satker": kode_satker,
-            "Uraian Satker": uraian_satker,
-
-            "Kualitas Perencanaan Anggaran": nilai_aspek[6],
-            "Kualitas Pelaksanaan Anggaran": nilai_aspek[8],
-            "Kualitas Hasil Pelaksanaan Anggaran": nilai_aspek[12],
-
-            "Revisi DIPA": nilai[6],
-            "Deviasi Halaman III DIPA": nilai[7],
-            "Penyerapan Anggaran": nilai[8],
-            "Belanja Kontraktual": nilai[9],
-            "Penyelesaian Tagihan": nilai[10],
-            "Pengelolaan UP dan TUP": nilai[11],
-            "Capaian Output": nilai[12],
-
-            "Nilai Total": nilai[13],
-            "Konversi Bobot": nilai[14],
-            "Dispensasi SPM (Pengurang)": nilai[15],
-            "Nilai Akhir (Nilai Total/Konversi Bobot)": nilai[16],
-
-            "Bulan": month,
-            "Tahun": upload_year
+    # worker membaca dari file sementara (bytes upload tidak di-pickle per sheet)
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(content)
+
+        results = {}
+        parts = []
+        next_sheet = 0
+        pool = get_parse_pool()
+        futures = {
+            pool.submit(digipay_sheet_frame, path, i, streaming, chunk_rows): i
+            for i in range(len(sheet_names))
         }
 
-        processed_rows.append(row)
-        i += 4
+        for fut in as_completed(futures):
+            i = futures[fut]
+            result = parse_pool_result(fut, digipay_sheet_frame, path, i, streaming, chunk_rows)
 
-    # ===============================
-    # 3️⃣ DATAFRAME FINAL
-    # ===============================
-    df_final = pd.DataFrame(processed_rows)
-
-    return df_final, month, upload_year
-
-
-VALID_MONTHS = {
-    "JANUARI": "JANUARI",
-    "FEBRUARI": "FEBRUARI",
-    "PEBRUARI": "FEBRUARI",
-    "MARET": "MARET",
-    "APRIL": "APRIL",
-    "MEI": "MEI",
-    "JUNI": "JUNI",
-    "JULI": "JULI",
-    "JULY": "JULI",
-    "AGUSTUS": "AGUSTUS",
-    "AGUSTUSS": "AGUSTUS",
-    "SEPTEMBER": "SEPTEMBER",
-    "SEPT": "SEPTEMBER",
-    "OKTOBER": "OKTOBER",
-    "NOVEMBER": "NOVEMBER",
-    "NOPEMBER": "NOVEMBER",
-    "DESEMBER": "DESEMBER",
-}
+            result["index"] = i
+            result["sheet"] = sheet_names[i]
+            results[i] = result
+            if on_sheet is not None:
+                on_sheet(result, len(results), len(sheet_names))
 
-def post_process_ikpa_satker(df, source="Upload"):
-    df = df.copy()
+            # gabung berurutan: sheet ke-n masuk begitu sheet 0..n-1 sudah masuk
+            while next_sheet in results:
+                df = results[next_sheet].pop("df")
+                if not df.empty:
+                    parts.append(df)
+                next_sheet += 1
+    finally:
+        os.remove(path)
 
-    # =========================
-    # 1. NORMALISASI NUMERIK
-    # =========================
-    non_numeric = ["Uraian Satker", "Bulan", "Tahun"]
+    if not parts:
+        return pd.DataFrame(columns=DIGIPAY_COLUMNS)
 
-    for col in df.columns:
-        if col not in non_numeric:
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(",", ".", regex=False)
-            )
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.replace(".", "", regex=False)   # hapus pemisah ribuan
-                .str.replace(",", ".", regex=False)  # koma jadi titik
-            )
+    df_all = pd.concat(parts, ignore_index=True)
+    return df_all.drop_duplicates(subset=DIGIPAY_UNIQUE_KEY).reset_index(drop=True)
+
+
+def excel_sheet_names(content):
+    """Nama sheet workbook (tanpa mem-parse isi sheet)."""
+    with pd.ExcelFile(io.BytesIO(content), engine=excel_engine()) as xls:
+        return list(xls.sheet_names)
+
+
+def process_excel_digipay(uploaded_file, upload_year):
+    """
+    Parser DIGIPAY stabil
+    - Tidak pakai break
+    - Tidak berhenti di tengah
+    - Filter tahun langsung saat parsing (baris tahun lain tidak dibaca ke DataFrame)
+    """
+    df_raw = read_digipay_rows(uploaded_file, upload_year)
+    return parse_digipay_rows(df_raw, upload_year)
+
+
+def read_digipay_rows(uploaded_file, upload_year):
+    """
+    Baca sheet pertama secara streaming (openpyxl read_only) dan hanya
+    simpan baris yang kolom pertamanya MUNGKIN = upload_year:
+    angka di [tahun, tahun + 1) atau teks (dicek tepat di parse_digipay_rows).
+    File non-xlsx (xls) → fallback pd.read_excel penuh.
+    """
+    uploaded_file.seek(0)
+    try:
+        wb = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    except Exception:
+        uploaded_file.seek(0)
+        return read_workbook(uploaded_file, header=None)
+
+    rows = []
+    try:
+        for row in wb.worksheets[0].iter_rows(values_only=True):
+            first = row[0] if row else None
+            if isinstance(first, str) or (
+                isinstance(first, (int, float))
+                and not isinstance(first, bool)
+                and upload_year <= first < upload_year + 1
+            ):
+                rows.append([excel_cell_value(v) for v in row])
+    finally:
+        wb.close()
+
+    # baris pendek dilengkapi NaN (bukan None) seperti pd.read_excel
+    width = max((len(r) for r in rows), default=0)
+    return pd.DataFrame([r + [np.nan] * (width - len(r)) for r in rows])
+
+
+def digipay_year_mask(values, upload_year):
+    """Mask vektor setara `int(v) == upload_year` (v = sel kolom tahun)."""
+    return int_like_series(values).eq(upload_year)
+
+
+def parse_digipay_rows(df_raw, upload_year):
+    """Parser baris DIGIPAY versi kolom: filter tahun + kode satker valid sekaligus."""
+    if df_raw.empty:
+        return pd.DataFrame()
+
+    df_year = df_raw[digipay_year_mask(df_raw[0], upload_year)]
+    if df_year.empty:
+        return pd.DataFrame()
+
+    kode_satker = normalize_kode_satker_series(df_year[3].astype(str))
+    valid = kode_satker.str.fullmatch(r"\d{6}") & (kode_satker != "000000")
+
+    df_valid = df_year[valid]
+    if df_valid.empty:
+        return pd.DataFrame()
+
+    df_final = pd.DataFrame({
+        "Tahun": upload_year,
+        "Kode Satker": kode_satker[valid].to_numpy(dtype=object),
+        "Nama Satker": df_valid[4].astype(str).str.strip().to_numpy(dtype=object),
+        "Nilai Digipay": df_valid[5].to_numpy(dtype=object),
+    }).infer_objects()
+
+    return df_final
+
+
+# ===============================
+# UPLOAD IKPA SATKER (BANYAK FILE, PROCESS POOL)
+# ===============================
+def prepare_ikpa_uploads(uploads, upload_year, reference_df=None, on_done=None):
+    """
+    Jalankan prepare_ikpa_upload untuk banyak file sekaligus (get_parse_pool).
+    uploads = [(nama_file, bytes)]; on_done(indeks, hasil, selesai, total)
+    dipanggil di thread utama tiap file selesai (urutan selesai).
+    Return: list hasil dengan urutan SAMA seperti `uploads`.
+    """
+    results = [None] * len(uploads)
+    if not uploads:
+        return results
+
+    done = 0
+
+    pool = get_parse_pool()
+    futures = {
+        pool.submit(prepare_ikpa_upload, content, name, upload_year, reference_df): i
+        for i, (name, content) in enumerate(uploads)
+    }
 
-            df[col] = pd.to_numeric(df[col], errors="coerce")
+    for fut in as_completed(futures):
+        i = futures[fut]
+        name, content = uploads[i]
+        results[i] = parse_pool_result(
+            fut, prepare_ikpa_upload, content, name, upload_year, reference_df
+        )
+
+        done += 1
+        if on_done is not None:
+            on_done(i, results[i], done, len(uploads))
+
+    return results
+
+
+def post_process_ikpa_satker(df, source="Upload"):
+    df = df.copy()
+
+    # =========================
+    # 1. NORMALISASI NUMERIK
+    # =========================
+    non_numeric = ["Uraian Satker", "Bulan", "Tahun"]
+
+    numeric_cols = [c for c in df.columns if c not in non_numeric]
+    df[numeric_cols] = parse_id_numbers(df[numeric_cols])
 
     # =========================
     # 🔤 2. NORMALISASI BULAN (FIX UTAMA)
@@ -1873,9 +2512,8 @@ def post_process_ikpa_satker(df, source="Upload"):
 # ===============================
 # PARSER IKPA KPPN (RINGKAS)
 # ===============================
-def process_kppn_ringkas(uploaded_file, year, detected_month):
-    uploaded_file.seek(0)
-    df = pd.read_excel(uploaded_file)
+def process_kppn_ringkas(uploaded_file, year, detected_month, header_row=0):
+    df = frame_from_grid(read_upload_grid(uploaded_file), header_row)
 
     df.columns = (
         df.columns.astype(str)
@@ -1888,15 +2526,10 @@ def process_kppn_ringkas(uploaded_file, year, detected_month):
         raise ValueError("File IKPA KPPN tidak valid")
 
     # =========================
-    # NORMALISASI DESIMAL
+    # NORMALISASI DESIMAL (koma → titik; titik tetap desimal, bukan ribuan)
     # =========================
-    df = df.applymap(
-        lambda x: str(x).replace(",", ".") if isinstance(x, str) else x
-    )
-
-    for col in df.columns:
-        if col not in ["Nama KPPN", "Bulan", "Tahun", "Source"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    numeric_cols = [c for c in df.columns if c not in ["Nama KPPN", "Bulan", "Tahun", "Source"]]
+    df[numeric_cols] = parse_id_numbers(df[numeric_cols], thousands=False).fillna(0)
 
     # =========================
     # NORMALISASI BULAN
@@ -1929,13 +2562,7 @@ def process_kppn_ringkas(uploaded_file, year, detected_month):
 # ===============================
 # REPROCESS ALL IKPA SATKER
 # ===============================
-def reprocess_all_ikpa_satker():
-    with st.spinner("🔄 Memproses ulang seluruh IKPA Satker..."):
-        load_data_from_github()
-        st.session_state.ikpa_dipa_merged = False
-
-
-def process_excel_file_kppn(uploaded_file, year, detected_month=None):
+def process_excel_file_kppn(uploaded_file, year, detected_month=None, header_row=0):
     try:
         import pandas as pd
 
@@ -1945,10 +2572,9 @@ def process_excel_file_kppn(uploaded_file, year, detected_month=None):
         month = detected_month if detected_month and detected_month != "UNKNOWN" else "UNKNOWN"
 
         # ===============================
-        # 2️⃣ BACA FILE (FORMAT RINGKAS)
+        # 2️⃣ BACA FILE (FORMAT RINGKAS) — grid yang sama dengan validasi
         # ===============================
-        uploaded_file.seek(0)
-        df = pd.read_excel(uploaded_file)
+        df = frame_from_grid(read_upload_grid(uploaded_file), header_row)
 
         # ===============================
         # 3️⃣ NORMALISASI NAMA KOLOM
@@ -1970,30 +2596,23 @@ def process_excel_file_kppn(uploaded_file, year, detected_month=None):
             )
 
         # ===============================
-        # 5️⃣ KONVERSI DESIMAL (KOMA → TITIK)
-        # ===============================
-        df = df.applymap(
-            lambda x: str(x).replace(",", ".") if isinstance(x, str) else x
-        )
-
-        # ===============================
-        # 6️⃣ CAST NUMERIK (AMAN)
+        # 5️⃣ CAST NUMERIK (SEKALI BLOK, SAMA DENGAN FORMAT RINGKAS)
         # ===============================
+        # nilai KPPN: titik = desimal ("95.125"), koma desimal ikut diterima
         NON_NUMERIC = ["Nama KPPN", "Bulan", "Tahun", "Source"]
 
-        for col in df.columns:
-            if col not in NON_NUMERIC:
-                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+        numeric_cols = [c for c in df.columns if c not in NON_NUMERIC]
+        df[numeric_cols] = parse_id_numbers(df[numeric_cols], thousands=False).fillna(0)
 
         # ===============================
-        # 7️⃣ METADATA
+        # 6️⃣ METADATA
         # ===============================
         df["Bulan"] = month
         df["Tahun"] = year
         df["Source"] = "Upload"
 
         # ===============================
-        # 🔑 8️⃣ DENSE RANKING (FINAL & BENAR)
+        # 🔑 7️⃣ DENSE RANKING (FINAL & BENAR)
         # ===============================
         df = df.sort_values(nilai_col, ascending=False)
 
@@ -2014,7 +2633,11 @@ def process_excel_file_kppn(uploaded_file, year, detected_month=None):
 # PARSER DIPA 
 # ============================================================
 #Parser Perbaikan DIPA
-def parse_dipa(df_raw):
+def parse_dipa_core(df_raw):
+    """
+    Bagian parser DIPA yang tidak bergantung pada referensi satker.
+    Hasilnya yang disimpan sebagai sidecar Parquet DIPA.
+    """
     import pandas as pd
     import re
     from datetime import datetime
@@ -2023,16 +2646,10 @@ def parse_dipa(df_raw):
     df = df_raw.dropna(how="all").reset_index(drop=True)
 
     # ====== 2. Cari baris header yang BENAR ======
-    header_row = None
-    for i in range(min(15, len(df))):
-        row_str = " ".join(df.iloc[i].astype(str).str.upper().tolist())
-        if (
-            "SATKER" in row_str
-            and "DIPA" in row_str
-            and ("PAGU" in row_str or "BELANJA" in row_str)
-        ):
-            header_row = i
-            break
+    header_row = keyword_groups_row(
+        header_keyword_hits(df, ["SATKER", "DIPA", "PAGU", "BELANJA"], max_rows=15),
+        [("SATKER",), ("DIPA",), ("PAGU", "BELANJA")],
+    )
 
     if header_row is None:
         raise ValueError("Header DIPA tidak ditemukan (SPAN 2022–2023)")
@@ -2142,32 +2759,37 @@ def parse_dipa(df_raw):
     out = out.dropna(subset=["Kode Satker"])
     out["Kode Satker"] = out["Kode Satker"].astype(str).str.zfill(6)
 
+    return out
+
+
+def parse_dipa(df_raw):
+    """Parser DIPA lengkap: parse_dipa_core + perbaikan nama dari referensi."""
+    return apply_dipa_reference_names(parse_dipa_core(df_raw))
 
+
+def apply_dipa_reference_names(out):
     # ======================================================
     # 🔑 PERBAIKAN NAMA SATKER (KHUSUS SPAN 2022–2023)
     # ======================================================
-    ref = st.session_state.reference_df[
-        ["Kode Satker", "Uraian Satker-SINGKAT"]
-    ].copy()
+    ref = st.session_state.reference_df
 
-    ref["Kode Satker"] = ref["Kode Satker"].astype(str).str.strip()
+    out = out.reset_index(drop=True)
     out["Kode Satker"] = out["Kode Satker"].astype(str).str.strip()
 
-    out = out.merge(
-        ref,
-        on="Kode Satker",
-        how="left"
+    # nama singkat referensi lewat satker_id (join integer)
+    singkat = satker_lookup(
+        satker_id_series(out["Kode Satker"]).to_numpy(),
+        satker_id_series(ref["Kode Satker"]),
+        ref["Uraian Satker-SINGKAT"],
     )
 
     # isi Satker dari referensi JIKA kosong
     out["Satker"] = (
         out["Satker"]
         .replace(["", "nan", "None"], pd.NA)
-        .fillna(out["Uraian Satker-SINGKAT"])
+        .fillna(pd.Series(singkat, index=out.index))
     )
 
-    out.drop(columns=["Uraian Satker-SINGKAT"], inplace=True)
- 
     return out
 
 
@@ -2175,54 +2797,63 @@ def parse_dipa(df_raw):
 # FUNGSI HELPER: Load Data DIPA dari GitHub
 # ============================================================
 def load_DATA_DIPA_from_github():
-    token = st.secrets.get("GITHUB_TOKEN")
-    repo_name = st.secrets.get("GITHUB_REPO")
+    storage = get_storage()
 
-    if not token or not repo_name:
+    if storage is None:
         st.error("❌ GitHub token / repo tidak ditemukan.")
         return False
 
     try:
-        g = Github(auth=Auth.Token(token))
-        repo = g.get_repo(repo_name)
-    except:
-        st.error("❌ Gagal koneksi GitHub.")
-        return False
-
-    try:
-        files = repo.get_contents("DATA_DIPA")
-    except:
+        files = storage.list("DATA_DIPA")
+    except FileNotFoundError:
         st.error("❌ Folder DATA_DIPA tidak ditemukan di GitHub.")
         return False
+    except Exception:
+        st.error("❌ Gagal koneksi GitHub.")
+        return False
 
-    pattern = re.compile(r"^DIPA[_-]?(\d{4})\.xlsx$", re.IGNORECASE)
+    pattern = re.compile(r"^DIPA[_-]?(\d{4})\.(xlsx|parquet)$", re.IGNORECASE)
 
-    st.session_state.DATA_DIPA_by_year = {}
+    dipa_by_year = {}
     loaded_years = []
 
-    for f in files:
-        match = pattern.match(f.name)
-        if not match:
-            continue
-
-        tahun = int(match.group(1))
+    dipa_files = prefer_sidecar_files([f for f in files if pattern.match(f.name)], storage=storage)
+    sidecars = [f for f in dipa_files if f.name.endswith(".parquet")]
+    workbooks = [f for f in dipa_files if not f.name.endswith(".parquet")]
+
+    # GUNAKAN PARSER BARU (hasil parse di-cache per blob SHA)
+    # sidecar sudah berisi hasil parse_dipa_core → tinggal nama referensi
+    frames, errors, hits = load_blob_frames(
+        sidecars,
+        namespace="dipa",
+        post_process=apply_dipa_reference_names,
+        salt=reference_cache_salt(),
+    )
+    frames_xlsx, errors_xlsx, hits_xlsx = load_blob_frames(
+        workbooks,
+        namespace="dipa",
+        post_process=parse_dipa,
+        salt=reference_cache_salt(),
+        read_kwargs={"header": None},
+    )
+    frames.update(frames_xlsx)
+    errors.update(errors_xlsx)
 
-        try:
-            raw = base64.b64decode(f.content)
-            df_raw = pd.read_excel(io.BytesIO(raw), header=None)
+    for name in sorted(frames):
+        tahun = int(pattern.match(name).group(1))
+        df_parsed = frames[name].copy()
 
-            # GUNAKAN PARSER BARU
-            df_parsed = parse_dipa(df_raw)
+        # Set tahun
+        df_parsed["Tahun"] = tahun
 
-            # Set tahun
-            df_parsed["Tahun"] = tahun
+        # Simpan
+        dipa_by_year[tahun] = df_parsed
+        loaded_years.append(str(tahun))
 
-            # Simpan
-            st.session_state.DATA_DIPA_by_year[tahun] = df_parsed
-            loaded_years.append(str(tahun))
+    publish_datasets(DATA_DIPA_by_year=dipa_by_year)
 
-        except Exception as e:
-            st.warning(f"⚠️ DIPA {tahun} gagal diproses: {e}")
+    for name, err in errors.items():
+        st.warning(f"⚠️ DIPA {name} gagal diproses: {err}")
 
     if loaded_years:
         add_notification("DIPA berhasil dimuat: " + ", ".join(loaded_years))
@@ -2239,7 +2870,7 @@ def to_excel_bytes(df):
     from openpyxl.utils import get_column_letter
 
     output = io.BytesIO()
-    df = df.copy()
+    df = without_satker_id(df)
 
     if "Kode Satker" in df.columns:
         df["Kode Satker"] = (
@@ -2266,25 +2897,21 @@ def to_excel_bytes(df):
 # LOAD TEMPLATE REFERENSI (TEMPLATES FOLDER SAJA)
 # ============================================================
 def load_template_referensi_from_github():
-    token = st.secrets["GITHUB_TOKEN"]
-    repo_name = st.secrets["GITHUB_REPO"]
-
-    g = Github(auth=Auth.Token(token))
-    repo = g.get_repo(repo_name)
+    storage = get_storage()
 
     file_path = "templates/Template_Data_Referensi.xlsx"
-    existing_file = repo.get_contents(file_path)
+    existing_file = storage.get(file_path)
 
-    file_content = base64.b64decode(existing_file.content)
-    df = pd.read_excel(io.BytesIO(file_content), dtype=str)
+    file_content = storage.read(existing_file)
+    df = read_workbook(io.BytesIO(file_content), dtype=str)
 
-    return df, repo, existing_file
+    return df, storage, existing_file
 
 
 # ============================================================
 # UPDATE TEMPLATE REFERENSI (REPLACE FILE YANG SAMA)
 # ============================================================
-def update_template_referensi_github(df_updated, repo, existing_file, message):
+def update_template_referensi_github(df_updated, storage, existing_file, message):
     file_path = "templates/Template_Data_Referensi.xlsx"
 
     excel_bytes = io.BytesIO()
@@ -2293,326 +2920,1403 @@ def update_template_referensi_github(df_updated, repo, existing_file, message):
 
     excel_bytes.seek(0)
 
-    repo.update_file(
+    # expected_sha → gagal jika file diubah sejak dibaca
+    storage.write(
         file_path,
-        message,
         excel_bytes.getvalue(),
-        existing_file.sha
+        message,
+        expected_sha=existing_file.sha
     )
 
 
-# Save any file (Excel/template) to your GitHub repo
+# Save any file (Excel/template) to storage (GitHub / folder lokal)
 def save_file_to_github(content_bytes, filename, folder):
-    token = st.secrets["GITHUB_TOKEN"]
-    repo_name = st.secrets["GITHUB_REPO"]
+    storage = get_storage()
+    if storage is None:
+        raise RuntimeError("Storage belum dikonfigurasi (GITHUB_TOKEN / GITHUB_REPO)")
 
-    g = Github(auth=Auth.Token(token))
-    repo = g.get_repo(repo_name)
-    
+    # buat / timpa file (pesan commit "Create ..." / "Update ...")
+    return storage.write(f"{folder}/{filename}", content_bytes)
 
-    # 1️⃣ buat path full
-    path = f"{folder}/{filename}"
 
-    try:
-        # 2️⃣ cek apakah file sudah ada
-        existing = repo.get_contents(path)
-        repo.update_file(existing.path, f"Update {filename}", content_bytes, existing.sha)
-    except Exception:
-        # 3️⃣ jika folder tidak ada → buat file pertama
-        repo.create_file(path, f"Create {filename}", content_bytes)
+def save_files_to_github(files, message):
+    """
+    Simpan banyak file ({path: bytes}, None = hapus) dalam 1 commit atomik.
+    Return {path: RepoFile}; gagal → exception, tidak ada file yang tertulis.
+    """
+    storage = get_storage()
+    if storage is None:
+        raise RuntimeError("Storage belum dikonfigurasi (GITHUB_TOKEN / GITHUB_REPO)")
+
+    return storage.write_many(files, message)
         
 
 # ============================
-#  LOAD DATA IKPA DARI GITHUB
+#  SIDECAR PARQUET (IKPA, KPPN, DIPA)
 # ============================
-@st.cache_data(ttl=3600)
-def load_data_from_github(_cache_buster: int = 0):
-    """
-    Load IKPA Satker dari GitHub (/data).
-    HANYA file hasil proses (df_final) yang diterima.
-    Mengembalikan dict: {(BULAN, TAHUN): DataFrame}
-    """
+# Setiap xlsx hasil proses punya pasangan .parquet bertipe di folder yang sama.
+# xlsx tetap sumber utama; sidecar hanya dipakai jika xlsx-nya masih ada dan
+# source_sha di metadata sidecar = SHA blob xlsx saat ini.
+SIDECAR_FOLDERS = ["data", "data_kppn", "DATA_DIPA"]
 
-    data_storage = {}
 
-    token = st.secrets.get("GITHUB_TOKEN")
-    repo_name = st.secrets.get("GITHUB_REPO")
+def save_with_parquet_sidecar(df, excel_bytes, filename, folder):
+    """Simpan xlsx + sidecar Parquet-nya (atau hapus sidecar lama) dalam 1 commit."""
+    return save_sidecar_files(
+        sidecar_files(df, excel_bytes, filename, folder),
+        f"Update {filename}",
+    )
 
-    if not token or not repo_name:
-        return data_storage
 
-    g = Github(auth=Auth.Token(token))
-    repo = g.get_repo(repo_name)
+def save_sidecar_files(files, message):
+    """save_files_to_github untuk hasil sidecar_files (boleh gabungan beberapa xlsx)."""
+    written = save_files_to_github(files, message)
+    for path, payload in files.items():
+        sidecar = files.get(sidecar_name(path))
+        if sidecar is not None and payload is not sidecar:
+            remember_sidecar_source(sidecar, git_blob_sha(payload))
+    return written
 
-    try:
-        contents = repo.get_contents("data")
-    except Exception:
-        return data_storage
 
-    REQUIRED_COLUMNS = [
-        "No", "Kode KPPN", "Kode BA", "Kode Satker", "Uraian Satker",
-        "Kualitas Perencanaan Anggaran",
-        "Kualitas Pelaksanaan Anggaran",
-        "Kualitas Hasil Pelaksanaan Anggaran",
-        "Revisi DIPA", "Deviasi Halaman III DIPA",
-        "Penyerapan Anggaran", "Belanja Kontraktual",
-        "Penyelesaian Tagihan", "Pengelolaan UP dan TUP",
-        "Capaian Output",
-        "Nilai Total", "Konversi Bobot",
-        "Dispensasi SPM (Pengurang)",
-        "Nilai Akhir (Nilai Total/Konversi Bobot)",
-        "Bulan", "Tahun"
-    ]
+def remember_sidecar_source(payload, source_sha):
+    """Catat source_sha sidecar `payload` di cache disk → dicek tanpa download nanti."""
+    blob_cache_put("sidecar-src", git_blob_sha(payload), source_sha)
 
-    MONTH_ORDER = {
-        "JANUARI": 1, "FEBRUARI": 2, "MARET": 3, "APRIL": 4,
-        "MEI": 5, "JUNI": 6, "JULI": 7, "AGUSTUS": 8,
-        "SEPTEMBER": 9, "OKTOBER": 10, "NOVEMBER": 11, "DESEMBER": 12
-    }
 
-    for file in contents:
-        if not file.name.endswith(".xlsx"):
-            continue
+def dipa_sidecar_frame(excel_bytes):
+    """Sidecar DIPA = hasil parse_dipa_core dari xlsx (tanpa referensi)."""
+    return parse_dipa_core(read_workbook(io.BytesIO(excel_bytes), header=None))
 
-        try:
-            decoded = base64.b64decode(file.content)
-            df = pd.read_excel(io.BytesIO(decoded))
-            
-            # ===============================
-            # 🔥 RESET HASIL LAMA (WAJIB)
-            # ===============================
-            df = df.copy()
 
-            for col in ["Uraian Satker-RINGKAS", "Uraian Satker Final", "Satker"]:
-                if col in df.columns:
-                    df.drop(columns=[col], inplace=True)
+@st.cache_resource
+def get_sidecar_sources():
+    """
+    {SHA blob sidecar: source_sha di metadata-nya}. Isi blob tidak pernah
+    berubah untuk SHA yang sama → tiap sidecar cukup dibaca sekali per proses.
+    """
+    return {}
 
-            # ===============================
-            # VALIDASI KOLOM WAJIB
-            # ===============================
-            if not all(col in df.columns for col in REQUIRED_COLUMNS):
-                continue
 
-            month = str(df["Bulan"].iloc[0]).upper()
-            year = str(df["Tahun"].iloc[0])
-            key = (month, year)
+def sidecar_source_sha(storage, f):
+    """
+    source_sha sidecar `f` (RepoFile .parquet); None jika tidak ada / tidak terbaca.
+    Urutan: memo proses → cache disk (tetap ada setelah restart) → download.
+    """
+    sources = get_sidecar_sources()
+    if f.sha not in sources:
+        cached = blob_cache_get("sidecar-src", f.sha)
+        if cached is None:
+            try:
+                df = pd.read_parquet(io.BytesIO(storage.read(f)))
+            except Exception:
+                return None
+            # "" = sidecar tanpa source_sha (tetap dicatat agar tidak di-download lagi)
+            cached = df.attrs.get("source_sha") or ""
+            blob_cache_put("sidecar-src", f.sha, cached)
+        sources[f.sha] = cached or None
+    return sources[f.sha]
 
-            df["Bulan"] = month
-            df["Tahun"] = year
 
-            # ===============================
-            # NORMALISASI KODE SATKER
-            # ===============================
-            df["Kode Satker"] = (
-                df["Kode Satker"]
-                .astype(str)
-                .apply(normalize_kode_satker)
-            )
+def prefer_sidecar_files(contents, source_ext=".xlsx", storage=None):
+    """
+    Pilih file per periode dari listing folder GitHub:
+    .parquet jika ada (dan pyarrow tersedia) DAN source_sha-nya sama dengan
+    SHA xlsx pasangannya, selain itu xlsx (sidecar basi diabaikan).
+    Sidecar tanpa xlsx (xlsx sudah dihapus) diabaikan.
+    """
+    by_stem = {}
+    for f in contents:
+        stem, ext = os.path.splitext(f.name)
+        by_stem.setdefault(stem, {})[ext.lower()] = f
 
-            # =====================================================
-            # 🔑 PAKSA URAIAN SATKER RINGKAS (FIX UTAMA)
-            # =====================================================
-            df = apply_reference_short_names(df)
-            df = create_satker_column(df)
-
-            # ===============================
-            # NORMALISASI NUMERIK
-            # ===============================
-            numeric_cols = [
-                "Nilai Akhir (Nilai Total/Konversi Bobot)",
-                "Nilai Total", "Konversi Bobot",
-                "Revisi DIPA", "Deviasi Halaman III DIPA",
-                "Penyerapan Anggaran", "Belanja Kontraktual",
-                "Penyelesaian Tagihan", "Pengelolaan UP dan TUP",
-                "Capaian Output",
-                "Kualitas Perencanaan Anggaran",
-                "Kualitas Pelaksanaan Anggaran",
-                "Kualitas Hasil Pelaksanaan Anggaran",
-            ]
+    pairs = [
+        (exts[source_ext], exts.get(".parquet") if PARQUET_AVAILABLE else None)
+        for stem, exts in sorted(by_stem.items())
+        if source_ext in exts
+    ]
 
-            for col in numeric_cols:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    sources = {}
+    sidecars = [sidecar for _, sidecar in pairs if sidecar is not None]
+    if sidecars:
+        storage = storage or get_storage()
+        with ThreadPoolExecutor(max_workers=LOADER_MAX_WORKERS) as pool:
+            sources = dict(zip(
+                (f.sha for f in sidecars),
+                pool.map(lambda f: sidecar_source_sha(storage, f), sidecars),
+            ))
+
+    return [
+        sidecar if sidecar is not None and sources[sidecar.sha] == source.sha else source
+        for source, sidecar in pairs
+    ]
 
-            month_num = MONTH_ORDER.get(month, 0)
 
-            df["Source"] = "GitHub"
-            df["Period"] = f"{month} {year}"
-            df["Period_Sort"] = f"{int(year):04d}-{month_num:02d}"
+def delete_parquet_sidecar(xlsx_path):
+    """Hapus sidecar milik xlsx yang dihapus (jika ada)."""
+    try:
+        get_storage().delete(sidecar_name(xlsx_path))
+        return True
+    except FileNotFoundError:
+        return False
 
-            # ===============================
-            # RANKING DENSE
-            # ===============================
-            nilai_col = "Nilai Akhir (Nilai Total/Konversi Bobot)"
-            df = df.sort_values(nilai_col, ascending=False)
-            df["Peringkat"] = (
-                df[nilai_col]
-                .rank(method="dense", ascending=False)
-                .astype(int)
-            )
 
-            # ===============================
-            # MERGE DIPA + JENIS SATKER
-            # ===============================
-            df = merge_ikpa_with_dipa(df)
+def _try(fn, *args):
+    """Jalankan fn; return (hasil, None) atau (None, pesan error)."""
+    try:
+        return fn(*args), None
+    except Exception as e:
+        return None, str(e)
 
-            if "Jenis Satker" in df.columns:
-                df = df.drop(columns=["Jenis Satker"])
 
-            df = classify_jenis_satker(df)
+def migrate_parquet_sidecars(folders=None, max_workers=None):
+    """
+    Migrasi sekali jalan: buat sidecar Parquet untuk semua xlsx di
+    data/, data_kppn/ dan DATA_DIPA/ yang belum punya sidecar atau yang
+    sidecar-nya basi (source_sha tidak sama dengan SHA xlsx).
+    Return: list dict laporan per file.
+    """
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("pyarrow belum terpasang")
 
-            data_storage[key] = df
+    storage = get_storage()
+    if storage is None:
+        raise RuntimeError("GitHub token / repo tidak ditemukan")
 
+    jobs = []
+    for folder in folders or SIDECAR_FOLDERS:
+        try:
+            contents = storage.list(folder)
         except Exception:
             continue
 
-    return data_storage
+        by_name = {f.name: f for f in contents}
+        for f in contents:
+            if f.name.endswith(".xlsx"):
+                jobs.append((folder, f, by_name.get(sidecar_name(f.name))))
 
+    def build(job):
+        folder, xlsx, sidecar = job
 
-from github import Github, Auth
-import base64
-import io
+        if sidecar is not None and sidecar_source_sha(storage, sidecar) == xlsx.sha:
+            return None
 
-def load_data_ikpa_kppn_from_github():
-    from github import Github, Auth
-    import base64, io
+        raw = storage.read(xlsx)
+        if folder == "DATA_DIPA":
+            df = dipa_sidecar_frame(raw)
+        else:
+            df = read_workbook(io.BytesIO(raw))
 
-    token = st.secrets.get("GITHUB_TOKEN")
-    repo_name = st.secrets.get("GITHUB_REPO")
+        return to_parquet_bytes(df, source_sha=xlsx.sha)
 
-    g = Github(auth=Auth.Token(token))
-    repo = g.get_repo(repo_name)
+    report = []
+    with ThreadPoolExecutor(max_workers=max_workers or LOADER_MAX_WORKERS) as pool:
+        results = list(zip(jobs, pool.map(lambda j: _try(build, j), jobs)))
 
-    # GANTI PATH INI SESUAI HASIL DEBUG
-    KPPN_PATH = "data_kppn"   # <- UBAH DI SINI
+    # commit berurutan (commit paralel ke branch yang sama bisa konflik)
+    for (folder, xlsx, _), (payload, err) in results:
+        if err is not None:
+            status = f"❌ {err}"
+        elif payload is None:
+            status = "✔ Sudah terbaru"
+        else:
+            try:
+                save_file_to_github(payload, sidecar_name(xlsx.name), folder)
+                remember_sidecar_source(payload, xlsx.sha)
+                status = "✅ Dibuat"
+            except Exception as e:
+                status = f"❌ {e}"
 
-    try:
-        contents = repo.get_contents(KPPN_PATH)
-    except Exception as e:
-        st.error(f"Folder '{KPPN_PATH}' tidak ditemukan di GitHub")
-        return {}
+        report.append({"Folder": folder, "File": xlsx.name, "Status": status})
 
-    data = {}
-    for f in contents:
-        if f.name.endswith(".xlsx"):
-            df = pd.read_excel(io.BytesIO(base64.b64decode(f.content)))
-            if "Bulan" in df.columns and "Tahun" in df.columns:
-                key = (
-                    str(df["Bulan"].iloc[0]).upper(),
-                    str(df["Tahun"].iloc[0])
-                )
-                data[key] = df
+    return report
 
-    return data
 
+# ============================
+#  STORAGE BACKEND (GITHUB / FOLDER LOKAL)
+# ============================
+# Semua baca / tulis / hapus file data lewat get_storage().
+# Backend dipilih lewat secrets STORAGE_BACKEND = "github" | "local"
+# (default: github jika GITHUB_TOKEN + GITHUB_REPO ada, selain itu local).
+#
+# GitHub: semua folder data dibaca dari SATU panggilan git tree rekursif,
+# isi file lewat git blobs API (media type raw) → tanpa batas 1 MB
+# contents API dan tanpa decode base64.
+REPO_DATA_FOLDERS = [
+    "data", "data_kppn", "DATA_DIPA", "data_kkp", "data_Digipay", "data_CMS",
+]
+REPO_TREE_TTL = int(st.secrets.get("REPO_TREE_TTL", 60))
+
+RepoFile = namedtuple("RepoFile", ["path", "name", "sha", "size"])
+
+
+class StorageConflictError(RuntimeError):
+    """SHA file di storage tidak sama dengan expected_sha (diubah pihak lain)."""
+
+
+class GitHubStorage:
+    """Storage repo GitHub via REST API dengan session HTTP ter-pool."""
+
+    API_URL = "https://api.github.com"
+
+    def __init__(self, token, repo_name, branch=None, pool_size=None):
+        self.repo_name = repo_name
+        self.branch = branch
+        self._tree = None
+        self._tree_at = 0.0
+
+        pool_size = pool_size or LOADER_MAX_WORKERS
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET"],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=retry,
+        )
 
-def find_header_row_kkp(uploaded_file, max_rows=10):
-    uploaded_file.seek(0)
-    preview = pd.read_excel(uploaded_file, header=None, nrows=max_rows)
-
-    for i in range(preview.shape[0]):
-        row = preview.iloc[i].astype(str).str.upper()
-        if (
-            row.str.contains("BA/KL").any()
-            and row.str.contains("SATKER").any()
-            and row.str.contains("PERIODE").any()
-        ):
-            return i
-    return None
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+        })
 
-def normalize_kkp_for_dashboard(df):
-    df = df.copy()
+    def _request(self, method, url, **kwargs):
+        resp = self.session.request(
+            method,
+            f"{self.API_URL}/repos/{self.repo_name}{url}",
+            timeout=60,
+            **kwargs
+        )
+        resp.raise_for_status()
+        return resp
+
+    def _get(self, url, **kwargs):
+        return self._request("GET", url, **kwargs)
+
+    def _branch(self):
+        if self.branch is None:
+            self.branch = self._get("").json()["default_branch"]
+        return self.branch
+
+    def _fetch_tree(self, tree_sha, prefix=""):
+        data = self._get(f"/git/trees/{tree_sha}", params={"recursive": 1}).json()
+
+        if data.get("truncated") and not prefix:
+            # repo terlalu besar untuk 1 respons → ambil per folder data
+            root = self._get(f"/git/trees/{tree_sha}").json()["tree"]
+            tree = {}
+            for item in root:
+                if item["type"] == "tree" and item["path"] in REPO_DATA_FOLDERS + ["templates"]:
+                    tree.update(self._fetch_tree(item["sha"], prefix=item["path"] + "/"))
+                elif item["type"] == "blob":
+                    tree[item["path"]] = RepoFile(
+                        item["path"], item["path"], item["sha"], item.get("size", 0)
+                    )
+            return tree
 
-    # Bulan & Tahun
-    df["Bulan"] = df["Periode"].dt.strftime("%Y-%m")
-    df["Tahun"] = df["Periode"].dt.year
+        return {
+            prefix + item["path"]: RepoFile(
+                prefix + item["path"],
+                os.path.basename(item["path"]),
+                item["sha"],
+                item.get("size", 0),
+            )
+            for item in data["tree"]
+            if item["type"] == "blob"
+        }
 
-    # Pastikan string rapi
-    for col in ["BA/KL", "Satker", "Nama Pemegang KKP", "Bank Penerbit KKP"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
+    def tree(self, refresh=False):
+        """{path: RepoFile} seluruh repo, di-cache REPO_TREE_TTL detik."""
+        if refresh or self._tree is None or time.time() - self._tree_at > REPO_TREE_TTL:
+            self._tree = self._fetch_tree(self._branch())
+            self._tree_at = time.time()
+        return self._tree
+
+    def invalidate(self):
+        """Paksa listing ulang (dipanggil setelah menulis ke repo)."""
+        self._tree = None
+
+    def list(self, folder):
+        """File langsung di dalam folder (tidak rekursif)."""
+        prefix = folder.rstrip("/") + "/"
+        files = [
+            f for path, f in self.tree().items()
+            if path.startswith(prefix) and "/" not in path[len(prefix):]
+        ]
+        if not files:
+            raise FileNotFoundError(folder)
+        return sorted(files, key=lambda f: f.name)
 
-    return df
+    def get(self, path):
+        try:
+            return self.tree()[path]
+        except KeyError:
+            raise FileNotFoundError(path)
+
+    def read(self, f):
+        """Bytes isi file (RepoFile atau path) lewat git blobs API, media type raw."""
+        if isinstance(f, str):
+            f = self.get(f)
+        resp = self._get(
+            f"/git/blobs/{f.sha}",
+            headers={"Accept": "application/vnd.github.raw"},
+        )
+        return resp.content
 
+    def _current_sha(self, path, expected_sha):
+        current = self.tree().get(path)
+        current_sha = current.sha if current else None
+        if expected_sha is not None and current_sha != expected_sha:
+            raise StorageConflictError(path)
+        return current_sha
 
-# ============================================================
-# LOAD DATA KKP FROM GITHUB
-# ============================================================
-def load_kkp_master_from_github():
+    def write(self, path, content_bytes, message=None, expected_sha=None):
+        """
+        Buat / timpa file. expected_sha = SHA yang diharapkan saat ini
+        (optimistic lock). Return RepoFile hasil tulis.
+        """
+        name = os.path.basename(path)
+
+        for attempt in range(2):
+            current_sha = self._current_sha(path, expected_sha)
+            body = {
+                "message": message or f"{'Update' if current_sha else 'Create'} {name}",
+                "content": base64.b64encode(content_bytes).decode(),
+                "branch": self._branch(),
+            }
+            if current_sha:
+                body["sha"] = current_sha
 
-    token = st.secrets.get("GITHUB_TOKEN")
-    repo_name = st.secrets.get("GITHUB_REPO")
+            try:
+                resp = self._request("PUT", f"/contents/{quote(path)}", json=body)
+                break
+            except requests.HTTPError as e:
+                # tree cache basi (file diubah di luar app) → listing ulang 1x
+                if e.response.status_code not in (409, 422) or attempt or expected_sha:
+                    raise
+                self.tree(refresh=True)
+
+        self.invalidate()
+        return RepoFile(path, name, resp.json()["content"]["sha"], len(content_bytes))
+
+    def write_many(self, files, message, max_attempts=3):
+        """
+        Tulis banyak file dalam SATU commit (Git Data API):
+        blob → tree (base = tree HEAD) → commit → update ref.
+        Ref berubah di tengah jalan (push lain) → ulang dari HEAD terbaru;
+        blob tidak perlu diupload ulang. Semua file masuk atau tidak sama sekali.
+        files: {path: bytes | None}; None = hapus file (jika ada) di commit yang sama.
+        Return {path: RepoFile} untuk file yang ditulis.
+        """
+        writes = {path: content for path, content in files.items() if content is not None}
+        deletes = [path for path, content in files.items() if content is None]
+        if deletes:
+            existing = self.tree(refresh=True)
+            deletes = [path for path in deletes if path in existing]
+
+        with ThreadPoolExecutor(max_workers=LOADER_MAX_WORKERS) as pool:
+            blob_shas = dict(zip(writes, pool.map(self._create_blob, writes.values())))
+
+        branch = quote(self._branch())
+
+        for attempt in range(max_attempts):
+            head = self._get(f"/git/ref/heads/{branch}").json()["object"]["sha"]
+            base_tree = self._get(f"/git/commits/{head}").json()["tree"]["sha"]
+
+            tree = self._request("POST", "/git/trees", json={
+                "base_tree": base_tree,
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+                    for path, sha in blob_shas.items()
+                ] + [
+                    {"path": path, "mode": "100644", "type": "blob", "sha": None}
+                    for path in deletes
+                ],
+            }).json()["sha"]
+
+            commit = self._request("POST", "/git/commits", json={
+                "message": message,
+                "tree": tree,
+                "parents": [head],
+            }).json()["sha"]
 
-    if not token or not repo_name:
-        st.session_state.kkp_master = pd.DataFrame()
-        return False
+            try:
+                self._request(
+                    "PATCH", f"/git/refs/heads/{branch}", json={"sha": commit, "force": False}
+                )
+                break
+            except requests.HTTPError as e:
+                # 401 / 403 / 5xx dll. bukan konflik → diteruskan apa adanya
+                if e.response is None or e.response.status_code not in (409, 422):
+                    raise
+                # bukan fast-forward → branch maju sejak HEAD dibaca
+                if attempt == max_attempts - 1:
+                    raise StorageConflictError(self._branch()) from e
+
+        self.invalidate()
+        return {
+            path: RepoFile(path, os.path.basename(path), blob_shas[path], len(content))
+            for path, content in writes.items()
+        }
 
-    try:
-        g = Github(auth=Auth.Token(token))
-        repo = g.get_repo(repo_name)
+    def _create_blob(self, content_bytes):
+        return self._request("POST", "/git/blobs", json={
+            "content": base64.b64encode(content_bytes).decode(),
+            "encoding": "base64",
+        }).json()["sha"]
+
+    def delete(self, path, message=None, expected_sha=None):
+        current_sha = self._current_sha(path, expected_sha)
+        if current_sha is None:
+            raise FileNotFoundError(path)
+
+        self._request(
+            "DELETE",
+            f"/contents/{quote(path)}",
+            json={
+                "message": message or f"Delete {os.path.basename(path)}",
+                "sha": current_sha,
+                "branch": self._branch(),
+            },
+        )
+        self.invalidate()
 
-        file_path = "data_kkp/KKP_MASTER.xlsx"
-        file = repo.get_contents(file_path)
 
-        file_bytes = base64.b64decode(file.content)
-        df_master = pd.read_excel(io.BytesIO(file_bytes))
+class LocalStorage:
+    """
+    Storage berbasis folder lokal (checkout repo ini, mode offline, uji beban).
+    SHA dihitung seperti git (blob SHA) sehingga cache tetap konsisten.
+    """
 
-        st.session_state.kkp_master = df_master
-        return True
+    def __init__(self, root):
+        self.root = Path(root)
+        self._sha_cache = {}
+
+    def _sha(self, path):
+        stat = path.stat()
+        key = (str(path), stat.st_mtime_ns, stat.st_size)
+        if key not in self._sha_cache:
+            self._sha_cache[key] = git_blob_sha(path.read_bytes())
+        return self._sha_cache[key]
+
+    def _file(self, path, full):
+        return RepoFile(path, full.name, self._sha(full), full.stat().st_size)
+
+    def tree(self, refresh=False):
+        tree = {}
+        for folder in REPO_DATA_FOLDERS + ["templates"]:
+            base = self.root / folder
+            if not base.is_dir():
+                continue
+            for full in base.rglob("*"):
+                if full.is_file():
+                    rel = full.relative_to(self.root).as_posix()
+                    tree[rel] = self._file(rel, full)
+        return tree
 
-    except Exception:
-        # Jika file memang belum ada
-        st.session_state.kkp_master = pd.DataFrame()
-        return False
+    def invalidate(self):
+        pass
 
+    def list(self, folder):
+        base = self.root / folder
+        if not base.is_dir():
+            raise FileNotFoundError(folder)
+        return sorted(
+            (self._file(f"{folder}/{p.name}", p) for p in base.iterdir() if p.is_file()),
+            key=lambda f: f.name,
+        )
 
-# Selalu load setiap app jalan (tidak pakai flag session)
-load_success = load_kkp_master_from_github()
+    def get(self, path):
+        full = self.root / path
+        if not full.is_file():
+            raise FileNotFoundError(path)
+        return self._file(path, full)
+
+    def read(self, f):
+        path = f if isinstance(f, str) else f.path
+        return (self.root / path).read_bytes()
+
+    def _check_expected(self, path, expected_sha):
+        if expected_sha is None:
+            return
+        full = self.root / path
+        current_sha = self._sha(full) if full.is_file() else None
+        if current_sha != expected_sha:
+            raise StorageConflictError(path)
+
+    def write(self, path, content_bytes, message=None, expected_sha=None):
+        self._check_expected(path, expected_sha)
+
+        full = self.root / path
+        full.parent.mkdir(parents=True, exist_ok=True)
+        tmp = full.with_name(f".{full.name}.{uuid.uuid4().hex}.tmp")
+        tmp.write_bytes(content_bytes)
+        os.replace(tmp, full)
+        return self._file(path, full)
+
+    def write_many(self, files, message=None, max_attempts=None):
+        """Semua file ditulis ke tmp dulu, baru di-rename (hampir atomik); None = hapus."""
+        writes = {path: content for path, content in files.items() if content is not None}
+        staged = []
+        try:
+            for path, content in writes.items():
+                full = self.root / path
+                full.parent.mkdir(parents=True, exist_ok=True)
+                tmp = full.with_name(f".{full.name}.{uuid.uuid4().hex}.tmp")
+                tmp.write_bytes(content)
+                staged.append((tmp, full))
+        except Exception:
+            for tmp, _ in staged:
+                tmp.unlink(missing_ok=True)
+            raise
 
-if load_success:
-    add_notification("Database utama KKP berhasil dimuat dari GitHub")
-else:
-    st.info("ℹ️ Belum ada database utama KKP di GitHub")
+        for tmp, full in staged:
+            os.replace(tmp, full)
+        for path in files.keys() - writes.keys():
+            (self.root / path).unlink(missing_ok=True)
+        return {path: self._file(path, self.root / path) for path in writes}
 
+    def delete(self, path, message=None, expected_sha=None):
+        self._check_expected(path, expected_sha)
 
-# ============================================================
+        full = self.root / path
+        if not full.is_file():
+            raise FileNotFoundError(path)
+        full.unlink()
+
+
+@st.cache_resource
+def get_storage():
+    """
+    Storage bersama (1 session HTTP untuk semua sesi).
+    STORAGE_BACKEND = "github" | "local"; LOCAL_STORAGE_DIR untuk mode lokal
+    (default: folder aplikasi ini). Return None jika GitHub dipilih tapi
+    belum dikonfigurasi.
+    """
+    token = st.secrets.get("GITHUB_TOKEN")
+    repo_name = st.secrets.get("GITHUB_REPO")
+
+    backend = st.secrets.get("STORAGE_BACKEND")
+    if backend is None:
+        backend = "github" if token and repo_name else "local"
+
+    if backend == "local":
+        root = st.secrets.get("LOCAL_STORAGE_DIR", Path(__file__).resolve().parent)
+        return LocalStorage(root)
+
+    if not token or not repo_name:
+        return None
+
+    return GitHubStorage(token, repo_name, branch=st.secrets.get("GITHUB_BRANCH"))
+
+
+# ============================
+#  CACHE DISK (KEY = BLOB SHA GITHUB)
+# ============================
+# Hasil parse + post-proses disimpan per blob SHA. File yang tidak berubah
+# tidak perlu di-download / di-parse ulang setelah restart.
+DATA_CACHE_DIR = Path(st.secrets.get("DATA_CACHE_DIR", ".cache/github_blobs"))
+DATA_CACHE_MAX_MB = int(st.secrets.get("DATA_CACHE_MAX_MB", 512))
+
+
+def _blob_cache_path(namespace, sha, salt=""):
+    key = f"{namespace}-{sha}-{salt}" if salt else f"{namespace}-{sha}"
+    return DATA_CACHE_DIR / f"{key}.pkl"
+
+
+def blob_cache_get(namespace, sha, salt=""):
+    """Ambil DataFrame (atau nilai kecil, mis. source_sha) dari cache disk; None jika belum ada / rusak."""
+    path = _blob_cache_path(namespace, sha, salt)
+
+    if not path.exists():
+        return None
+
+    try:
+        df = pd.read_pickle(path)
+    except Exception:
+        path.unlink(missing_ok=True)
+        return None
+
+    # LRU: tandai baru dipakai
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return df
+
+
+def blob_cache_put(namespace, sha, df, salt=""):
+    """Simpan DataFrame / nilai ke cache disk (atomic) lalu jalankan eviction LRU."""
+    try:
+        DATA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        path = _blob_cache_path(namespace, sha, salt)
+        tmp = path.with_name(f"{path.stem}.{uuid.uuid4().hex}.tmp")
+        pd.to_pickle(df, tmp)
+        os.replace(tmp, path)
+    except Exception:
+        return
+
+    evict_blob_cache()
+
+
+def evict_blob_cache(max_mb=None):
+    """Hapus file cache paling lama dipakai sampai total ukuran <= batas."""
+    limit = (max_mb or DATA_CACHE_MAX_MB) * 1024 * 1024
+
+    try:
+        entries = [
+            (p.stat().st_mtime, p.stat().st_size, p)
+            for p in DATA_CACHE_DIR.glob("*.pkl")
+        ]
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in sorted(entries):
+        if total <= limit:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+
+
+def reference_cache_salt():
+    """
+    Sidik jari referensi satker di session.
+    Dipakai sebagai salt cache untuk hasil yang bergantung pada referensi.
+    """
+    ref = st.session_state.get("reference_df")
+    if ref is None or ref.empty:
+        return "noref"
+
+    cols = [c for c in ["Kode Satker", "Uraian Satker-SINGKAT"] if c in ref.columns]
+    digest = pd.util.hash_pandas_object(ref[cols].astype(str), index=False).values
+    return hashlib.sha1(digest.tobytes()).hexdigest()[:12]
+
+
+def ikpa_cache_salt():
+    """Salt cache IKPA Satker: referensi + DIPA yang sudah termuat."""
+    h = hashlib.sha1(reference_cache_salt().encode())
+
+    for tahun, df in sorted(st.session_state.get("DATA_DIPA_by_year", {}).items()):
+        pagu = pd.to_numeric(df.get("Total Pagu", 0), errors="coerce").sum()
+        h.update(f"{tahun}:{len(df)}:{pagu}".encode())
+
+    return h.hexdigest()[:12]
+
+
+# ============================
+#  LOADER PARALEL (DOWNLOAD + PARSE)
+# ============================
+# Jumlah worker loader, bisa diatur lewat Streamlit Secrets (LOADER_MAX_WORKERS)
+LOADER_MAX_WORKERS = int(st.secrets.get("LOADER_MAX_WORKERS", 8))
+
+
+@st.cache_resource
+def get_loader_stats():
+    """
+    Statistik loader terakhir per dataset (durasi, jumlah file, error).
+    Disimpan di cache_resource supaya tetap terbaca walau loader kena cache.
+    """
+    return {}
+
+
+# forkserver / spawn: worker tidak mewarisi lock milik thread lain di server
+# (loop Tornado, lock DatasetStore, import pandas/openpyxl) seperti pada fork.
+# Worker hanya meng-import ikpa_workers, bukan skrip ini (parse_pool_context).
+PARSE_POOL_CONTEXT = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+@st.cache_resource(validate=lambda pool: not getattr(pool, "_broken", False))
+def get_parse_pool():
+    """
+    Pool proses bersama untuk parsing Excel (CPU-bound), dibuat sekali per
+    server dan dipakai semua sesi, prefetch, dan upload (jangan di-shutdown /
+    dipakai dengan `with`). Pool yang rusak dibuat ulang pada pemanggilan berikutnya.
+    """
+    max_workers = max(1, min(LOADER_MAX_WORKERS, os.cpu_count() or 1))
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=parse_pool_context(PARSE_POOL_CONTEXT),
+        initializer=configure_workers,
+        initargs=(EXCEL_ENGINE, UPLOAD_CHUNK_ROWS),
+    )
+
+
+class ParsePoolStats:
+    """Jumlah tugas parse pool yang dijalankan ulang di proses utama (+ error terakhir)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fallbacks = 0
+        self.last_error = None
+
+    def record_fallback(self, fn, error):
+        with self._lock:
+            self.fallbacks += 1
+            self.last_error = f"{fn.__name__}: {error!r}"
+
+
+@st.cache_resource
+def get_parse_pool_stats():
+    return ParsePoolStats()
+
+
+def parse_pool_result(future, fn, *args):
+    """
+    Hasil `future` dari get_parse_pool. Gagal (pool mati, tidak bisa
+    di-pickle, error di worker) → fn(*args) di proses ini; tiap fallback
+    dihitung di get_parse_pool_stats (tampil di statistik loader).
+    """
+    try:
+        return future.result()
+    except Exception as e:
+        get_parse_pool_stats().record_fallback(fn, e)
+        return fn(*args)
+
+
+def fetch_excel_files_parallel(files, max_workers=None, read_kwargs=None, storage=None):
+    """
+    Download blob repo (thread pool) lalu parse Excel / Parquet (process pool).
+    Error per file dikumpulkan, tidak di-skip diam-diam.
+    Return: (frames {nama_file: DataFrame}, errors {nama_file: pesan})
+    """
+    max_workers = max_workers or LOADER_MAX_WORKERS
+    read_kwargs = read_kwargs or {}
+    storage = storage or get_storage()
+
+    frames = {}
+    errors = {}
+
+    if not files:
+        return frames, errors
+
+    def download(f):
+        return storage.read(f)
+
+    cpu_pool = get_parse_pool()
+    with ThreadPoolExecutor(max_workers=max_workers) as io_pool:
+
+        downloads = {io_pool.submit(download, f): f.name for f in files}
+        parses = {}
+        raw_by_name = {}
+
+        # parse langsung dikirim begitu download selesai
+        for fut in as_completed(downloads):
+            name = downloads[fut]
+            try:
+                raw = fut.result()
+            except Exception as e:
+                errors[name] = f"download gagal: {e}"
+                continue
+
+            raw_by_name[name] = raw
+            parses[cpu_pool.submit(read_table_bytes, raw, name, read_kwargs)] = name
+
+        for fut in as_completed(parses):
+            name = parses[fut]
+            try:
+                frames[name] = parse_pool_result(
+                    fut, read_table_bytes, raw_by_name[name], name, read_kwargs
+                )
+            except Exception as e:
+                errors[name] = f"parse gagal: {e}"
+
+    return frames, errors
+
+
+def load_blob_frames(files, namespace, post_process=None, salt="",
+                     max_workers=None, read_kwargs=None, storage=None):
+    """
+    Load banyak file data repo (RepoFile) dengan cache disk per blob SHA.
+    - Cache hit  → tidak download / parse
+    - Cache miss → fetch_excel_files_parallel → post_process → simpan cache
+    Return: (frames {nama_file: DataFrame}, errors {nama_file: pesan}, jumlah_cache_hit)
+    """
+    frames = {}
+    missing = []
+
+    for f in files:
+        cached = blob_cache_get(namespace, f.sha, salt)
+        if cached is None:
+            missing.append(f)
+        else:
+            frames[f.name] = cached
+
+    hits = len(frames)
+    sha_by_name = {f.name: f.sha for f in missing}
+
+    raw_frames, errors = fetch_excel_files_parallel(missing, max_workers, read_kwargs, storage)
+
+    # post-proses di thread utama (boleh akses session_state)
+    for name in sorted(raw_frames):
+        try:
+            df = raw_frames[name]
+            if post_process is not None:
+                df = post_process(df)
+            frames[name] = df
+            blob_cache_put(namespace, sha_by_name[name], df, salt)
+        except Exception as e:
+            errors[name] = str(e)
+
+    return frames, errors, hits
+
+
+def format_loader_stats(dataset):
+    """Teks ringkas durasi loader untuk notifikasi loading."""
+    stats = get_loader_stats().get(dataset)
+    if not stats:
+        return ""
+    fallbacks = stats.get("pool_fallbacks", 0)
+    return (
+        f" ({stats['loaded']}/{stats['files']} file, "
+        f"{stats.get('cached', 0)} dari cache, {stats['seconds']:.1f} detik"
+        + (f", {fallbacks} file diparse di luar pool" if fallbacks else "")
+        + ")"
+    )
+
+
+# ============================
+#  LOAD DATA IKPA DARI GITHUB
+# ============================
+IKPA_REQUIRED_COLUMNS = [
+    "No", "Kode KPPN", "Kode BA", "Kode Satker", "Uraian Satker",
+    "Kualitas Perencanaan Anggaran",
+    "Kualitas Pelaksanaan Anggaran",
+    "Kualitas Hasil Pelaksanaan Anggaran",
+    "Revisi DIPA", "Deviasi Halaman III DIPA",
+    "Penyerapan Anggaran", "Belanja Kontraktual",
+    "Penyelesaian Tagihan", "Pengelolaan UP dan TUP",
+    "Capaian Output",
+    "Nilai Total", "Konversi Bobot",
+    "Dispensasi SPM (Pengurang)",
+    "Nilai Akhir (Nilai Total/Konversi Bobot)",
+    "Bulan", "Tahun"
+]
+
+
+def post_process_ikpa_github(df):
+    """
+    Proses lanjutan 1 file IKPA Satker hasil baca GitHub.
+    Return: ((BULAN, TAHUN), DataFrame)
+    Raise ValueError jika kolom wajib tidak lengkap.
+    """
+    MONTH_ORDER = {
+        "JANUARI": 1, "FEBRUARI": 2, "MARET": 3, "APRIL": 4,
+        "MEI": 5, "JUNI": 6, "JULI": 7, "AGUSTUS": 8,
+        "SEPTEMBER": 9, "OKTOBER": 10, "NOVEMBER": 11, "DESEMBER": 12
+    }
+
+    # ===============================
+    # 🔥 RESET HASIL LAMA (WAJIB)
+    # ===============================
+    df = df.copy()
+
+    for col in ["Uraian Satker-RINGKAS", "Uraian Satker Final", "Satker"]:
+        if col in df.columns:
+            df.drop(columns=[col], inplace=True)
+
+    # ===============================
+    # VALIDASI KOLOM WAJIB
+    # ===============================
+    missing = [col for col in IKPA_REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"kolom wajib tidak ada: {', '.join(missing)}")
+
+    month = str(df["Bulan"].iloc[0]).upper()
+    year = str(df["Tahun"].iloc[0])
+    key = (month, year)
+
+    df["Bulan"] = month
+    df["Tahun"] = year
+
+    # ===============================
+    # NORMALISASI KODE SATKER
+    # ===============================
+    # sidecar Parquet sudah menyimpan kode 6 digit (string) → tidak perlu ulang
+    kode = df["Kode Satker"]
+    already_normalized = (
+        pd.api.types.is_string_dtype(kode)
+        and kode.str.fullmatch(r"\d{6}").eq(True).all()
+    )
+    if not already_normalized:
+        df["Kode Satker"] = normalize_kode_satker_series(kode.astype(str))
+
+    # =====================================================
+    # 🔑 PAKSA URAIAN SATKER RINGKAS (FIX UTAMA)
+    # =====================================================
+    df = apply_reference_short_names(df)
+    df = create_satker_column(df)
+
+    # ===============================
+    # NORMALISASI NUMERIK
+    # ===============================
+    numeric_cols = [
+        "Nilai Akhir (Nilai Total/Konversi Bobot)",
+        "Nilai Total", "Konversi Bobot",
+        "Revisi DIPA", "Deviasi Halaman III DIPA",
+        "Penyerapan Anggaran", "Belanja Kontraktual",
+        "Penyelesaian Tagihan", "Pengelolaan UP dan TUP",
+        "Capaian Output",
+        "Kualitas Perencanaan Anggaran",
+        "Kualitas Pelaksanaan Anggaran",
+        "Kualitas Hasil Pelaksanaan Anggaran",
+    ]
+
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    month_num = MONTH_ORDER.get(month, 0)
+
+    df["Source"] = "GitHub"
+    df["Period"] = f"{month} {year}"
+    df["Period_Sort"] = f"{int(year):04d}-{month_num:02d}"
+
+    # ===============================
+    # RANKING DENSE
+    # ===============================
+    nilai_col = "Nilai Akhir (Nilai Total/Konversi Bobot)"
+    df = df.sort_values(nilai_col, ascending=False)
+    df["Peringkat"] = (
+        df[nilai_col]
+        .rank(method="dense", ascending=False)
+        .astype(int)
+    )
+
+    # ===============================
+    # MERGE DIPA + JENIS SATKER
+    # ===============================
+    df = merge_ikpa_with_dipa(df)
+
+    if "Jenis Satker" in df.columns:
+        df = df.drop(columns=["Jenis Satker"])
+
+    df = classify_jenis_satker(df)
+
+    return key, df
+
+
+def list_ikpa_files():
+    """
+    Listing file IKPA Satker di GitHub (/data).
+    Sidecar .parquet dipilih jika ada, fallback ke xlsx.
+    Folder tidak ada (file terakhir dihapus) = listing kosong.
+    Return None jika GitHub tidak dapat diakses.
+    """
+    storage = get_storage()
+    if storage is None:
+        return None
+
+    try:
+        contents = storage.list("data")
+    except FileNotFoundError:
+        contents = []
+    except Exception:
+        return None
+
+    return prefer_sidecar_files(contents, storage=storage)
+
+
+def sync_ikpa_storage(max_workers=None):
+    """
+    Sinkronisasi inkremental dataset data_storage (store bersama) dengan /data.
+    Nama + SHA file dibandingkan dengan indeks (ikpa_file_index):
+    - file baru / berubah → download + post-proses periode itu saja
+    - file hilang         → periode dihapus dari data_storage
+    - file tidak berubah  → dibiarkan
+    Hasil dipublish sebagai versi baru store.
+    Return: list key (BULAN, TAHUN) yang dimuat ulang.
+    """
+    files = list_ikpa_files()
+    if files is None:
+        return []
+
+    store = get_dataset_store()
+
+    # 1 sync pada satu waktu untuk seluruh proses
+    with store.loading("data_storage"):
+        started = time.perf_counter()
+        fallbacks = get_parse_pool_stats().fallbacks
+
+        index = dict(store.current()[1].get("ikpa_file_index", {}))
+        removed = []
+        updated = {}
+
+        remote = {os.path.splitext(f.name)[0]: f for f in files}
+        to_fetch = [
+            f for stem, f in remote.items()
+            if index.get(stem, {}).get("sha") != f.sha
+        ]
+
+        # ===============================
+        # FILE YANG SUDAH TIDAK ADA
+        # ===============================
+        for stem in [s for s in index if s not in remote]:
+            old_key = index.pop(stem)["key"]
+            if all(entry["key"] != old_key for entry in index.values()):
+                removed.append(old_key)
+
+        # ===============================
+        # FILE BARU / BERUBAH
+        # ===============================
+        frames, errors, hits = load_blob_frames(
+            to_fetch,
+            namespace="ikpa",
+            post_process=lambda df: post_process_ikpa_github(df)[1],
+            salt=ikpa_cache_salt(),
+            max_workers=max_workers,
+        )
+
+        for f in to_fetch:
+            if f.name not in frames:
+                continue  # gagal → indeks tidak diubah, dicoba lagi di sync berikutnya
+
+            df = frames[f.name]
+            key = (str(df["Bulan"].iloc[0]), str(df["Tahun"].iloc[0]))
+            stem = os.path.splitext(f.name)[0]
+
+            old = index.get(stem)
+            if old and old["key"] != key:
+                removed.append(old["key"])
+
+            updated[key] = df
+            index[stem] = {"sha": f.sha, "key": key}
+
+        update_dataset_items("data_storage", updated, remove=removed)
+        publish_datasets(ikpa_file_index=index)
+
+    get_loader_stats()["ikpa"] = {
+        "files": len(to_fetch),
+        "loaded": len(updated),
+        "cached": hits,
+        "errors": errors,
+        "pool_fallbacks": get_parse_pool_stats().fallbacks - fallbacks,
+        "seconds": time.perf_counter() - started,
+    }
+
+    return list(updated)
+
+
+# ============================================================
+# 📚 TABEL FAKTA IKPA SATKER (SEMUA PERIODE)
+# ============================================================
+# Satu tabel panjang (baris = satker × periode) dari data_storage, dibangun
+# sekali per versi data (DatasetStore.derived) dan dibagi ke semua sesi.
+# View membaca lewat query_ikpa_facts, bukan pd.concat data_storage sendiri.
+#   Periode  : int32 YYYYMM (kunci urut & filter rentang)
+#   satker_id: int32 (kunci dimensi satker)
+#   kode/nama: categorical; indikator: float32 (nilai IKPA 2 desimal)
+IKPA_INDICATORS = [
+    "Kualitas Perencanaan Anggaran", "Kualitas Pelaksanaan Anggaran",
+    "Kualitas Hasil Pelaksanaan Anggaran",
+    "Revisi DIPA", "Deviasi Halaman III DIPA", "Penyerapan Anggaran",
+    "Belanja Kontraktual", "Penyelesaian Tagihan", "Pengelolaan UP dan TUP",
+    "Capaian Output", "Dispensasi SPM (Pengurang)",
+    "Nilai Akhir (Nilai Total/Konversi Bobot)",
+]
+IKPA_DECIMALS = 2
+
+IKPA_MONTHS = [
+    "JANUARI", "FEBRUARI", "MARET", "APRIL", "MEI", "JUNI",
+    "JULI", "AGUSTUS", "SEPTEMBER", "OKTOBER", "NOVEMBER", "DESEMBER",
+]
+# singkatan yang tidak ada di MONTH_ORDER / VALID_MONTHS
+IKPA_MONTH_ALIASES = {"JAN": 1, "FEB": 2, "APR": 4, "JUN": 6, "JUL": 7, "AGT": 8, "OKT": 10, "DES": 12}
+
+IKPA_FACT_DIMENSIONS = ["Kode BA", "Kode Satker", "Uraian Satker", "Uraian Satker-RINGKAS"]
+IKPA_FACT_COLUMNS = ["Periode", "Period_Sort", "Tahun", "Bulan", SATKER_ID] + IKPA_FACT_DIMENSIONS + IKPA_INDICATORS
+
+
+def ikpa_month_number(bulan):
+    """Nomor bulan 1–12 dari nama / singkatan bulan; 0 jika tidak dikenal."""
+    m = str(bulan).strip().upper()
+    m = VALID_MONTHS.get(m, m)
+    return MONTH_ORDER.get(m) or IKPA_MONTH_ALIASES.get(m, 0)
+
+
+def ikpa_period_key(tahun, bulan):
+    """Kunci periode int YYYYMM (bulan = nama atau nomor)."""
+    month = bulan if isinstance(bulan, (int, np.integer)) else ikpa_month_number(bulan)
+    return int(tahun) * 100 + int(month)
+
+
+def build_ikpa_fact_table(data_storage):
+    """Tabel fakta dari dict {(BULAN, TAHUN): DataFrame periode}."""
+    frames = []
+    for (bulan, tahun), df in (data_storage or {}).items():
+        try:
+            key = ikpa_period_key(tahun, bulan)
+        except (TypeError, ValueError):
+            continue
+
+        month = key % 100
+        part = df.reindex(columns=[SATKER_ID] + IKPA_FACT_DIMENSIONS + IKPA_INDICATORS)
+        part.insert(0, "Periode", key)
+        part.insert(1, "Bulan", IKPA_MONTHS[month - 1] if month else str(bulan).strip().upper())
+        frames.append(part)
+
+    if not frames:
+        return pd.DataFrame(columns=IKPA_FACT_COLUMNS).astype({
+            "Periode": "int32", "Tahun": "int16", SATKER_ID: "int32",
+            **dict.fromkeys(IKPA_INDICATORS, "float32"),
+        })
+
+    facts = pd.concat(frames, ignore_index=True)
+
+    periode = facts["Periode"].astype("int32")
+    labels = {p: f"{p // 100:04d}-{p % 100:02d}" for p in periode.unique()}
+
+    return pd.DataFrame({
+        "Periode": periode,
+        "Period_Sort": pd.Categorical(periode.map(labels)),
+        "Tahun": (periode // 100).astype("int16"),
+        "Bulan": pd.Categorical(facts["Bulan"]),
+        SATKER_ID: satker_ids(facts),
+        "Kode BA": pd.Categorical(normalize_kode_ba_series(facts["Kode BA"])),
+        "Kode Satker": pd.Categorical(normalize_kode_satker_series(facts["Kode Satker"])),
+        "Uraian Satker": pd.Categorical(facts["Uraian Satker"]),
+        "Uraian Satker-RINGKAS": pd.Categorical(facts["Uraian Satker-RINGKAS"]),
+        **{
+            col: pd.to_numeric(facts[col], errors="coerce").astype("float32")
+            for col in IKPA_INDICATORS
+        },
+    })
+
+
+def ikpa_fact_table():
+    """Tabel fakta untuk data_storage sesi ini (dibangun sekali per versi data)."""
+    return get_dataset_store().derived(
+        "ikpa_facts",
+        st.session_state.get("data_storage") or {},
+        build_ikpa_fact_table,
+    )
+
+
+def query_ikpa_facts(start=None, end=None, ba=None, satker=None, facts=None):
+    """
+    Potongan tabel fakta IKPA Satker:
+    - start / end : kunci periode YYYYMM (inklusif), None = tanpa batas
+    - ba / satker : daftar Kode BA / Kode Satker, None = semua
+    Kolom kode & nama dikembalikan sebagai teks biasa dan indikator sebagai
+    float64 (dibulatkan IKPA_DECIMALS) → siap dipakai view tanpa konversi.
+    """
+    if facts is None:
+        facts = ikpa_fact_table()
+
+    mask = np.ones(len(facts), dtype=bool)
+    periode = facts["Periode"].to_numpy()
+    if start is not None:
+        mask &= periode >= start
+    if end is not None:
+        mask &= periode <= end
+    if ba is not None:
+        mask &= facts["Kode BA"].isin(list(ba)).to_numpy()
+    if satker is not None:
+        mask &= facts["Kode Satker"].isin(list(satker)).to_numpy()
+
+    out = facts[mask]
+    return out.assign(**{
+        col: out[col].astype(object)
+        for col in out.columns if isinstance(out[col].dtype, pd.CategoricalDtype)
+    }, **{
+        col: out[col].astype("float64").round(IKPA_DECIMALS)
+        for col in IKPA_INDICATORS
+    }).reset_index(drop=True)
+
+
+# ============================================================
+# 🧭 DIMENSI SATKER
+# ============================================================
+# Satu baris per satker, index = satker_id (int32, urut). Atribut diambil
+# dari sumber pertama yang mengisi: referensi → DIPA (terbaru) → IKPA Satker
+# (terbaru). Kode KPPN hanya ada di IKPA Satker; Uraian Satker-SINGKAT hanya
+# dari referensi (NaN = satker di luar referensi).
+SATKER_DIM_COLUMNS = ["Kode Satker", "Uraian Satker-SINGKAT", "Uraian Satker", "Kode BA", "Kode KPPN"]
+
+
+def build_satker_dimension(reference_df=None, dipa_by_year=None, data_storage=None):
+    """Dimensi satker dari referensi, DIPA {tahun: df} dan data_storage IKPA."""
+    parts = []
+
+    if reference_df is not None and not reference_df.empty:
+        parts.append(pd.DataFrame({
+            "Kode Satker": reference_df["Kode Satker"],
+            "Uraian Satker-SINGKAT": reference_df.get("Uraian Satker-SINGKAT"),
+            "Uraian Satker": reference_df.get("Uraian Satker-LENGKAP"),
+            "Kode BA": reference_df.get("Kode BA"),
+        }))
+
+    for tahun in sorted(dipa_by_year or {}, reverse=True):
+        df = dipa_by_year[tahun]
+        parts.append(pd.DataFrame({
+            "Kode Satker": df["Kode Satker"],
+            "Uraian Satker": df.get("Satker"),
+            "Kode BA": df.get("Kementerian"),
+        }))
+
+    storage = data_storage or {}
+    for key in sorted(storage, key=lambda k: (str(k[1]), ikpa_month_number(k[0])), reverse=True):
+        parts.append(storage[key].reindex(columns=["Kode Satker", "Uraian Satker", "Kode BA", "Kode KPPN"]))
+
+    if not parts:
+        return pd.DataFrame(columns=SATKER_DIM_COLUMNS, index=pd.Index([], dtype="int32", name=SATKER_ID))
+
+    rows = pd.concat(parts, ignore_index=True).reindex(columns=SATKER_DIM_COLUMNS)
+    rows = rows.replace(["", "nan", "None"], np.nan)
+    rows[SATKER_ID] = satker_id_series(rows["Kode Satker"]).to_numpy()
+    rows = rows[rows[SATKER_ID] != SATKER_ID_UNKNOWN]
+
+    # groupby.first = nilai non-kosong pertama per kolom (urutan sumber = prioritas)
+    dim = rows.groupby(SATKER_ID, sort=True).first()
+    dim["Kode Satker"] = [f"{i:06d}" for i in dim.index]
+    dim["Kode BA"] = normalize_kode_ba_series(dim["Kode BA"])
+    dim["Kode KPPN"] = normalize_kode_ba_series(dim["Kode KPPN"])   # kode 3 digit, sama seperti BA
+    return dim
+
+
+def satker_dimension():
+    """Dimensi satker sesi ini (dibangun sekali per versi referensi / DIPA / IKPA)."""
+    state = st.session_state
+    return get_dataset_store().derived(
+        "satker_dim",
+        (state.get("reference_df"), state.get("DATA_DIPA_by_year"), state.get("data_storage")),
+        lambda sources: build_satker_dimension(*sources),
+    )
+
+
+def satker_attr(ids, column, dim=None):
+    """Atribut dimensi satker untuk array satker_id (NaN jika tidak dikenal)."""
+    dim = satker_dimension() if dim is None else dim
+    return satker_lookup(ids, dim.index, dim[column])
+
+
+# Fungsi fetch_* tidak menyentuh st.* → aman dipanggil dari thread prefetch
+def fetch_ikpa_kppn(storage):
+    """Dict {(BULAN, TAHUN): DataFrame} dari folder data_kppn."""
+    xlsx_files = prefer_sidecar_files(storage.list("data_kppn"), storage=storage)
+    frames, errors, hits = load_blob_frames(xlsx_files, namespace="ikpa_kppn", storage=storage)
+
+    data = {}
+    for name in sorted(frames):
+        df = frames[name]
+        if "Bulan" in df.columns and "Tahun" in df.columns:
+            key = (
+                str(df["Bulan"].iloc[0]).upper(),
+                str(df["Tahun"].iloc[0])
+            )
+            data[key] = df
+
+    return data
+
+
+def load_data_ikpa_kppn_from_github():
+    storage = get_storage()
+    if storage is None:
+        return {}
+
+    try:
+        return fetch_ikpa_kppn(storage)
+    except Exception:
+        st.error("Folder 'data_kppn' tidak ditemukan di GitHub")
+        return {}
+
+
+def find_header_row_kkp(uploaded_file, max_rows=10):
+    return find_header_row(
+        read_upload_grid(uploaded_file),
+        ["BA/KL", "SATKER", "PERIODE"],
+        max_rows=max_rows,
+    )
+
+def normalize_kkp_for_dashboard(df):
+    df = df.copy()
+
+    # Bulan & Tahun
+    df["Bulan"] = df["Periode"].dt.strftime("%Y-%m")
+    df["Tahun"] = df["Periode"].dt.year
+
+    # Pastikan string rapi
+    for col in ["BA/KL", "Satker", "Nama Pemegang KKP", "Bank Penerbit KKP"]:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip()
+
+    return df
+
+
+# ============================================================
+# LOAD DATA KKP FROM GITHUB
+# ============================================================
+def fetch_kkp_master(storage):
+    """KKP_MASTER.xlsx sebagai DataFrame (kosong jika file belum ada)."""
+    try:
+        # listing tree hanya berisi SHA → download hanya jika SHA berubah
+        files = [storage.get("data_kkp/KKP_MASTER.xlsx")]
+        frames, errors, hits = load_blob_frames(files, namespace="kkp", storage=storage)
+        return frames.get("KKP_MASTER.xlsx", pd.DataFrame())
+
+    except Exception:
+        # Jika file memang belum ada
+        return pd.DataFrame()
+
+
+def load_kkp_master_from_github():
+
+    storage = get_storage()
+
+    if storage is None:
+        publish_datasets(kkp_master=pd.DataFrame())
+        return False
+
+    df = fetch_kkp_master(storage)
+    publish_datasets(kkp_master=df)
+    return not df.empty
+
+
+# ============================================================
 # LOAD DIGIPAY FROM GITHUB
 # ============================================================
+def fetch_master_folder(storage, folder, namespace):
+    """
+    Gabungan semua xlsx di `folder` (DIGIPAY / CMS).
+    Return: (DataFrame, jumlah_file_berisi). Error listing diteruskan.
+    """
+    xlsx_files = [f for f in storage.list(folder) if f.name.endswith(".xlsx")]
+    frames, errors, hits = load_blob_frames(
+        xlsx_files,
+        namespace=namespace,
+        read_kwargs={"dtype": str},
+        storage=storage,
+    )
+
+    all_df = [frames[name] for name in sorted(frames) if not frames[name].empty]
+    if not all_df:
+        return pd.DataFrame(), 0
+
+    return pd.concat(all_df, ignore_index=True), len(all_df)
+
+
 def load_digipay_from_github():
-    
-    token = st.secrets.get("GITHUB_TOKEN")
-    repo_name = st.secrets.get("GITHUB_REPO")
+    
+    storage = get_storage()
 
-    if not token or not repo_name:
+    if storage is None:
         return 0
 
     try:
-        g = Github(auth=Auth.Token(token))
-        repo = g.get_repo(repo_name)
-        contents = repo.get_contents("data_Digipay")
-    except:
+        df, file_count = fetch_master_folder(storage, "data_Digipay", "digipay")
+    except Exception:
         return 0
 
-    all_df = []
-    file_count = 0
-
-    for file in contents:
-        if file.name.endswith(".xlsx"):
-            try:
-                file_content = base64.b64decode(file.content)
-                df = pd.read_excel(io.BytesIO(file_content), dtype=str)
-
-                if not df.empty:
-                    all_df.append(df)
-                    file_count += 1
-            except:
-                continue
-
-    if all_df:
-        st.session_state.digipay_master = pd.concat(all_df, ignore_index=True)
-    else:
-        st.session_state.digipay_master = pd.DataFrame()
-
+    publish_datasets(digipay_master=df)
     return file_count
 
 
@@ -2621,67 +4325,82 @@ def load_digipay_from_github():
 # ============================================================
 def load_cms_from_github():
     
-    token = st.secrets.get("GITHUB_TOKEN")
-    repo_name = st.secrets.get("GITHUB_REPO")
+    storage = get_storage()
 
-    if not token or not repo_name:
+    if storage is None:
         return 0
 
     try:
-        g = Github(auth=Auth.Token(token))
-        repo = g.get_repo(repo_name)
-        contents = repo.get_contents("data_CMS")
+        df, file_count = fetch_master_folder(storage, "data_CMS", "cms")
     except Exception:
         return 0
 
-    all_df = []
-    file_count = 0
-
-    for file in contents:
-        if file.name.endswith(".xlsx"):
-            file_content = base64.b64decode(file.content)
-            df = pd.read_excel(io.BytesIO(file_content), dtype=str)
-
-            if not df.empty:
-                all_df.append(df)
-                file_count += 1
-
-    if all_df:
-        st.session_state.cms_master = pd.concat(all_df, ignore_index=True)
-    else:
-        st.session_state.cms_master = pd.DataFrame()
-
+    publish_datasets(cms_master=df)
     return file_count
 
 
 # FILE KKP
-def process_excel_file_kkp(uploaded_file):
-    
-    uploaded_file.seek(0)
+def find_kkp_header(grid):
+    return find_header_row(grid, ["BA/KL", "SATKER"], max_rows=10)
+
+
+def process_excel_file_kkp(uploaded_file, streaming=None):
+    """
+    Parser upload KKP. streaming=None → otomatis (file besar dibaca
+    streaming per chunk, lihat UPLOAD_STREAM_MIN_MB); hasil kedua mode sama.
+    """
+    if streaming is None:
+        streaming = use_streaming_upload(uploaded_file)
+
+    if streaming:
+        # preview & proses memakai satu kali pembacaan streaming
+        df = upload_cached(
+            uploaded_file,
+            "kkp_stream",
+            lambda content: process_excel_file_kkp_streaming(uploaded_file),
+        )
+        return df.copy()
 
     # ==========================
-    # 1️⃣ BACA TANPA HEADER
+    # 1️⃣ BACA TANPA HEADER (grid dipakai bersama preview & proses)
     # ==========================
-    df_raw = pd.read_excel(uploaded_file, header=None, dtype=str)
+    grid = read_upload_grid(uploaded_file)
 
     # ==========================
     # 2️⃣ DETEKSI HEADER OTOMATIS
     # ==========================
-    header_row = None
-    for i in range(min(10, len(df_raw))):
-        row_text = " ".join(df_raw.iloc[i].astype(str)).upper()
-        if "BA/KL" in row_text and "SATKER" in row_text:
-            header_row = i
-            break
+    header_row = find_kkp_header(grid)
 
     if header_row is None:
         return pd.DataFrame()
 
+    df_raw = frame_from_grid(grid, dtype=str)
+
+    return normalize_kkp_rows(df_raw.iloc[header_row + 1:], df_raw.iloc[header_row])
+
+
+def process_excel_file_kkp_streaming(uploaded_file, chunk_rows=None):
+    """process_excel_file_kkp per chunk openpyxl read_only (memori terbatas)."""
+    parts = []
+    for _, header, chunk in iter_excel_chunks(uploaded_file, find_kkp_header, chunk_rows=chunk_rows):
+        part = normalize_kkp_rows(chunk, header)
+        if not part.empty:
+            parts.append(part)
+
+    if not parts:
+        return pd.DataFrame()
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def normalize_kkp_rows(df, header):
+    """Langkah 3–7 parser KKP untuk baris data (satu file utuh atau satu chunk)."""
+
     # ==========================
     # 3️⃣ SET HEADER MANUAL
     # ==========================
-    df = df_raw.iloc[header_row + 1:].copy()
-    df.columns = df_raw.iloc[header_row]
+    df = df.copy()
+    df.columns = list(header)
 
     df = df.reset_index(drop=True)
 
@@ -2896,7 +4615,7 @@ def create_problem_chart(df, column, threshold, title, comparison='less', y_min=
     elif comparison == 'greater':
         df_filtered = df[df[column] > threshold]
     else:
-        df_filtered = df.copy()
+        df_filtered = df
 
     # Jika hasil filter kosong → Cegah error
     if df_filtered.empty:
@@ -2975,7 +4694,7 @@ def create_internal_problem_chart_vertical(
     if df.empty or column not in df.columns:
         return None
 
-    df = df.copy()
+    df = cow_copy(df)
     df[column] = pd.to_numeric(df[column], errors="coerce")
     df = df.dropna(subset=[column])
 
@@ -3048,140 +4767,36 @@ def create_internal_problem_chart_vertical(
 # ===============================================
 # Helper to apply reference short names (Simplified)
 # ===============================================
-def apply_reference_short_names(df):
+# ===============================================
+# INDEKS NAMA RINGKAS REFERENSI (dikompilasi sekali per versi referensi)
+# ===============================================
+def reference_short_name_index(ref):
+    """Indeks nama ringkas untuk objek referensi `ref` (snapshot baru = versi baru)."""
+    return get_dataset_store().derived("reference_short_names", ref, compile_reference_index)
+
+
+def apply_reference_short_names(df, ref=None):
     """
     Simple version: apply reference short names to dataframe.
     - Adds 'Uraian Satker-RINGKAS' (from reference 'Uraian Satker-SINGKAT' when available,
       otherwise falls back to original 'Uraian Satker').
-    - Performs basic normalization on 'Kode Satker' before merging.
+    - Performs basic normalization on 'Kode Satker' before matching.
+    - The reference is compiled once per version into a satker_id index
+      (reference_short_name_index); each call is a single map.
     - Minimal user messages (no Excel/CSV creation, no verbose debugging).
+    - `ref` defaults to st.session_state.reference_df (process pool workers
+      call ikpa_workers.map_reference_short_names directly).
     """
-    # Defensive copy
-    df = df.copy()
-
-    # Ensure period columns exist
-    if 'Bulan' not in df.columns:
-        df['Bulan'] = ''
-    if 'Tahun' not in df.columns:
-        df['Tahun'] = ''
-
-    # If no reference in session, fallback silently to original names
-    if 'reference_df' not in st.session_state or st.session_state.reference_df is None:
-        if 'Uraian Satker-RINGKAS' not in df.columns:
-            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
-        # also keep a final fallback column for compatibility
-        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
-        return df
-
-    # Copy reference
-    ref = st.session_state.reference_df.copy()
-
-    # Normalize Kode Satker if column exists; else create empty codes to avoid crashes
-    if 'Kode Satker' in df.columns:
-        df['Kode Satker'] = df['Kode Satker'].apply(normalize_kode_satker)
-    else:
-        df['Kode Satker'] = ''
-
-    if 'Kode Satker' in ref.columns:
-        ref['Kode Satker'] = ref['Kode Satker'].apply(normalize_kode_satker)
-    else:
-        # If reference has no Kode Satker, cannot match — fallback
-        if 'Uraian Satker-RINGKAS' not in df.columns:
-            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
-        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
-        return df
-
-    # Ensure kode fields are strings and stripped
-    df['Kode Satker'] = df['Kode Satker'].astype(str).str.strip()
-    ref['Kode Satker'] = ref['Kode Satker'].astype(str).str.strip()
-
-    # If the reference does not contain the expected short-name column, fallback
-    if 'Uraian Satker-SINGKAT' not in ref.columns:
-        if 'Uraian Satker-RINGKAS' not in df.columns:
-            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
-        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
-        return df
-
-    # Perform the merge and create final short-name column; keep it simple and robust
-    try:
-        df_merged = df.merge(
-            ref[['Kode Satker', 'Uraian Satker-SINGKAT']].rename(columns={'Uraian Satker-SINGKAT': 'Uraian Satker-RINGKAS'}),
-            on='Kode Satker',
-            how='left',
-            indicator=False
-        )
-
-        # Create final name column using reference when available, otherwise fallback to original
-        df_merged['Uraian Satker-RINGKAS'] = df_merged['Uraian Satker-RINGKAS'].fillna(
-            df_merged.get('Uraian Satker', '')
-        )
-
-        # ======================================================
-        # AUTO-RINGKAS: jika ringkas == nama panjang
-        # ======================================================
-        orig = df_merged.get('Uraian Satker', '').fillna('').astype(str)
-        ring = df_merged['Uraian Satker-RINGKAS'].fillna('').astype(str)
-
-        mask = ring == orig
-
-
-        df_merged.loc[mask, 'Uraian Satker-RINGKAS'] = (
-            df_merged.loc[mask, 'Uraian Satker-RINGKAS']
-                .str.replace("KANTOR KEMENTERIAN AGAMA", "Kemenag", regex=False)
-                .str.replace("PENGADILAN AGAMA", "PA", regex=False)
-                .str.replace("RUMAH TAHANAN NEGARA", "Rutan", regex=False)
-                .str.replace("LEMBAGA PEMASYARAKATAN", "Lapas", regex=False)
-                .str.replace("BADAN PUSAT STATISTIK", "BPS", regex=False)
-                .str.replace("KANTOR PELAYANAN PERBENDAHARAAN NEGARA", "KPPN", regex=False)
-                .str.replace("KANTOR PELAYANAN PAJAK PRATAMA", "KPP Pratama", regex=False)
-                .str.replace("KABUPATEN", "Kab.", regex=False)
-                .str.replace("KOTA", "Kota", regex=False)
-        )
-
-        # Keep a generic final field for backward compatibility
-        df_merged['Uraian Satker Final'] = df_merged['Uraian Satker-RINGKAS']
-
-        # Drop the reference short-name column in case it remains under other names
-        df_merged = df_merged.drop(columns=['Uraian Satker-SINGKAT'], errors='ignore')
-
-        return df_merged
-
-    except Exception as e:
-        # Silent fallback (tanpa warning)
-        df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
-        df['Uraian Satker Final'] = df['Uraian Satker-RINGKAS']
-        return df
-
-# ===============================================
-# UPDATED: Helper function to create Satker column consistently
-# ===============================================
-def create_satker_column(df):
-    """
-    Creates 'Satker' column consistently across all data sources.
-    Should be called after apply_reference_short_names().
-    """
-    if 'Uraian Satker-RINGKAS' not in df.columns:
-        # fallback to older field names
-        if 'Uraian Satker Final' in df.columns:
-            df['Uraian Satker-RINGKAS'] = df['Uraian Satker Final']
-        else:
-            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
-
-    # Create Satker display using ringkas
-    df['Satker'] = (
-        df['Uraian Satker-RINGKAS'].astype(str) + 
-        ' (' + df['Kode Satker'].astype(str) + ')'
-    )
-    # Keep backward compatible column
-    df['Uraian Satker Final'] = df['Uraian Satker-RINGKAS']
-    return df
+    if ref is None:
+        ref = st.session_state.get("reference_df")
+    return map_reference_short_names(df, ref, reference_short_name_index)
 
 
 def merge_ikpa_with_dipa(df):
     """
     Merge IKPA Satker dengan DIPA berdasarkan Kode Satker + Tahun
     """
-    df = df.copy()
+    df = cow_copy(df)
 
     if "Kode Satker" not in df.columns or "Tahun" not in df.columns:
         df["Total Pagu"] = 0
@@ -3196,20 +4811,12 @@ def merge_ikpa_with_dipa(df):
         df["Total Pagu"] = 0
         return df
 
-    df_dipa_small = (
-        df_dipa[["Kode Satker", "Total Pagu"]]
-        .drop_duplicates("Kode Satker")
-    )
-
-    df = df.merge(
-        df_dipa_small,
-        on="Kode Satker",
-        how="left"
-    )
-
+    # join integer satker_id (baris DIPA pertama per satker)
     df["Total Pagu"] = pd.to_numeric(
-        df["Total Pagu"], errors="coerce"
-    ).fillna(0)
+        satker_lookup(satker_ids(df), satker_ids(df_dipa), df_dipa["Total Pagu"]),
+        errors="coerce"
+    )
+    df["Total Pagu"] = df["Total Pagu"].fillna(0)
 
     return df
 
@@ -3218,7 +4825,7 @@ def classify_jenis_satker(df):
     """
     Menentukan Jenis Satker sebagai IDENTITAS (FINAL)
     """
-    df = df.copy()
+    df = cow_copy(df)
 
     df["Total Pagu"] = pd.to_numeric(
         df.get("Total Pagu", 0),
@@ -3287,7 +4894,6 @@ def safe_chart(
         .sort_values(nilai_col, ascending=not top)
         .head(10)
         .sort_values(nilai_col, ascending=True)
-        .copy()
     )
 
     # ===============================
@@ -3345,7 +4951,6 @@ def get_top_bottom_unique(
     top_df = (
         df.sort_values(value_col, ascending=False)
           .head(n)
-          .copy()
     )
 
     # Kode satker yang sudah tampil di Top
@@ -3356,7 +4961,6 @@ def get_top_bottom_unique(
         df[~df[kode_col].astype(str).isin(used_kode)]
         .sort_values(value_col, ascending=True)
         .head(n)
-        .copy()
     )
 
     return top_df, bottom_df
@@ -3406,18 +5010,12 @@ def clean_nominal(series):
     """
     Membersihkan angka format Indonesia dengan aman
     """
-
-    s = series.astype(str)
-
-    s = s.str.replace(".", "", regex=False)
-    s = s.str.replace(",", ".", regex=False)
-
-    return pd.to_numeric(s, errors="coerce").fillna(0)
+    return parse_id_numbers(series).fillna(0)
 
 
 def generate_digipay_chart(df, periode="Bulanan", tipe="trx", tahun_filter=None):
 
-    df = df.copy()
+    df = cow_copy(df)
 
     df["TAHUN"] = pd.to_numeric(df["TAHUN"], errors="coerce")
     df["BULAN"] = pd.to_numeric(df["BULAN"], errors="coerce")
@@ -3452,7 +5050,7 @@ def generate_digipay_chart(df, periode="Bulanan", tipe="trx", tahun_filter=None)
 
 def generate_digipay_monthly_from_session(df, tahun_filter=None, tipe="trx"):
 
-    df = df.copy()
+    df = cow_copy(df)
 
     df["TANGGAL"] = pd.to_datetime(df["TANGGAL"], errors="coerce")
 
@@ -3504,7 +5102,7 @@ def generate_digipay_monthly_from_session(df, tahun_filter=None, tipe="trx"):
 
 def generate_digipay_quarterly_from_session(df, tahun_filter=None, tipe="trx"):
 
-    df = df.copy()
+    df = cow_copy(df)
 
     df["TANGGAL"] = pd.to_datetime(df["TANGGAL"], errors="coerce")
 
@@ -3552,7 +5150,7 @@ def generate_digipay_quarterly_from_session(df, tahun_filter=None, tipe="trx"):
 
 def generate_digipay_yearly_from_session(df, tipe="trx"):
 
-    df = df.copy()
+    df = cow_copy(df)
 
     df["TANGGAL"] = pd.to_datetime(df["TANGGAL"], errors="coerce")
 
@@ -3599,35 +5197,23 @@ def generate_digipay_yearly_from_session(df, tipe="trx"):
 # AGREGASI KKP
 # -----------------------------------
 def add_kkp_pagu_column(df_pivot, df_master):
-    
-    df_master = df_master.copy()
-
-    # normalisasi kode satker
-    df_master["Kode Satker"] = df_master["Kode Satker"].astype(str).str.zfill(6)
-    df_pivot["Kode Satker"] = df_pivot["Kode Satker"].astype(str).str.zfill(6)
 
     # normalisasi limit
-    df_master["LIMIT KKP"] = (
+    limit = pd.to_numeric(
         df_master["LIMIT KKP"]
         .astype(str)
-        .str.replace(r"[^\d]", "", regex=True)
-    )
-
-    df_master["LIMIT KKP"] = pd.to_numeric(
-        df_master["LIMIT KKP"],
+        .str.replace(r"[^\d]", "", regex=True),
         errors="coerce"
     ).fillna(0)
 
-    # pagu per satker
-    pagu_map = (
-        df_master
-        .groupby("Kode Satker")["LIMIT KKP"]
-        .sum()
-        .to_dict()
-    )
+    # pagu per satker (kunci satker_id)
+    pagu = limit.groupby(satker_ids(df_master)).sum()
 
     # mapping pagu
-    df_pivot["PAGU KKP"] = df_pivot["Kode Satker"].map(pagu_map).fillna(0)
+    df_pivot["PAGU KKP"] = satker_lookup(
+        satker_ids(df_pivot), pagu.index, pagu.to_numpy()
+    )
+    df_pivot["PAGU KKP"] = df_pivot["PAGU KKP"].fillna(0)
 
     # posisi kolom setelah SATKER
     cols = df_pivot.columns.tolist()
@@ -3644,7 +5230,7 @@ def add_kkp_pagu_column(df_pivot, df_master):
 
 def generate_kkp_chart(df, periode="Bulanan", tahun_filter=None):
     
-    df = df.copy()
+    df = cow_copy(df)
 
     df["PERIODE"] = pd.to_datetime(df["PERIODE"], errors="coerce")
 
@@ -3687,7 +5273,7 @@ def generate_kkp_chart(df, periode="Bulanan", tahun_filter=None):
 # -----------------------------------
 def generate_kkp_monthly_from_session(df, tahun_filter=None, tipe="trx"):
     
-    df = df.copy()
+    df = cow_copy(df)
 
     df["PERIODE"] = pd.to_datetime(df["PERIODE"], errors="coerce")
 
@@ -3753,7 +5339,7 @@ def generate_kkp_monthly_from_session(df, tahun_filter=None, tipe="trx"):
 # -----------------------------------
 def generate_kkp_quarterly_from_session(df, tahun_filter=None, tipe="trx"):
 
-    df = df.copy()
+    df = cow_copy(df)
 
     df["PERIODE"] = pd.to_datetime(df["PERIODE"], errors="coerce")
 
@@ -3815,7 +5401,7 @@ def generate_kkp_quarterly_from_session(df, tahun_filter=None, tipe="trx"):
 # -----------------------------------
 def generate_kkp_yearly_from_session(df, tipe="trx"):
 
-    df = df.copy()
+    df = cow_copy(df)
 
     df["PERIODE"] = pd.to_datetime(df["PERIODE"], errors="coerce")
 
@@ -3889,21 +5475,15 @@ def generate_kkp_from_session(df, periode="Bulanan", tipe="Jumlah Transaksi", ta
 # Persentase Realisasi KKP
 def add_kkp_percentage_columns(df_pivot, df_master):
     
-    df = df_master.copy()
+    df = cow_copy(df_master)
 
     df["PERIODE"] = pd.to_datetime(df["PERIODE"], errors="coerce")
     df["LIMIT KKP"] = clean_nominal(df["LIMIT KKP"])
 
-    df["Kode Satker"] = df["Kode Satker"].astype(str).str.zfill(6)
-    df_pivot["Kode Satker"] = df_pivot["Kode Satker"].astype(str).str.zfill(6)
-
-    limit_map = (
-        df.groupby("Kode Satker")["LIMIT KKP"]
-        .sum()
-        .to_dict()
-    )
+    # limit per satker (kunci satker_id)
+    limit_per_satker = df["LIMIT KKP"].groupby(satker_ids(df)).sum()
 
-    df_pivot = df_pivot.copy()
+    df_pivot = cow_copy(df_pivot)
 
     value_cols = [
         c for c in df_pivot.columns
@@ -3912,7 +5492,10 @@ def add_kkp_percentage_columns(df_pivot, df_master):
 
     df_pivot[value_cols] = df_pivot[value_cols].astype(float)
 
-    limit_series = df_pivot["Kode Satker"].map(limit_map)
+    limit_series = pd.Series(
+        satker_lookup(satker_ids(df_pivot), limit_per_satker.index, limit_per_satker.to_numpy()),
+        index=df_pivot.index
+    )
 
     for col in value_cols:
 
@@ -3933,7 +5516,7 @@ def add_kkp_percentage_columns(df_pivot, df_master):
 # =========================================================================
 def generate_cms_from_session(df_master, periode="Tahunan", tahun_filter=None):
     
-    df = df_master.copy()
+    df = cow_copy(df_master)
 
     # =============================
     # FILTER TAHUN
@@ -3953,16 +5536,7 @@ def generate_cms_from_session(df_master, periode="Tahunan", tahun_filter=None):
         "NILAI TRANSAKSI TELLER",
     ]
 
-    for col in numeric_cols:
-
-        df[col] = (
-            df[col]
-            .astype(str)
-            .str.replace(".", "", regex=False)
-            .str.replace(",", ".", regex=False)
-        )
-
-        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+    df[numeric_cols] = parse_id_numbers(df[numeric_cols]).fillna(0)
 
 
     # =============================
@@ -4087,8 +5661,12 @@ def page_dashboard():
     # STOP DI SINI JIKA BELUM PILIH
     # ===============================
     if st.session_state.main_menu is None:
+        # halaman pembuka sudah tampil → hangatkan dataset sekunder
+        start_prefetch()
+        render_prefetch_status()
         return
 
+    ensure_datasets(*PAGE_DATASETS[f"Dashboard Utama/{st.session_state.main_menu}"])
     
     # ===============================
     # VALIDASI & PILIH PERIODE (FINAL)
@@ -4126,7 +5704,7 @@ def page_dashboard():
     df = st.session_state.data_storage.get(st.session_state.selected_period)
 
     if df is not None:
-        df = df.copy()
+        df = expand_ikpa_period(df)
 
 
     st.markdown("""
@@ -4200,7 +5778,7 @@ def page_dashboard():
 
     if df is not None and 'Kode BA' in df.columns:
 
-        df['Kode BA'] = df['Kode BA'].apply(normalize_kode_ba)
+        df['Kode BA'] = normalize_kode_ba_series(df['Kode BA'])
 
         ba_codes = sorted(df['Kode BA'].dropna().unique())
         ba_options = ["SEMUA BA"] + ba_codes
@@ -4275,14 +5853,14 @@ def page_dashboard():
                 st.warning("Data IKPA belum tersedia.")
                 st.stop()
 
-            df = df.copy()
+            df = expand_ikpa_period(df)
 
 
             # ===============================
             # NORMALISASI KODE BA (1x SAJA)
             # ===============================
             if 'Kode BA' in df.columns:
-                df['Kode BA'] = df['Kode BA'].apply(normalize_kode_ba)
+                df['Kode BA'] = normalize_kode_ba_series(df['Kode BA'])
             
             df = apply_filter_ba(df)
 
@@ -4318,7 +5896,7 @@ def page_dashboard():
                     return dd
                 uraian = dd.get('Uraian Satker-RINGKAS', dd.index.astype(str))
                 kode = dd.get('Kode Satker', '')
-                dd = dd.copy()
+                dd = cow_copy(dd)
                 dd['Satker'] = uraian.astype(str) + " (" + kode.astype(str) + ")"
                 return dd
 
@@ -4526,7 +6104,7 @@ def page_dashboard():
             df_problem = df[
                 (df[problem_col].notna()) &
                 (df[problem_col] < 90)
-            ].copy()
+            ]
 
             # 3️⃣ JIKA TIDAK ADA MASALAH → SELESAI
             if df_problem.empty:
@@ -4566,13 +6144,13 @@ def page_dashboard():
                 st.warning("Data IKPA belum tersedia.")
                 st.stop()
 
-            df = df.copy()
+            df = expand_ikpa_period(df)
 
             # ===============================
             # NORMALISASI KODE BA
             # ===============================
             if "Kode BA" in df.columns:
-                df["Kode BA"] = df["Kode BA"].apply(normalize_kode_ba)
+                df["Kode BA"] = normalize_kode_ba_series(df["Kode BA"])
             else:
                 st.warning("Kolom Kode BA tidak tersedia.")
                 st.stop()
@@ -4698,7 +6276,7 @@ def page_dashboard():
             # -----------------------------
             df_ba_problem = df_ba_dev[
                 df_ba_dev["Rata-rata Deviasi Halaman III DIPA"] < 90
-            ].copy()
+            ]
 
             # -----------------------------
             # Map Nama BA & Label
@@ -4778,11 +6356,9 @@ def page_dashboard():
             if sub_tab == "📆 Periodik":
                 st.markdown("#### Periodik — ringkasan per bulan / triwulan / perbandingan")
 
-                # Tentukan tahun yang tersedia
-                years = set()
-                for k, df_period in st.session_state.data_storage.items():
-                    years.update(df_period['Tahun'].astype(str).unique())
-                years = sorted([int(y) for y in years if str(y).strip() != ''], reverse=True)
+                # Tentukan tahun yang tersedia (dari tabel fakta semua periode)
+                facts = ikpa_fact_table()
+                years = sorted(facts['Tahun'].unique().tolist(), reverse=True)
 
                 if not years:
                     st.info("Tidak ada data periodik untuk ditampilkan.")
@@ -4814,12 +6390,7 @@ def page_dashboard():
                 st.session_state.period_type = period_type
 
                 # Pilih indikator (satu untuk semua mode)
-                indicator_options = [
-                    'Kualitas Perencanaan Anggaran', 'Kualitas Pelaksanaan Anggaran', 'Kualitas Hasil Pelaksanaan Anggaran',
-                    'Revisi DIPA', 'Deviasi Halaman III DIPA', 'Penyerapan Anggaran', 'Belanja Kontraktual',
-                    'Penyelesaian Tagihan', 'Pengelolaan UP dan TUP', 'Capaian Output', 'Dispensasi SPM (Pengurang)',
-                    'Nilai Akhir (Nilai Total/Konversi Bobot)'
-                ]
+                indicator_options = IKPA_INDICATORS
                 default_indicator = 'Deviasi Halaman III DIPA'
                 selected_indicator = st.selectbox(
                     "Pilih Indikator", 
@@ -4833,36 +6404,15 @@ def page_dashboard():
                 # -------------------------
                 if period_type in ['monthly', 'quarterly']:
 
-                    # 1. Gabungkan data per tahun
-                    dfs = []
-                    for (mon, yr), df_period in st.session_state.data_storage.items():
-                        try:
-                            if int(yr) == int(selected_year):
-                                temp = df_period.copy()
-
-                                # ambil kolom bulan apa pun namanya
-                                if 'Bulan' in temp.columns:
-                                    temp['Bulan_raw'] = temp['Bulan']
-                                elif 'Nama Bulan' in temp.columns:
-                                    temp['Bulan_raw'] = temp['Nama Bulan']
-                                else:
-                                    continue
-
-                                dfs.append(temp)
-                        except:
-                            continue
+                    # 1. Ambil data satu tahun dari tabel fakta (Kode BA sudah normal)
+                    year = int(selected_year)
+                    df_year = query_ikpa_facts(start=year * 100 + 1, end=year * 100 + 12, facts=facts)
 
-                    if not dfs:
+                    if df_year.empty:
                         st.info(f"Tidak ditemukan data untuk tahun {selected_year}.")
                         st.stop()
 
-                    df_year = pd.concat(dfs, ignore_index=True)
-                    
-                    # ===============================
-                    # 2. NORMALISASI KODE BA
-                    # ===============================
-                    if 'Kode BA' in df_year.columns:
-                        df_year['Kode BA'] = df_year['Kode BA'].apply(normalize_kode_ba)
+                    df_year['Bulan_raw'] = df_year['Bulan']
 
                     # ===============================
                     # 3. APPLY FILTER BA (GLOBAL)
@@ -4934,7 +6484,7 @@ def page_dashboard():
                             'Period_Column',
                             selected_indicator
                         ]
-                    ].copy()
+                    ]
 
                     df_wide = (
                         df_pivot
@@ -5005,7 +6555,7 @@ def page_dashboard():
                     # =========================================================
                     # 8. DISPLAY DATAFRAME
                     # =========================================================
-                    df_display = df_wide.copy()
+                    df_display = cow_copy(df_wide)
 
                     # --- format peringkat ---
                     df_display['Peringkat'] = (
@@ -5062,9 +6612,9 @@ def page_dashboard():
                             lambda row: row.astype(str).str.lower().str.contains(q, na=False).any(),
                             axis=1
                         )
-                        df_display_filtered = df_display[mask].copy()
+                        df_display_filtered = df_display[mask]
                     else:
-                        df_display_filtered = df_display.copy()
+                        df_display_filtered = cow_copy(df_display)
 
 
                     # =========================================================
@@ -5102,49 +6652,20 @@ def page_dashboard():
                     st.markdown("### 📊 Perbandingan Antara Dua Tahun")
 
                     # ===============================
-                    # 1. GABUNGKAN SELURUH DATA
+                    # 1. SELURUH PERIODE (TABEL FAKTA)
                     # ===============================
-                    all_data = []
-
-                    for (mon, yr), df in st.session_state.data_storage.items():
-                        df2 = df.copy()
-
-                        df2["Bulan_upper"] = (
-                            df2["Bulan"]
-                            .astype(str)
-                            .str.upper()
-                            .str.strip()
-                        )
-
-                        df2["Tahun"] = pd.to_numeric(
-                            df2["Tahun"], errors="coerce"
-                        ).astype("Int64")
-
-                        if "Kode BA" in df2.columns:
-                            df2["Kode BA"] = df2["Kode BA"].apply(normalize_kode_ba)
-
-                        all_data.append(df2)
-
-                    if not all_data:
+                    if facts.empty:
                         st.warning("Belum ada data IKPA.")
                         st.stop()
 
-                    df_full = pd.concat(all_data, ignore_index=True)
-
                     # ===============================
                     # 2. FILTER BA VALID (SESUI HIGHLIGHTS)
                     # ===============================
-                    latest_period = max(
-                        st.session_state.data_storage.keys(),
-                        key=lambda x: (int(x[1]), MONTH_ORDER.get(x[0], 0))
-                    )
-
-                    df_latest = st.session_state.data_storage[latest_period].copy()
-                    df_latest["Kode BA"] = df_latest["Kode BA"].apply(normalize_kode_ba)
-                    df_full["Kode BA"] = df_full["Kode BA"].apply(normalize_kode_ba)
+                    latest_key = int(facts["Periode"].max())
+                    valid_ba = facts.loc[facts["Periode"] == latest_key, "Kode BA"].dropna().unique()
 
-                    valid_ba = df_latest["Kode BA"].dropna().unique()
-                    df_full = df_full[df_full["Kode BA"].isin(valid_ba)]
+                    df_full = query_ikpa_facts(ba=valid_ba, facts=facts)
+                    df_full["Bulan_upper"] = df_full["Bulan"]
 
                     # ===============================
                     # 3. FILTER BA KHUSUS COMPARE
@@ -5379,13 +6900,13 @@ def page_dashboard():
                     st.info("Data detail satker tidak tersedia.")
                     return
 
-                df = df.copy()
+                df = expand_ikpa_period(df)
 
                 # ===============================
                 # NORMALISASI & FILTER BA
                 # ===============================
                 if "Kode BA" in df.columns:
-                    df["Kode BA"] = df["Kode BA"].apply(normalize_kode_ba)
+                    df["Kode BA"] = normalize_kode_ba_series(df["Kode BA"])
 
                 df = apply_filter_ba(df)
 
@@ -5424,7 +6945,7 @@ def page_dashboard():
                         "Nilai Akhir (Nilai Total/Konversi Bobot)"
                     ]
 
-                    df_display = df[base_cols + value_cols].copy()
+                    df_display = df[base_cols + value_cols]
 
                 else:
                     component_cols = [
@@ -5451,7 +6972,7 @@ def page_dashboard():
                             df[c] = 0
 
                     cols_exist = [c for c in (base_cols + value_cols) if c in df.columns]
-                    df_display = df[cols_exist].copy()
+                    df_display = df[cols_exist]
 
 
                 # ===============================
@@ -5469,7 +6990,7 @@ def page_dashboard():
                         lambda r: r.astype(str).str.lower().str.contains(q, na=False).any(),
                         axis=1
                     )
-                    df_display = df_display[mask].copy()
+                    df_display = df_display[mask]
 
                 # ===============================
                 # FORMAT KODE
@@ -5514,8 +7035,8 @@ def page_dashboard():
                 st.warning("Data Digipay atau KKP belum tersedia")
                 st.stop()
 
-            df_digipay = st.session_state.digipay_master.copy()
-            df_kkp = st.session_state.kkp_master.copy()
+            df_digipay = cow_copy(st.session_state.digipay_master)
+            df_kkp = cow_copy(st.session_state.kkp_master)
             
             # ===============================
             # FORMAT ANGKA INDONESIA
@@ -5524,7 +7045,7 @@ def page_dashboard():
                 return f"{int(x):,}".replace(",", ".")
             
             # ===============================
-            # NORMALISASI KODE SATKER KKP
+            # NORMALISASI KODE SATKER (LABEL CHART)
             # ===============================
             df_kkp["Kode Satker"] = (
                 df_kkp["Kode Satker"]
@@ -5533,11 +7054,6 @@ def page_dashboard():
                 .str.zfill(6)               # paksa 6 digit
             )
 
-            # ===============================
-            # MERGE NAMA SATKER RINGKAS
-            # ===============================
-            ref = st.session_state.reference_df.copy()
-
             df_digipay["KDSATKER"] = (
                 df_digipay["KDSATKER"]
                 .astype(str)
@@ -5545,24 +7061,16 @@ def page_dashboard():
                 .str.zfill(6)
             )
 
-            df_kkp["Kode Satker"] = (
-                df_kkp["Kode Satker"]
-                .astype(str)
-                .str.extract(r'(\d+)')[0]
-                .str.zfill(6)
-            )
+            # ===============================
+            # NAMA SATKER RINGKAS (DIMENSI SATKER, KUNCI satker_id)
+            # ===============================
+            dim = satker_dimension()
 
-            df_digipay = df_digipay.merge(
-                ref[["Kode Satker", "Uraian Satker-SINGKAT"]],
-                left_on="KDSATKER",
-                right_on="Kode Satker",
-                how="left"
+            df_digipay["Uraian Satker-SINGKAT"] = satker_attr(
+                satker_ids(df_digipay, "KDSATKER"), "Uraian Satker-SINGKAT", dim
             )
-
-            df_kkp = df_kkp.merge(
-                ref[["Kode Satker", "Uraian Satker-SINGKAT"]],
-                on="Kode Satker",
-                how="left"
+            df_kkp["Uraian Satker-SINGKAT"] = satker_attr(
+                satker_ids(df_kkp), "Uraian Satker-SINGKAT", dim
             )
 
 
@@ -5801,7 +7309,7 @@ def page_dashboard():
             # ===============================
             # AMBIL DATA DARI SESSION
             # ===============================
-            df_kkp = st.session_state.kkp_master.copy()
+            df_kkp = cow_copy(st.session_state.kkp_master)
 
             # ===============================
             # NORMALISASI PERIODE
@@ -5873,9 +7381,7 @@ def page_dashboard():
             # MERGE NAMA SATKER RINGKAS (KKP)
             # ===============================
 
-            ref = st.session_state.reference_df.copy()
-
-            # normalisasi kode satker KKP
+            # normalisasi kode satker KKP (label chart)
             df_kkp["Kode Satker"] = (
                 df_kkp["Kode Satker"]
                 .astype(str)
@@ -5883,19 +7389,9 @@ def page_dashboard():
                 .str.zfill(6)
             )
 
-            # normalisasi kode satker reference
-            ref["Kode Satker"] = (
-                ref["Kode Satker"]
-                .astype(str)
-                .str.extract(r'(\d+)')[0]
-                .str.zfill(6)
-            )
-
-            # merge nama satker ringkas
-            df_kkp = df_kkp.merge(
-                ref[["Kode Satker", "Uraian Satker-SINGKAT"]],
-                on="Kode Satker",
-                how="left"
+            # nama satker ringkas dari dimensi satker (kunci satker_id)
+            df_kkp["Uraian Satker-SINGKAT"] = satker_attr(
+                satker_ids(df_kkp), "Uraian Satker-SINGKAT"
             )
 
             # gunakan nama satker ringkas
@@ -6074,7 +7570,7 @@ def page_dashboard():
             # =====================================================
             # CMS CHART
             # =====================================================
-            df_cms = st.session_state.cms_master.copy()
+            df_cms = cow_copy(st.session_state.cms_master)
 
             # ===============================
             # NORMALISASI TAHUN
@@ -6141,10 +7637,8 @@ def page_dashboard():
 
 
             # ===============================
-            # MERGE SATKER RINGKAS
+            # SATKER RINGKAS (DIMENSI SATKER, KUNCI satker_id)
             # ===============================
-            ref = st.session_state.reference_df.copy()
-
             df_cms[satker_code_col] = (
                 df_cms[satker_code_col]
                 .astype(str)
@@ -6152,11 +7646,8 @@ def page_dashboard():
                 .str.zfill(6)
             )
 
-            df_cms = df_cms.merge(
-                ref[["Kode Satker","Uraian Satker-SINGKAT"]],
-                left_on=satker_code_col,
-                right_on="Kode Satker",
-                how="left"
+            df_cms["Uraian Satker-SINGKAT"] = satker_attr(
+                satker_ids(df_cms, satker_code_col), "Uraian Satker-SINGKAT"
             )
 
             df_cms["SATKER"] = df_cms["Uraian Satker-SINGKAT"].fillna(df_cms[satker_name_col])
@@ -6178,8 +7669,7 @@ def page_dashboard():
                 "NILAI TRANSAKSI TELLER",
             ]
 
-            for c in cols:
-                df_cms[c] = pd.to_numeric(df_cms[c], errors="coerce").fillna(0)
+            df_cms[cols] = parse_id_numbers(df_cms[cols]).fillna(0)
 
 
             # ===============================
@@ -6236,14 +7726,14 @@ def page_dashboard():
             # ===============================
             if tipe_chart == "Jumlah Transaksi":
 
-                cms_chart = cms_satker[["SATKER","PROPORSI_TRX"]].copy()
+                cms_chart = cms_satker[["SATKER","PROPORSI_TRX"]]
                 cms_chart.rename(columns={"PROPORSI_TRX":"Value"}, inplace=True)
 
                 title_chart = "10 Satker dengan Proporsi Transaksi CMS Tertinggi"
 
             else:
 
-                cms_chart = cms_satker[["SATKER","PROPORSI_NOM"]].copy()
+                cms_chart = cms_satker[["SATKER","PROPORSI_NOM"]]
                 cms_chart.rename(columns={"PROPORSI_NOM":"Value"}, inplace=True)
 
                 title_chart = "10 Satker dengan Proporsi Nominal CMS Tertinggi"
@@ -6366,7 +7856,7 @@ def page_dashboard():
                     render_table_pin_satker(pd.DataFrame())
                 else:
 
-                    df_master = st.session_state.digipay_master.copy()
+                    df_master = cow_copy(st.session_state.digipay_master)
 
                     # =====================================================
                     # 1️⃣ DETEKSI KOLOM KODE SATKER
@@ -6392,17 +7882,12 @@ def page_dashboard():
                         )
 
                         # =====================================================
-                        # 2️⃣ MERGE REFERENSI
+                        # 2️⃣ NAMA REFERENSI (DIMENSI SATKER, KUNCI satker_id)
                         # =====================================================
                         if "reference_df" in st.session_state:
 
-                            ref = st.session_state.reference_df.copy()
-                            ref["Kode Satker"] = ref["Kode Satker"].astype(str).str.strip()
-
-                            df_master = df_master.merge(
-                                ref[["Kode Satker", "Uraian Satker-SINGKAT"]],
-                                on="Kode Satker",
-                                how="left"
+                            df_master["Uraian Satker-SINGKAT"] = satker_attr(
+                                satker_ids(df_master), "Uraian Satker-SINGKAT"
                             )
 
                             if "NMSATKER" in df_master.columns:
@@ -6468,12 +7953,12 @@ def page_dashboard():
                                 )
 
                             if tahun is not None:
-                                df_raw = df_master[df_master["TAHUN"] == tahun].copy()
+                                df_raw = df_master[df_master["TAHUN"] == tahun]
                             else:
                                 df_raw = pd.DataFrame()
 
                         else:
-                            df_raw = df_master.copy()
+                            df_raw = cow_copy(df_master)
 
                         # =====================================================
                         # BULANAN
@@ -6621,7 +8106,7 @@ def page_dashboard():
 
                 else:
 
-                    df_master = st.session_state.kkp_master.copy()
+                    df_master = cow_copy(st.session_state.kkp_master)
 
                     # =============================
                     # NORMALISASI PERIODE
@@ -6727,14 +8212,14 @@ def page_dashboard():
                     st.warning("Data CMS belum tersedia")
                     st.stop()
 
-                df_master = st.session_state.cms_master.copy()
+                df_master = cow_copy(st.session_state.cms_master)
                 
                 # =============================
                 # DETEKSI PERIODE TERBARU CMS
                 # =============================
                 tw_order = {"TW1":1,"TW2":2,"TW3":3,"TW4":4}
 
-                df_tmp = df_master.copy()
+                df_tmp = cow_copy(df_master)
                 df_tmp["TW_ORDER"] = df_tmp["TRIWULAN"].map(tw_order)
 
                 latest_row = (
@@ -6824,35 +8309,28 @@ def page_dashboard():
 def menu_ews_satker():
     st.subheader("🏛️ Early Warning System Kinerja Keuangan Satker")
 
+    ensure_datasets(*PAGE_DATASETS["Dashboard Internal/EWS"])
+
     if "data_storage" not in st.session_state or not st.session_state.data_storage:
         st.warning("⚠️ Belum ada data historis yang tersedia.")
         return
     
-    # Gabungkan semua data
-    all_data = []
-    for period, df in st.session_state.data_storage.items():
-        df_copy = df.copy()
-        # ensure Period & Period_Sort exist
-        df_copy['Period'] = f"{period[0]} {period[1]}"
-        df_copy['Period_Sort'] = f"{period[1]}-{period[0]}"
-        all_data.append(df_copy)
-    
-    if not all_data:
+    # Semua periode dari tabel fakta (Kode BA sudah dinormalisasi)
+    facts = ikpa_fact_table()
+
+    if facts.empty:
         st.warning("⚠️ Belum ada data historis yang tersedia.")
         return
     
-    df_all = pd.concat(all_data, ignore_index=True)
-    
     # Analisis tren dan Early Warning System
     # Gunakan data periode terkini
     latest_period = sorted(st.session_state.data_storage.keys(), key=lambda x: (int(x[1]), MONTH_ORDER.get(x[0].upper(), 0)), reverse=True)[0]
-    df_latest = st.session_state.data_storage[latest_period]
+    df_latest = expand_ikpa_period(st.session_state.data_storage[latest_period])
     
     # ===============================
     # 🔑 NORMALISASI KODE BA (WAJIB)
     # ===============================
-    df_all["Kode BA"] = df_all["Kode BA"].apply(normalize_kode_ba)
-    df_latest["Kode BA"] = df_latest["Kode BA"].apply(normalize_kode_ba)
+    df_latest["Kode BA"] = normalize_kode_ba_series(df_latest["Kode BA"])
     
     # ===============================
     # LOAD & MAP BA
@@ -6864,7 +8342,7 @@ def menu_ews_satker():
     st.markdown("🔎 Filter Kode BA")
     # 🔒 HANYA BA YANG ADA DI REFERENSI
     ba_codes = sorted(
-        [ba for ba in df_all["Kode BA"].dropna().unique() if ba in BA_MAP]
+        [ba for ba in facts["Kode BA"].dropna().unique() if ba in BA_MAP]
     )
     ba_options = ["SEMUA BA"] + ba_codes
 
@@ -6884,20 +8362,19 @@ def menu_ews_satker():
     # ===============================
     # TERAPKAN FILTER BA (GLOBAL INTERNAL)
     # ===============================
+    ba_filter = None
     if "SEMUA BA" not in selected_ba_internal:
-        df_all = df_all[df_all["Kode BA"].isin(selected_ba_internal)]
+        ba_filter = selected_ba_internal
         df_latest = df_latest[df_latest["Kode BA"].isin(selected_ba_internal)]
 
         
     # ===============================
     # 🔑 BUAT LABEL SATKER INTERNAL
     # ===============================
-    df_latest = df_latest.copy()
-
     if "Kode BA" not in df_latest.columns:
         df_latest["Kode BA"] = ""
 
-    df_latest["Kode BA"] = df_latest["Kode BA"].apply(normalize_kode_ba)
+    df_latest["Kode BA"] = normalize_kode_ba_series(df_latest["Kode BA"])
 
     df_latest["Satker_Internal"] = (
         "[" + df_latest["Kode BA"] + "] "
@@ -6935,7 +8412,7 @@ def menu_ews_satker():
     # ===============================
     # 🔧 ADAPTIVE LAYOUT (INTERNAL)
     # ===============================
-    df_tmp = df_latest.copy()
+    df_tmp = cow_copy(df_latest)
     df_tmp["Satker"] = df_tmp["Satker_Internal"]
 
     n_up = len(df_tmp[df_tmp['Pengelolaan UP dan TUP'] < 100])
@@ -6986,7 +8463,7 @@ def menu_ews_satker():
             unsafe_allow_html=True
         )
 
-        df_latest_up = df_latest.copy()
+        df_latest_up = cow_copy(df_latest)
         df_latest_up["Satker"] = df_latest_up["Satker_Internal"]
 
         fig_up = create_internal_problem_chart_vertical(
@@ -7025,7 +8502,7 @@ def menu_ews_satker():
             unsafe_allow_html=True
         )
 
-        df_latest_out = df_latest.copy()
+        df_latest_out = cow_copy(df_latest)
         df_latest_out["Satker"] = df_latest_out["Satker_Internal"]
 
         fig_output = create_internal_problem_chart_vertical(
@@ -7057,24 +8534,13 @@ def menu_ews_satker():
     # ======================================================
     # VALIDASI BULAN & TAHUN
     # ======================================================
-    df_all["Month_Num"] = (
-        df_all["Bulan"]
-        .astype(str)
-        .str.strip()
-        .str.upper()
-        .map(MONTH_ORDER)
-    )
+    # Periode berakhiran 00 = nama bulan tidak dikenal saat tabel fakta dibangun
+    df_all = facts if ba_filter is None else facts[facts["Kode BA"].isin(ba_filter)]
 
-    if df_all["Month_Num"].isna().any():
+    if (df_all["Periode"] % 100 == 0).any():
         st.error("❌ Ditemukan nama bulan tidak valid.")
         st.stop()
 
-    df_all["Tahun_Int"] = df_all["Tahun"].astype(int)
-    df_all["Period_Sort"] = df_all.apply(
-        lambda x: f"{x['Tahun_Int']:04d}-{x['Month_Num']:02d}",
-        axis=1
-    )
-
     # ======================================================
     # PILIH PERIODE & METRIK
     # ======================================================
@@ -7115,10 +8581,12 @@ def menu_ews_satker():
     # ======================================================
     # FILTER PERIODE
     # ======================================================
-    df_trend = df_all[
-        (df_all["Period_Sort"] >= start_period) &
-        (df_all["Period_Sort"] <= end_period)
-    ].copy()
+    df_trend = query_ikpa_facts(
+        start=int(start_period.replace("-", "")),
+        end=int(end_period.replace("-", "")),
+        ba=ba_filter,
+        facts=facts,
+    )
 
     if df_trend.empty:
         st.warning("⚠️ Tidak ada data pada periode yang dipilih.")
@@ -7132,7 +8600,7 @@ def menu_ews_satker():
     df_trend = df_trend[
         df_trend["Uraian Satker-RINGKAS"].notna() &
         (df_trend["Uraian Satker-RINGKAS"].str.strip() != "")
-    ].copy()
+    ]
 
     df_trend["Nama_Satker_Ringkas"] = (
         df_trend["Uraian Satker-RINGKAS"]
@@ -7161,7 +8629,7 @@ def menu_ews_satker():
     # ======================================================
     # 🔑 LABEL SELECTOR DARI DATA REFERENSI (SUMBER ASLI)
     # ======================================================
-    ref_df = st.session_state.reference_df.copy()
+    ref_df = cow_copy(st.session_state.reference_df)
 
     # pastikan kode satker string & rapi
     ref_df["Kode Satker"] = ref_df["Kode Satker"].astype(str).str.strip()
@@ -7184,8 +8652,8 @@ def menu_ews_satker():
     # ======================================================
     # DEFAULT: 5 SATKER TERENDAH (PERIODE TERBARU)
     # ======================================================
-    latest_period = df_all["Period_Sort"].max()
-    df_latest = df_all[df_all["Period_Sort"] == latest_period].copy()
+    latest_key = int(df_all["Periode"].max())
+    df_latest = query_ikpa_facts(start=latest_key, end=latest_key, ba=ba_filter, facts=facts)
 
     bottom_5_kode = (
         df_latest
@@ -7271,7 +8739,6 @@ def menu_ews_satker():
         d = (
             df_trend[df_trend["Kode Satker"] == kode]
             .sort_values("Period_Sort")
-            .copy()
         )
 
         if len(d) < 2:
@@ -7310,6 +8777,8 @@ def menu_ews_satker():
 def menu_highlights():
     st.subheader("🎯 Highlights IKPA KPPN")
 
+    ensure_datasets(*PAGE_DATASETS["Dashboard Internal/IKPA KPPN"])
+
     # ===============================
     # VALIDASI DATA
     # ===============================
@@ -7322,7 +8791,7 @@ def menu_highlights():
     # ===============================
     all_data = []
     for (bulan, tahun), df in st.session_state.data_storage_kppn.items():
-        df_copy = df.copy()
+        df_copy = cow_copy(df)
         df_copy["Periode"] = f"{bulan} {tahun}"
         df_copy["Tahun"] = int(tahun)
         df_copy["Bulan"] = bulan
@@ -7405,7 +8874,7 @@ def menu_highlights():
     kppn_list = sorted(df_all["Nama KPPN"].dropna().unique())
     selected_kppn = st.selectbox("Pilih KPPN", kppn_list)
 
-    df_kppn = df_all[df_all["Nama KPPN"] == selected_kppn].copy()
+    df_kppn = df_all[df_all["Nama KPPN"] == selected_kppn]
 
     # ===============================
     # FILTER BARIS NILAI
@@ -7540,39 +9009,23 @@ def detect_dipa_header(uploaded_file):
     Returns: DataFrame dengan header yang sudah benar
     """
     try:
-        uploaded_file.seek(0)
-        
-        # Baca 20 baris pertama untuk preview
-        preview = pd.read_excel(uploaded_file, header=None, nrows=20, dtype=str)
-        
-        # Keywords yang PASTI ada di header DIPA
-        header_keywords = [
-            "satker", "kode", "pagu", "jumlah", "dipa", 
-            "tanggal", "revisi", "no", "status"
-        ]
-        
-        header_row = None
-        max_matches = 0
-        
-        # Cari baris dengan keyword terbanyak
-        for i in range(len(preview)):
-            row_text = " ".join(preview.iloc[i].fillna("").astype(str).str.lower())
-            matches = sum(1 for kw in header_keywords if kw in row_text)
-            
-            if matches > max_matches:
-                max_matches = matches
-                header_row = i
-        
-        # Jika tidak ada yang cocok, gunakan baris 0
-        if header_row is None or max_matches < 3:
+        grid = read_upload_grid(uploaded_file)
+
+        # Baris header dari registry format DIPA (fingerprint di-cache per file)
+        fmt_key, header_row = dipa_upload_format(uploaded_file)
+
+        # Jika tidak ada format yang cocok, gunakan baris 0
+        if fmt_key is None:
             st.warning("⚠️ Header otomatis tidak terdeteksi, menggunakan baris pertama")
             header_row = 0
         else:
-            st.info(f"✅ Header terdeteksi di baris {header_row + 1} (keyword match: {max_matches})")
+            st.info(
+                f"✅ Header terdeteksi di baris {header_row + 1} "
+                f"(format: {DIPA_FORMATS[fmt_key].label})"
+            )
         
-        # Baca ulang dengan header yang benar
-        uploaded_file.seek(0)
-        df = pd.read_excel(uploaded_file, header=header_row, dtype=str)
+        # Potong dari grid dengan header yang benar (tanpa baca ulang)
+        df = frame_from_grid(grid, header_row, dtype=str)
         
         # Bersihkan nama kolom
         df.columns = (
@@ -7595,8 +9048,7 @@ def detect_dipa_header(uploaded_file):
         
     except Exception as e:
         st.error(f"❌ Error deteksi header: {e}")
-        uploaded_file.seek(0)
-        return pd.read_excel(uploaded_file, dtype=str)
+        return frame_from_grid(read_upload_grid(uploaded_file), 0, dtype=str)
 
 
 # ======================================================================================
@@ -7803,41 +9255,39 @@ def process_uploaded_dipa(uploaded_file, save_file_to_github):
 
         # 1️⃣ Baca raw excel
         with st.spinner("Membaca file..."):
-            raw = pd.read_excel(uploaded_file, header=None, dtype=str)
+            grid = read_upload_grid(uploaded_file)
 
-        if raw.empty:
+        if grid.empty:
             return None, None, "❌ File kosong"
-        
+
         # 🔍 DEBUG STRUKTUR FILE (SEMENTARA)
-        st.write("🧱 DEBUG RAW SHAPE:", raw.shape)
+        st.write("🧱 DEBUG RAW SHAPE:", grid.shape)
         st.write("🧱 DEBUG RAW PREVIEW (10 baris):")
-        st.dataframe(raw.head(10))
+        st.dataframe(frame_from_grid(grid.iloc[:10], dtype=str))
 
 
-        # 2️⃣ Standarisasi format
-        with st.spinner("Menstandarisasi format DIPA..."):
-
-            if is_omspan_dipa(raw):
-                st.info("📌 Format DIPA OMSPAN terdeteksi")
-
-                # 🔄 Adapter OMSPAN → format standar
-                df_adapted = adapt_dipa_omspan(raw)
+        # 2️⃣ Deteksi format: fingerprint baris awal (di-cache per SHA file) → 1 parser
+        fmt_key, header_row = dipa_upload_format(uploaded_file)
+        if fmt_key is None:
+            return None, None, (
+                "❌ Format DIPA tidak dikenali (header Satker/Pagu tidak ada di "
+                f"{DIPA_FINGERPRINT_ROWS} baris pertama)"
+            )
 
-                if df_adapted.empty:
-                    return None, None, "❌ Data OMSPAN tidak valid / kosong"
+        fmt = DIPA_FORMATS[fmt_key]
+        is_omspan = fmt_key == "omspan"
 
-                # Masuk pipeline normal
-                df_std = standardize_dipa(df_adapted)
+        with st.spinner("Menstandarisasi format DIPA..."):
+            st.info(f"📌 Format DIPA {fmt.label} terdeteksi (header baris {header_row + 1})")
+            df_std = fmt.parser(grid, header_row)
 
-            else:
-                # 🔁 Alur lama (DIPA standar)
-                raw_fixed = fix_dipa_header(raw)
-                df_std = standardize_dipa(raw_fixed)
+        if df_std.empty:
+            return None, None, f"❌ Data DIPA {fmt.label} tidak valid / kosong"
         
         # =====================================================
         # PATCH 2 — PAKSA SET TAHUN UNTUK OMSPAN
         # =====================================================
-        if is_omspan_dipa(raw):
+        if is_omspan:
             # jika kolom Tahun belum ada / kosong
             if "Tahun" not in df_std.columns or df_std["Tahun"].isna().all():
                 if "Tanggal Posting Revisi" in df_std.columns:
@@ -7923,13 +9373,13 @@ def process_uploaded_dipa(uploaded_file, save_file_to_github):
         st.write(f"**Rentang Pagu:** Rp {df_std['Total Pagu'].min():,.0f} - Rp {df_std['Total Pagu'].max():,.0f}")
 
         # 5️⃣ Normalisasi kode satker
-        df_std["Kode Satker"] = df_std["Kode Satker"].apply(normalize_kode_satker)
+        df_std["Kode Satker"] = normalize_kode_satker_series(df_std["Kode Satker"])
 
         # 6️⃣ Merge dengan referensi (jika ada)
         if "reference_df" in st.session_state and not st.session_state.reference_df.empty:
             with st.spinner("Menggabungkan dengan data referensi..."):
                 ref = st.session_state.reference_df.copy()
-                ref["Kode Satker"] = ref["Kode Satker"].apply(normalize_kode_satker)
+                ref["Kode Satker"] = normalize_kode_satker_series(ref["Kode Satker"])
 
                 df_std = df_std.merge(
                     ref[["Kode BA", "K/L", "Kode Satker"]],
@@ -7973,8 +9423,6 @@ def process_uploaded_dipa(uploaded_file, save_file_to_github):
         # 🔑 FINALISASI STRUKTUR AGAR SAMA DENGAN DIPA NORMAL
         # =====================================================
 
-        is_omspan = is_omspan_dipa(raw)
-
         # === NO (nomor urut) ===
         df_std = df_std.reset_index(drop=True)
         df_std["NO"] = df_std.index + 1
@@ -8020,11 +9468,8 @@ def process_uploaded_dipa(uploaded_file, save_file_to_github):
         df_std = df_std.reindex(columns=FINAL_COLUMNS)
 
 
-        # 9️⃣ Simpan ke session_state
-        if "DATA_DIPA_by_year" not in st.session_state:
-            st.session_state.DATA_DIPA_by_year = {}
-
-        st.session_state.DATA_DIPA_by_year[int(tahun_dipa)] = df_std.copy()
+        # 9️⃣ Publish ke store bersama
+        update_dataset_items("DATA_DIPA_by_year", {int(tahun_dipa): df_std.copy()})
 
         # 🔟 Upload ke GitHub
         with st.spinner("Mengunggah ke GitHub..."):
@@ -8058,13 +9503,15 @@ def process_uploaded_dipa(uploaded_file, save_file_to_github):
 import streamlit as st
 import pandas as pd
 import io
-from github import Github, Auth
 import base64
 
 # Fungsi bantu
 def get_latest_dipa(dipa_df):
     if 'Tanggal Posting Revisi' in dipa_df.columns:
-        dipa_df['Tanggal Posting Revisi'] = pd.to_datetime(dipa_df['Tanggal Posting Revisi'], errors='coerce')
+        # assign → salinan (DataFrame DIPA milik store bersama tidak diubah)
+        dipa_df = dipa_df.assign(**{
+            'Tanggal Posting Revisi': pd.to_datetime(dipa_df['Tanggal Posting Revisi'], errors='coerce')
+        })
         latest_dipa = dipa_df.sort_values('Tanggal Posting Revisi', ascending=False) \
                               .drop_duplicates(subset='Kode Satker', keep='first')
     elif 'No Revisi Terakhir' in dipa_df.columns:
@@ -8074,9 +9521,21 @@ def get_latest_dipa(dipa_df):
         latest_dipa = dipa_df.drop_duplicates(subset='Kode Satker', keep='first')
     return latest_dipa
 
-def merge_ikpa_dipa_auto():
+def ikpa_keys_for_year(tahun):
+    """Key (BULAN, TAHUN) data_storage untuk satu tahun anggaran."""
+    return [
+        key for key in st.session_state.get("data_storage", {})
+        if str(key[1]) == str(tahun)
+    ]
+
+def merge_ikpa_dipa_auto(keys=None):
+    """
+    Merge IKPA Satker dengan DIPA (Total Pagu + Jenis Satker).
+    keys=None → semua periode (sekali per versi data, flag ikpa_dipa_merged)
+    keys=[...] → hanya periode tersebut (setelah sync / upload)
+    """
     
-    if st.session_state.get("ikpa_dipa_merged", False):
+    if keys is None and st.session_state.get("ikpa_dipa_merged", False):
         return
 
     if "data_storage" not in st.session_state:
@@ -8085,45 +9544,42 @@ def merge_ikpa_dipa_auto():
     if "DATA_DIPA_by_year" not in st.session_state:
         return
 
-    for (bulan, tahun), df_ikpa in st.session_state.data_storage.items():
+    items = [
+        (key, df) for key, df in st.session_state.data_storage.items()
+        if keys is None or key in keys
+    ]
+
+    merged = {}
+
+    for (bulan, tahun), df_ikpa in items:
 
         dipa = st.session_state.DATA_DIPA_by_year.get(int(tahun))
         if dipa is None or dipa.empty:
             continue
 
-        df_final = df_ikpa.copy()
         dipa_latest = get_latest_dipa(dipa)
 
-        # NORMALISASI KODE SATKER
-        df_final["Kode Satker"] = df_final["Kode Satker"].astype(str).str.zfill(6)
-        dipa_latest["Kode Satker"] = dipa_latest["Kode Satker"].astype(str).str.zfill(6)
-
-        # 🔴 AMBIL TOTAL PAGU SAJA (TANPA JENIS SATKER)
-        dipa_selected = dipa_latest[['Kode Satker', 'Total Pagu']]
-
         # HAPUS TOTAL PAGU & JENIS SATKER LAMA
-        df_final = df_final.drop(columns=['Total Pagu', 'Jenis Satker'], errors='ignore')
-
-        # MERGE
-        df_merged = pd.merge(
-            df_final,
-            dipa_selected,
-            on='Kode Satker',
-            how='left'
-        )
+        df_merged = df_ikpa.drop(columns=['Total Pagu', 'Jenis Satker'], errors='ignore')
 
-        # AMANKAN TOTAL PAGU
+        # 🔴 AMBIL TOTAL PAGU SAJA (TANPA JENIS SATKER) — join integer satker_id
         df_merged["Total Pagu"] = pd.to_numeric(
-            df_merged["Total Pagu"],
+            satker_lookup(satker_ids(df_merged), satker_ids(dipa_latest), dipa_latest["Total Pagu"]),
             errors="coerce"
-        ).fillna(0)
+        )
+
+        # AMANKAN TOTAL PAGU
+        df_merged["Total Pagu"] = df_merged["Total Pagu"].fillna(0)
 
         # 🔑 KLASIFIKASI SETELAH MERGE (INI YANG HILANG)
         df_merged = classify_jenis_satker(df_merged)
 
-        st.session_state.data_storage[(bulan, tahun)] = df_merged
+        merged[(bulan, tahun)] = df_merged
 
-    st.session_state.ikpa_dipa_merged = True
+    update_dataset_items("data_storage", merged)
+
+    if keys is None:
+        publish_datasets(ikpa_dipa_merged=True)
 
 
 # ============================================================
@@ -8132,25 +9588,25 @@ def merge_ikpa_dipa_auto():
 def to_excel_bytes(df):
     output = io.BytesIO()
     with pd.ExcelWriter(output, engine="xlsxwriter") as writer:
-        df.to_excel(writer, index=False)
+        without_satker_id(df).to_excel(writer, index=False)
     return output.getvalue()
 
 # ============================================================
 # 🔹 Fungsi push file ke GitHub
 # ============================================================
-def push_to_github(file_bytes, repo_path, repo_name, token, commit_message):
-    g = Github(auth=Auth.Token(token))
-    repo = g.get_repo(repo_name)
-
+def push_to_github(file_bytes, repo_path, commit_message):
     try:
-        # Cek apakah file sudah ada
+        existed = True
         try:
-            contents = repo.get_contents(repo_path)
-            repo.update_file(contents.path, commit_message, file_bytes, contents.sha)
+            get_storage().get(repo_path)
+        except FileNotFoundError:
+            existed = False
+
+        get_storage().write(repo_path, file_bytes, commit_message)
+
+        if existed:
             st.success(f"✅ File {repo_path} berhasil diupdate di GitHub")
-        except Exception as e_inner:
-            # Jika file belum ada atau path salah, buat baru
-            repo.create_file(repo_path, commit_message, file_bytes)
+        else:
             st.success(f"✅ File {repo_path} berhasil dibuat di GitHub")
     except Exception as e:
         st.error(f"❌ Gagal push ke GitHub: {e}")
@@ -8160,13 +9616,12 @@ def detect_header_row(excel_file, keyword, max_rows=10):
     """
     Mendeteksi baris header berdasarkan keyword kolom
     """
-    preview = pd.read_excel(excel_file, header=None, nrows=max_rows)
-
-    for i in range(len(preview)):
-        row = preview.iloc[i].astype(str).str.strip()
-        if keyword in row.values:
-            return i
-    return None
+    return find_header_row(
+        read_upload_grid(excel_file),
+        [keyword],
+        max_rows=max_rows,
+        exact=True,
+    )
 
 # ============================================================
 #  Menu Admin
@@ -8195,6 +9650,8 @@ def page_admin():
 
     st.success("✔ Anda login sebagai Admin")
 
+    ensure_datasets(*PAGE_DATASETS["Admin"])
+
     # ===============================
     # 🔄 KONTROL DATA (MANUAL OVERRIDE)
     # ===============================
@@ -8219,12 +9676,35 @@ def page_admin():
         if st.session_state.get("data_storage") or st.session_state.get("DATA_DIPA_by_year"):
             with st.expander(" Admin Lanjutan (Opsional)"):
                 if st.button(" Reset Status Merge"):
-                    st.session_state.ikpa_dipa_merged = False
+                    publish_datasets(ikpa_dipa_merged=False)
                     st.warning(" Status merge direset. Data akan diproses ulang.")
                     st.rerun()
 
-    if "cms_master" not in st.session_state:
-        load_cms_from_github()
+    # ===============================
+    # 🗂️ MIGRASI SIDECAR PARQUET
+    # ===============================
+    with st.expander("🗂️ Migrasi Sidecar Parquet (sekali jalan)"):
+        st.caption(
+            "Membuat file .parquet di samping setiap xlsx pada folder "
+            + ", ".join(f"`{f}/`" for f in SIDECAR_FOLDERS)
+            + ". Loader akan memakai Parquet jika tersedia."
+        )
+
+        if not PARQUET_AVAILABLE:
+            st.warning("⚠️ Paket pyarrow belum terpasang, migrasi tidak dapat dijalankan.")
+        elif st.button("🚀 Jalankan Migrasi Parquet", key="migrate_parquet"):
+            with st.spinner("Mengonversi xlsx ke Parquet..."):
+                try:
+                    report = migrate_parquet_sidecars()
+                    st.dataframe(pd.DataFrame(report), use_container_width=True)
+                    log_activity(
+                        menu="Manajemen Data",
+                        action="Migrasi Parquet",
+                        detail=f"{len(report)} file diperiksa"
+                    )
+                    st.cache_data.clear()
+                except Exception as e:
+                    st.error(f"❌ Migrasi gagal: {e}")
 
     # ===============================
     # 📌 TAB MENU
@@ -8262,6 +9742,11 @@ def page_admin():
             accept_multiple_files=True
         )
 
+        # laporan per file dari proses upload terakhir (sekali tampil)
+        upload_report = st.session_state.pop("_ikpa_upload_report", None)
+        if upload_report:
+            st.dataframe(pd.DataFrame(upload_report), use_container_width=True, hide_index=True)
+
         if uploaded_files:
 
             st.info("📄 File yang diupload:")
@@ -8272,107 +9757,126 @@ def page_admin():
 
                 with st.spinner("Memproses semua file IKPA Satker..."):
 
-                    for uploaded_file in uploaded_files:
-                        try:
-                            # ======================
-                            # 🔄 PROSES FILE 
-                            # ======================
-                            uploaded_file.seek(0)
-                            df_final, month, year = process_excel_file(
-                                uploaded_file,
-                                upload_year
+                    need_merge = False
+                    uploaded_keys = []
+
+                    # semua periode ditulis dalam 1 commit di akhir
+                    pending_files = {}
+                    processed = []
+                    report = []
+
+                    # ======================
+                    # 🔄 PROSES FILE (PARALEL, PROCESS POOL)
+                    # parse + normalisasi + serialisasi per file
+                    # ======================
+                    progress = st.progress(0.0, text="Memproses file IKPA Satker...")
+                    file_status = [st.empty() for _ in uploaded_files]
+                    for slot, f in zip(file_status, uploaded_files):
+                        slot.caption(f"⏳ {f.name}")
+
+                    def show_done(i, result, done, total):
+                        if "error" in result:
+                            file_status[i].caption(f"❌ {result['name']} — {result['error']}")
+                        else:
+                            file_status[i].caption(
+                                f"✅ {result['name']} → {result['month']} {result['year']} "
+                                f"({result['seconds']:.1f} dtk)"
                             )
+                        progress.progress(done / total, text=f"{done}/{total} file selesai diproses")
 
-                            if df_final is None or month == "UNKNOWN":
-                                st.warning(
-                                    f"⚠️ {uploaded_file.name} gagal diproses "
-                                    f"(bulan tidak terdeteksi)"
-                                )
-                                continue
+                    results = prepare_ikpa_uploads(
+                        [(f.name, f.getvalue()) for f in uploaded_files],
+                        upload_year,
+                        reference_df=st.session_state.get("reference_df"),
+                        on_done=show_done,
+                    )
 
-                            # ======================
-                            # NORMALISASI KODE SATKER
-                            # ======================
-                            if "Kode Satker" in df_final.columns:
-                                df_final["Kode Satker"] = (
-                                    df_final["Kode Satker"]
-                                    .astype(str)
-                                    .apply(normalize_kode_satker)
-                                )
+                    # hasil diproses sesuai urutan upload (deterministik)
+                    for result in results:
+                        if "error" in result:
+                            st.warning(f"⚠️ {result['name']}: {result['error']}")
+                            report.append({
+                                "File": result["name"], "Periode": "-",
+                                "Status": f"❌ {result['error']}",
+                            })
+                            continue
 
-                            # ======================
-                            # 🔐 NORMALISASI NAMA SATKER (WAJIB)
-                            # ======================
-                            df_final = apply_reference_short_names(df_final)
-                            df_final = create_satker_column(df_final)
-
-                            # ======================
-                            # OVERRIDE JIKA BULAN SAMA
-                            # ======================
-                            st.session_state.data_storage.pop(
-                                (month, str(year)), None
-                            )
+                        pending_files.update(result["files"])
+                        processed.append(
+                            (result["name"], result["df"], result["month"], result["year"])
+                        )
 
-                            # ======================
-                            # REGISTRASI KE SISTEM (KUNCI)
-                            # ======================
-                            register_ikpa_satker(
-                                df_final,
-                                month,
-                                year,
-                                source="Manual"
+                    # ======================
+                    # 💾 SIMPAN KE GITHUB (1 COMMIT)
+                    # ======================
+                    if processed:
+                        periods = ", ".join(f"{m} {y}" for _, _, m, y in processed)
+                        try:
+                            save_sidecar_files(
+                                pending_files,
+                                f"Upload IKPA Satker: {periods}"
                             )
-
-                            # tandai perlu merge ulang
-                            need_merge = True
-                            st.session_state.ikpa_dipa_merged = False
-
-                            # ======================
-                            # 💾 SIMPAN KE GITHUB
-                            # ======================
-                            excel_bytes = io.BytesIO()
-                            with pd.ExcelWriter(
-                                excel_bytes,
-                                engine="openpyxl"
-                            ) as writer:
-                                df_final.to_excel(
-                                    writer,
-                                    index=False,
-                                    sheet_name="Data IKPA"
-                                )
-                            excel_bytes.seek(0)
-
-                            save_file_to_github(
-                                excel_bytes.getvalue(),
-                                f"IKPA_{month}_{year}.xlsx",
-                                folder="data"
+                        except Exception as e:
+                            st.error(
+                                f"❌ Gagal menyimpan ke GitHub, tidak ada file "
+                                f"yang tersimpan ({periods}): {e}"
                             )
-
-                            log_activity(
-                                menu="Upload Data",
-                                action="Upload IKPA Satker",
-                                detail=f"{uploaded_file.name} | {month} {year}"
+                            report.extend(
+                                {"File": name, "Periode": f"{m} {y}",
+                                 "Status": f"❌ gagal disimpan: {e}"}
+                                for name, _, m, y in processed
                             )
+                            processed = []
+
+                    for name, df_final, month, year in processed:
+                        # ======================
+                        # REGISTRASI KE SISTEM (KUNCI)
+                        # bulan yang sama otomatis ditimpa
+                        # ======================
+                        register_ikpa_satker(
+                            df_final,
+                            month,
+                            year,
+                            source="Manual"
+                        )
+
+                        # tandai perlu merge ulang
+                        need_merge = True
+                        uploaded_keys.append((month, str(year)))
+
+                        log_activity(
+                            menu="Upload Data",
+                            action="Upload IKPA Satker",
+                            detail=f"{name} | {month} {year}"
+                        )
 
+                        st.success(
+                            f"✅ {name} → "
+                            f"{month} {year} berhasil diproses"
+                        )
+                        report.append({
+                            "File": name, "Periode": f"{month} {year}",
+                            "Status": "✅ tersimpan",
+                        })
 
-                            st.success(
-                                f"✅ {uploaded_file.name} → "
-                                f"{month} {year} berhasil diproses"
-                            )
+                    # ditampilkan lagi setelah rerun
+                    st.session_state["_ikpa_upload_report"] = report
 
-                        except Exception as e:
-                            st.error(f"❌ Error {uploaded_file.name}: {e}")
+                    # 🔄 ambil ulang dari GitHub HANYA periode yang berubah
+                    with st.spinner("🔄 Sinkronisasi IKPA Satker..."):
+                        changed_keys = sync_ikpa_storage()
 
+                    # periode lain tidak berubah → flag ikpa_dipa_merged tetap
                     if need_merge and st.session_state.DATA_DIPA_by_year:
                         with st.spinner("🔄 Menggabungkan IKPA & DIPA..."):
-                            merge_ikpa_dipa_auto()
-                            st.session_state.ikpa_dipa_merged = True
+                            merge_ikpa_dipa_auto(
+                                keys=set(uploaded_keys) | set(changed_keys)
+                            )
+                    elif need_merge:
+                        publish_datasets(ikpa_dipa_merged=False)
                     
                     st.session_state["_just_uploaded"] = True
 
-                    # 🔥 WAJIB: proses ulang semua data (ambil dari GitHub)
-                    reprocess_all_ikpa_satker()
-
                     # refresh UI
                     st.rerun()
 
@@ -8437,12 +9941,9 @@ def page_admin():
                     )
                     st.stop()
 
-                # Baca data dengan header yang benar
-                uploaded_file_kppn.seek(0)
-                df_check = pd.read_excel(
-                    uploaded_file_kppn,
-                    header=header_row
-                )
+                # Potong data dengan header yang benar (tanpa baca ulang)
+                grid_kppn = read_upload_grid(uploaded_file_kppn)
+                df_check = frame_from_grid(grid_kppn, header_row)
 
                 # Normalisasi nama kolom
                 df_check.columns = (
@@ -8463,8 +9964,7 @@ def page_admin():
                 # ===============================
                 # 🔍 DETEKSI BULAN (HEADER + FILENAME)
                 # ===============================
-                uploaded_file_kppn.seek(0)
-                df_info = pd.read_excel(uploaded_file_kppn, header=None)
+                df_info = grid_kppn
 
                 MONTH_MAP = {
                     "JAN": "JANUARI", "JANUARI": "JANUARI",
@@ -8547,7 +10047,8 @@ def page_admin():
                     df_processed, month, year = process_excel_file_kppn(
                         uploaded_file_kppn,
                         upload_year_kppn,
-                        month_preview   
+                        month_preview,
+                        header_row=header_row
                     )
 
 
@@ -8560,23 +10061,25 @@ def page_admin():
 
                     try:
                         #  Simpan ke session
-                        st.session_state.data_storage_kppn[period_key] = df_processed
+                        update_dataset_items("data_storage_kppn", {period_key: df_processed})
 
                         #  Simpan ke GitHub
+                        df_save = df_processed.drop(
+                            ["Bobot", "Nilai Terbobot"],
+                            axis=1,
+                            errors="ignore"
+                        )
                         excel_bytes = io.BytesIO()
                         with pd.ExcelWriter(excel_bytes, engine="openpyxl") as writer:
-                            df_processed.drop(
-                                ["Bobot", "Nilai Terbobot"],
-                                axis=1,
-                                errors="ignore"
-                            ).to_excel(
+                            df_save.to_excel(
                                 writer,
                                 index=False,
                                 sheet_name="Data IKPA KPPN"
                             )
                         excel_bytes.seek(0)
 
-                        save_file_to_github(
+                        save_with_parquet_sidecar(
+                            df_save,
                             excel_bytes.getvalue(),
                             filename,
                             folder="data_kppn"
@@ -8585,7 +10088,7 @@ def page_admin():
                         log_activity(
                             menu="Upload Data",
                             action="Upload IKPA KPPN",
-                            detail=f"{uploaded_file.name} | {month} {year}"
+                            detail=f"{uploaded_file_kppn.name} | {month} {year}"
                         )
 
                         st.success(
@@ -8621,9 +10124,9 @@ def page_admin():
                     
                     # ====================================================
                     # RESET STATE DIPA (WAJIB, AMAN, KHUSUS DIPA)
+                    # tahun yang diupload ditimpa di store bersama,
+                    # tahun lain tetap (dipakai sesi lain)
                     # ====================================================
-                    st.session_state.DATA_DIPA_by_year = {}
-                    st.session_state.ikpa_dipa_merged = False
                     st.session_state["_just_uploaded_dipa"] = True
 
                     # clear cache agar tidak pakai data lama
@@ -8638,13 +10141,13 @@ def page_admin():
                             st.stop()
 
                         # 2️⃣ Pastikan kolom Kode Satker distandardkan
-                        df_clean["Kode Satker"] = df_clean["Kode Satker"].astype(str).apply(normalize_kode_satker)
+                        df_clean["Kode Satker"] = normalize_kode_satker_series(df_clean["Kode Satker"].astype(str))
 
-                        # 3️⃣ Simpan ke session_state per tahun
-                        if "DATA_DIPA_by_year" not in st.session_state:
-                            st.session_state.DATA_DIPA_by_year = {}
+                        # 3️⃣ Publish ke store bersama per tahun
+                        update_dataset_items("DATA_DIPA_by_year", {int(tahun_dipa): df_clean.copy()})
 
-                        st.session_state.DATA_DIPA_by_year[int(tahun_dipa)] = df_clean.copy()
+                        # Total Pagu periode tahun ini ikut DIPA baru (tahun lain tetap)
+                        merge_ikpa_dipa_auto(keys=ikpa_keys_for_year(tahun_dipa))
 
                         # 4️⃣ Simpan ke GitHub dalam folder `DATA_DIPA`
                         excel_bytes = io.BytesIO()
@@ -8653,9 +10156,10 @@ def page_admin():
 
                         excel_bytes.seek(0)
 
-                        save_file_to_github(
+                        save_with_parquet_sidecar(
+                            dipa_sidecar_frame(excel_bytes.getvalue()),
                             excel_bytes.getvalue(),
-                            f"DIPA_{tahun_dipa}.xlsx",  
+                            f"DIPA_{tahun_dipa}.xlsx",
                             folder="DATA_DIPA"
                         )
 
@@ -8878,7 +10382,7 @@ def page_admin():
                     # ===============================
                     # UPDATE SESSION
                     # ===============================
-                    st.session_state.kkp_master = final_df.reset_index(drop=True)
+                    publish_datasets(kkp_master=final_df.reset_index(drop=True))
 
                     st.write("MASTER setelah merge:", len(final_df))
 
@@ -8889,7 +10393,7 @@ def page_admin():
 
                     excel_bytes = io.BytesIO()
                     with pd.ExcelWriter(excel_bytes, engine="openpyxl") as writer:
-                        final_df.to_excel(
+                        without_satker_id(final_df).to_excel(
                             writer,
                             index=False,
                             sheet_name="Data KKP"
@@ -8936,7 +10440,7 @@ def page_admin():
 
         if uploaded_ref is not None:
             try:
-                new_ref = pd.read_excel(uploaded_ref)
+                new_ref = read_workbook(uploaded_ref)
                 new_ref.columns = [c.strip() for c in new_ref.columns]
 
                 required = [
@@ -8948,7 +10452,7 @@ def page_admin():
                     st.stop()
 
                 # Normalisasi Kode Satker
-                new_ref['Kode Satker'] = new_ref['Kode Satker'].apply(normalize_kode_satker)
+                new_ref['Kode Satker'] = normalize_kode_satker_series(new_ref['Kode Satker'])
 
                 # ============================================================
                 # MERGE DENGAN REFERENSI LAMA
@@ -8957,28 +10461,31 @@ def page_admin():
                     old_ref = st.session_state.reference_df.copy()
 
                     if 'Kode Satker' in old_ref.columns:
-                        old_ref['Kode Satker'] = old_ref['Kode Satker'].apply(normalize_kode_satker)
+                        old_ref['Kode Satker'] = normalize_kode_satker_series(old_ref['Kode Satker'])
 
                     merged = pd.concat([old_ref, new_ref], ignore_index=True)
                     merged = merged.drop_duplicates(subset=['Kode Satker'], keep='last')
                     merged['Kode Satker'] = merged['Kode Satker'].astype(str).str.strip()
 
-                    st.session_state.reference_df = merged
+                    publish_datasets(reference_df=merged)
                     st.success(f"✅ Data Referensi diperbarui ({len(merged)} total baris).")
                 else:
-                    st.session_state.reference_df = new_ref
+                    publish_datasets(reference_df=new_ref)
                     add_notification(f"✅ Data Referensi baru dimuat ({len(new_ref)} baris).")
 
                 # ============================================================
                 # 🔄 RE-APPLY REFERENSI KE SEMUA DATA IKPA (INI KUNCINYA)
                 # ============================================================
                 if "data_storage" in st.session_state:
-                    new_storage = {}
-                    for key, df in st.session_state.data_storage.items():
-                        df = apply_reference_short_names(df)
-                        df = create_satker_column(df)
-                        new_storage[key] = df
-                    st.session_state.data_storage = new_storage
+                    def reapply_reference(storage_now):
+                        new_storage = {}
+                        for key, df in (storage_now or {}).items():
+                            df = apply_reference_short_names(expand_ikpa_period(df))
+                            df = create_satker_column(df)
+                            new_storage[key] = df
+                        return new_storage
+
+                    update_dataset("data_storage", reapply_reference)
 
                 # ============================================================
                 # SIMPAN REFERENSI KE GITHUB
@@ -8987,18 +10494,14 @@ def page_admin():
                     # ===============================
                     # 1️⃣ LOAD FILE REFERENSI DARI GITHUB
                     # ===============================
-                    token = st.secrets["GITHUB_TOKEN"]
-                    repo_name = st.secrets["GITHUB_REPO"]
-
-                    g = Github(auth=Auth.Token(token))
-                    repo = g.get_repo(repo_name)
+                    storage = get_storage()
 
                     file_path = "templates/Template_Data_Referensi.xlsx"
 
-                    existing_file = repo.get_contents(file_path)
-                    file_content = base64.b64decode(existing_file.content)
+                    existing_file = storage.get(file_path)
+                    file_content = storage.read(existing_file)
 
-                    df_existing = pd.read_excel(io.BytesIO(file_content))
+                    df_existing = read_workbook(io.BytesIO(file_content))
 
                     # ===============================
                     # 2️⃣ TAMBAH ROW BARU
@@ -9026,11 +10529,11 @@ def page_admin():
 
                     excel_bytes.seek(0)
 
-                    repo.update_file(
+                    storage.write(
                         file_path,
-                        "Update referensi (manual input)",
                         excel_bytes.getvalue(),
-                        existing_file.sha
+                        "Update referensi (manual input)",
+                        expected_sha=existing_file.sha
                     )
 
                     st.success("✅ Data berhasil ditambahkan dan file referensi diperbarui di GitHub")
@@ -9079,17 +10582,13 @@ def page_admin():
                     # ===============================
                     # LOAD FILE TEMPLATE DARI GITHUB
                     # ===============================
-                    token = st.secrets["GITHUB_TOKEN"]
-                    repo_name = st.secrets["GITHUB_REPO"]
-
-                    g = Github(auth=Auth.Token(token))
-                    repo = g.get_repo(repo_name)
+                    storage = get_storage()
 
                     file_path = "templates/Template_Data_Referensi.xlsx"
-                    existing_file = repo.get_contents(file_path)
+                    existing_file = storage.get(file_path)
 
-                    file_content = base64.b64decode(existing_file.content)
-                    df_existing = pd.read_excel(io.BytesIO(file_content), dtype=str)
+                    file_content = storage.read(existing_file)
+                    df_existing = read_workbook(io.BytesIO(file_content), dtype=str)
 
                     df_existing["Kode Satker"] = df_existing["Kode Satker"].astype(str)
 
@@ -9142,11 +10641,11 @@ def page_admin():
 
                     excel_bytes.seek(0)
 
-                    repo.update_file(
+                    storage.write(
                         file_path,
-                        f"Tambah referensi manual: {kode_satker}",
                         excel_bytes.getvalue(),
-                        existing_file.sha
+                        f"Tambah referensi manual: {kode_satker}",
+                        expected_sha=existing_file.sha
                     )
 
                     st.success("✅ Data berhasil ditambahkan ke template dan diperbarui di GitHub")
@@ -9176,125 +10675,43 @@ def page_admin():
 
             with st.spinner("Memproses Data Digipay..."):
 
-                xls = pd.ExcelFile(uploaded_digipay)
-                all_sheets = []
-
-                for sheet in xls.sheet_names:
-                    df_sheet = pd.read_excel(xls, sheet_name=sheet, dtype=str)
-                    df_sheet["SOURCE_SHEET"] = sheet
-                    all_sheets.append(df_sheet)
-
-                df_all = pd.concat(all_sheets, ignore_index=True)
-
-                # ====================================
-                # NORMALISASI KOLOM
-                # ====================================
-                df_all.columns = (
-                    df_all.columns.astype(str)
-                    .str.strip()
-                    .str.upper()
-                )
-                
-                # ==========================================
-                # 🔥 POTONG KOLOM SEBELUM "TAHUN"
-                # ==========================================
-
-                if "TAHUN" in df_all.columns:
-                    start_index = df_all.columns.get_loc("TAHUN")
-                    df_all = df_all.iloc[:, start_index:]
-                    
-        
-                # ====================================
-                #  PERBAIKI LEADING ZERO OTOMATIS
-                # ====================================
-
-                # KDKANWIL → 2 digit
-                if "KDKANWIL" in df_all.columns:
-                    df_all["KDKANWIL"] = (
-                        df_all["KDKANWIL"]
-                        .astype(str)
-                        .str.replace(".0", "", regex=False)
-                        .str.strip()
-                        .str.zfill(2)
-                    )
-
-                # KDKPPN → 3 digit
-                if "KDKPPN" in df_all.columns:
-                    df_all["KDKPPN"] = (
-                        df_all["KDKPPN"]
-                        .astype(str)
-                        .str.replace(".0", "", regex=False)
-                        .str.strip()
-                        .str.zfill(3)
-                    )
-
-                # KDSATKER → 6 digit
-                if "KDSATKER" in df_all.columns:
-                    df_all["KDSATKER"] = (
-                        df_all["KDSATKER"]
-                        .astype(str)
-                        .str.replace(".0", "", regex=False)
-                        .str.strip()
-                        .str.zfill(6)
+                # Normalisasi + filter KPPN 109 per sheet (paralel; file besar:
+                # streaming per chunk). Hasil di-cache per isi file → rerun tidak baca ulang.
+                progress = st.progress(0.0, text="Membaca sheet Digipay...")
+                sheet_report = []
+
+                def show_sheet(result, done, total):
+                    sheet_report.append({
+                        "No": result["index"] + 1,
+                        "Sheet": result["sheet"],
+                        "Baris": result["rows"],
+                        "Baris valid (KPPN 109)": result["valid"],
+                        "Detik": round(result["seconds"], 2),
+                    })
+                    progress.progress(
+                        done / total,
+                        text=f"{done}/{total} sheet selesai — {result['sheet']}"
                     )
 
-                # ==========================================
-                # AMBIL HANYA KOLOM RESMI DIGIPAY
-                # ==========================================
-
-                valid_columns = [
-                    "TAHUN","KDKANWIL","NMKANWIL","KDKPPN","NMKPPN",
-                    "KDSATKER","NMSATKER","NOINVOICE","NOMINVOICE",
-                    "NMVENDOR","STSBAYAR","TGLBAYAR","BULAN",
-                    "TGLINVOICE","KATEGORI","BANK_SATKER",
-                    "BANK_VENDOR","SUBKATEGORI","CARA BAYAR"
-                ]
-
-                df_all = df_all[[col for col in valid_columns if col in df_all.columns]]
-                
-                
-                # ====================================
-                # FILTER OTOMATIS KPPN 109 BATURAJA
-                # ====================================
-                df_all = df_all[
-                    (df_all["KDKPPN"] == "109") &
-                    (df_all["NMKPPN"].str.upper() == "BATURAJA")
-                ]
-                
-                # ====================================
-                # FILTER HANYA STATUS SUDAH DIBAYAR
-                # ====================================
-                if "STSBAYAR" in df_all.columns:
-
-                    df_all["STSBAYAR"] = (
-                        df_all["STSBAYAR"]
-                        .fillna("")
-                        .astype(str)
-                        .str.upper()
-                        .str.strip()
+                df_all, sheet_report = upload_cached(
+                    uploaded_digipay,
+                    "digipay_upload",
+                    lambda content: (
+                        process_digipay_upload(uploaded_digipay, on_sheet=show_sheet),
+                        sheet_report,
+                    ),
+                )
+                df_all = df_all.copy()
+                progress.empty()
+
+                with st.expander(f"📑 Rincian per sheet ({len(sheet_report)} sheet)"):
+                    st.dataframe(
+                        pd.DataFrame(sheet_report).sort_values("No"),
+                        use_container_width=True,
+                        hide_index=True
                     )
 
-                    df_all = df_all[
-                        df_all["STSBAYAR"].str.contains("SUDAH", na=False)
-                    ]
-
-                df_all = df_all[
-                    df_all["NOINVOICE"].notna() &
-                    (df_all["NOINVOICE"].astype(str).str.strip() != "")
-                ]
-                
-                # ====================================
-                # UNIQUE KEY
-                # ====================================
-                UNIQUE_KEY = [
-                    "TAHUN",
-                    "KDSATKER",
-                    "NOINVOICE",
-                    "NOMINVOICE",
-                    "TGLINVOICE"
-                ]
-
-                df_all = df_all.drop_duplicates(subset=UNIQUE_KEY)
+                UNIQUE_KEY = DIGIPAY_UNIQUE_KEY
 
                 # ====================================
                 # SMART MERGE UPDATE DATABASE
@@ -9302,7 +10719,7 @@ def page_admin():
 
                 # Jika database kosong → langsung simpan
                 if st.session_state.digipay_master.empty:
-                    st.session_state.digipay_master = df_all.copy()
+                    publish_datasets(digipay_master=df_all.copy())
                     new_count = len(df_all)
                     update_count = 0
 
@@ -9374,7 +10791,7 @@ def page_admin():
                             ignore_index=True
                         )
 
-                    st.session_state.digipay_master = master_df.copy()
+                    publish_datasets(digipay_master=master_df.copy())
                     
                     # ==========================================
                     # BERSIHKAN DATABASE DIGIPAY FINAL
@@ -9394,7 +10811,7 @@ def page_admin():
                     clean_df = clean_df.dropna(axis=1, how="all")
 
                     # Simpan kembali yang sudah bersih
-                    st.session_state.digipay_master = clean_df.copy()
+                    publish_datasets(digipay_master=clean_df.copy())
 
                 # ====================================
                 # SIMPAN OTOMATIS KE GITHUB
@@ -9402,7 +10819,7 @@ def page_admin():
                 excel_bytes = io.BytesIO()
 
                 with pd.ExcelWriter(excel_bytes, engine="openpyxl") as writer:
-                    st.session_state.digipay_master.to_excel(
+                    without_satker_id(st.session_state.digipay_master).to_excel(
                         writer,
                         index=False,
                         sheet_name="DIGIPAY_109_BATURAJA"
@@ -9499,32 +10916,18 @@ def page_admin():
 
             with st.spinner("Memproses Data CMS..."):
 
-                xls = pd.ExcelFile(uploaded_cms)
+                grids = read_upload_grid(uploaded_cms, sheet_name=None)
                 all_valid_data = []
 
-                for sheet in xls.sheet_names:
+                for sheet, grid in grids.items():
 
-                    df_raw = pd.read_excel(xls, sheet_name=sheet, header=None, dtype=str)
-
-                    header_row = None
-                    for i in range(min(20, len(df_raw))):
-
-                        row_text = " ".join(df_raw.iloc[i].astype(str)).upper()
-
-                        # Header CMS biasanya mengandung SATKER
-                        if "SATKER" in row_text:
-                            header_row = i
-                            break
+                    # Header CMS biasanya mengandung SATKER
+                    header_row = find_header_row(grid, ["SATKER"], max_rows=20)
 
                     if header_row is None:
                         continue
 
-                    df = pd.read_excel(
-                        xls,
-                        sheet_name=sheet,
-                        header=header_row,
-                        dtype=str
-                    )
+                    df = frame_from_grid(grid, header_row, dtype=str)
 
                     df.columns = (
                         df.columns.astype(str)
@@ -9612,7 +11015,7 @@ def page_admin():
 
                 if st.session_state.cms_master.empty:
 
-                    st.session_state.cms_master = df_final.copy()
+                    publish_datasets(cms_master=df_final.copy())
                     new_count = len(df_final)
                     overwrite_count = 0
 
@@ -9667,7 +11070,7 @@ def page_admin():
 
                     new_count = len(df_final) - overwrite_count
 
-                    st.session_state.cms_master = master_df.copy()
+                    publish_datasets(cms_master=master_df.copy())
     
                 # ============================================================
                 # SIMPAN KE GITHUB
@@ -9678,7 +11081,7 @@ def page_admin():
                 file_name = f"CMS_109_{selected_triwulan}_{selected_year}.xlsx"
 
                 with pd.ExcelWriter(excel_bytes, engine="openpyxl") as writer:
-                    st.session_state.cms_master.to_excel(
+                    without_satker_id(st.session_state.cms_master).to_excel(
                         writer,
                         index=False,
                         sheet_name=sheet_name
@@ -9727,13 +11130,11 @@ def page_admin():
 
             if st.button("🗑️ Hapus Data IKPA Satker", type="primary") and confirm_delete:
                 try:
-                    del st.session_state.data_storage[period_to_delete]
-                    token = st.secrets.get("GITHUB_TOKEN")
-                    repo_name = st.secrets.get("GITHUB_REPO")
-                    g = Github(auth=Auth.Token(token))
-                    repo = g.get_repo(repo_name)
-                    contents = repo.get_contents(f"data/IKPA_{month}_{year}.xlsx")
-                    repo.delete_file(contents.path, f"Delete {filename}", contents.sha)
+                    update_dataset_items("data_storage", remove=[period_to_delete])
+                    storage = get_storage()
+                    contents = storage.get(f"data/IKPA_{month}_{year}.xlsx")
+                    storage.delete(contents.path, f"Delete {filename}", expected_sha=contents.sha)
+                    delete_parquet_sidecar(contents.path)
                     st.success(f"✅ Data {month} {year} dihapus dari sistem & GitHub.")
                     st.snow()
                     st.session_state.activity_log.append({
@@ -9750,14 +11151,10 @@ def page_admin():
         st.subheader("🗑️ Hapus Data IKPA KPPN")
 
         try:
-            token = st.secrets["GITHUB_TOKEN"]
-            repo_name = st.secrets["GITHUB_REPO"]
-
-            g = Github(auth=Auth.Token(token))
-            repo = g.get_repo(repo_name)
+            storage = get_storage()
 
             # Ambil semua file di folder data_kppn
-            contents = repo.get_contents("data_kppn")
+            contents = storage.list("data_kppn")
 
             files_kppn = [
                 c.name for c in contents
@@ -9793,13 +11190,14 @@ def page_admin():
         if st.button("🗑️ Hapus Data IKPA KPPN", type="primary") and confirm_delete:
             try:
                 file_path = f"data_kppn/{selected_file}"
-                content = repo.get_contents(file_path)
+                content = storage.get(file_path)
 
-                repo.delete_file(
+                storage.delete(
                     content.path,
                     f"Delete {selected_file}",
-                    content.sha
+                    expected_sha=content.sha
                 )
+                delete_parquet_sidecar(content.path)
 
                 # Log aktivitas
                 if "activity_log" not in st.session_state:
@@ -9842,13 +11240,11 @@ def page_admin():
 
             if st.button("🗑️ Hapus Data DIPA Ini", type="primary", key="btn_delete_dipa") and confirm_delete_dipa:
                 try:
-                    del st.session_state.DATA_DIPA_by_year[year_to_delete]
-                    token = st.secrets.get("GITHUB_TOKEN")
-                    repo_name = st.secrets.get("GITHUB_REPO")
-                    g = Github(auth=Auth.Token(token))
-                    repo = g.get_repo(repo_name)
-                    contents = repo.get_contents(filename_dipa)
-                    repo.delete_file(contents.path, f"Delete {filename_dipa}", contents.sha)
+                    update_dataset_items("DATA_DIPA_by_year", remove=[year_to_delete])
+                    storage = get_storage()
+                    contents = storage.get(filename_dipa)
+                    storage.delete(contents.path, f"Delete {filename_dipa}", expected_sha=contents.sha)
+                    delete_parquet_sidecar(contents.path)
                     st.success(f"✅ Data DIPA tahun {year_to_delete} dihapus dari sistem & GitHub.")
                     st.snow()
                     st.session_state.activity_log.append({
@@ -9886,23 +11282,19 @@ def page_admin():
 
                 try:
                     # 🔹 Hapus dari session
-                    st.session_state.kkp_master = pd.DataFrame()
+                    publish_datasets(kkp_master=pd.DataFrame())
 
                     # 🔹 Hapus dari GitHub
-                    token = st.secrets["GITHUB_TOKEN"]
-                    repo_name = st.secrets["GITHUB_REPO"]
-
-                    g = Github(auth=Auth.Token(token))
-                    repo = g.get_repo(repo_name)
+                    storage = get_storage()
 
                     file_path = "data_kkp/KKP_MASTER.xlsx"
 
                     try:
-                        file = repo.get_contents(file_path)
-                        repo.delete_file(
+                        file = storage.get(file_path)
+                        storage.delete(
                             file.path,
                             "Delete KKP_MASTER.xlsx",
-                            file.sha
+                            expected_sha=file.sha
                         )
                     except Exception as e:
                         st.warning(f"File tidak ditemukan di GitHub: {e}")
@@ -9940,25 +11332,21 @@ def page_admin():
                     # ======================================
                     # 1️⃣ Hapus dari session
                     # ======================================
-                    st.session_state.digipay_master = pd.DataFrame()
+                    publish_datasets(digipay_master=pd.DataFrame())
 
                     # ======================================
                     # 2️⃣ Hapus dari GitHub
                     # ======================================
-                    token = st.secrets["GITHUB_TOKEN"]
-                    repo_name = st.secrets["GITHUB_REPO"]
-
-                    g = Github(auth=Auth.Token(token))
-                    repo = g.get_repo(repo_name)
+                    storage = get_storage()
 
                     file_path = "data_Digipay/DIGIPAY_MASTER.xlsx"
 
                     try:
-                        file = repo.get_contents(file_path)
-                        repo.delete_file(
+                        file = storage.get(file_path)
+                        storage.delete(
                             file.path,
                             "Delete DIGIPAY_MASTER.xlsx",
-                            file.sha
+                            expected_sha=file.sha
                         )
                     except Exception:
                         pass  # Jika file belum ada, tidak error
@@ -10017,13 +11405,9 @@ def page_admin():
             # ================================
             # DETEKSI TRIWULAN DARI GITHUB
             # ================================
-            token = st.secrets["GITHUB_TOKEN"]
-            repo_name = st.secrets["GITHUB_REPO"]
+            storage = get_storage()
 
-            g = Github(auth=Auth.Token(token))
-            repo = g.get_repo(repo_name)
-
-            contents = repo.get_contents("data_CMS")
+            contents = storage.list("data_CMS")
 
             tw_options = []
 
@@ -10059,15 +11443,15 @@ def page_admin():
                     ]
 
                     deleted_rows = before - len(cms_df)
-                    st.session_state.cms_master = cms_df.copy()
+                    publish_datasets(cms_master=cms_df.copy())
 
                     # HAPUS FILE GITHUB
                     file_name = f"CMS_109_{delete_tw}_{delete_year}.xlsx"
                     file_path = f"data_CMS/{file_name}"
 
                     try:
-                        file = repo.get_contents(file_path)
-                        repo.delete_file(file.path, f"Delete {file_name}", file.sha)
+                        file = storage.get(file_path)
+                        storage.delete(file.path, f"Delete {file_name}", expected_sha=file.sha)
                     except:
                         pass
 
@@ -10087,17 +11471,13 @@ def page_admin():
             # ===============================
             # 1️⃣ LOAD DATA DARI GITHUB
             # ===============================
-            token = st.secrets["GITHUB_TOKEN"]
-            repo_name = st.secrets["GITHUB_REPO"]
-
-            g = Github(auth=Auth.Token(token))
-            repo = g.get_repo(repo_name)
+            storage = get_storage()
 
             file_path = "templates/Template_Data_Referensi.xlsx"
-            existing_file = repo.get_contents(file_path)
+            existing_file = storage.get(file_path)
 
-            file_content = base64.b64decode(existing_file.content)
-            df_referensi = pd.read_excel(io.BytesIO(file_content), dtype=str)
+            file_content = storage.read(existing_file)
+            df_referensi = read_workbook(io.BytesIO(file_content), dtype=str)
 
             if df_referensi.empty:
                 st.info("Data referensi kosong.")
@@ -10147,11 +11527,11 @@ def page_admin():
 
                     excel_bytes.seek(0)
 
-                    repo.update_file(
+                    storage.write(
                         file_path,
-                        f"Hapus referensi: {selected_label}",
                         excel_bytes.getvalue(),
-                        existing_file.sha
+                        f"Hapus referensi: {selected_label}",
+                        expected_sha=existing_file.sha
                     )
 
                     st.success("✅ Data berhasil dihapus dan file template diperbarui")
@@ -10187,26 +11567,22 @@ def page_admin():
                     # ==========================================
                     # 1️⃣ Hapus dari session
                     # ==========================================
-                    st.session_state.digipay_master = pd.DataFrame()
+                    publish_datasets(digipay_master=pd.DataFrame())
 
                     # ==========================================
                     # 2️⃣ Hapus dari GitHub
                     # ==========================================
-                    token = st.secrets.get("GITHUB_TOKEN")
-                    repo_name = st.secrets.get("GITHUB_REPO")
-
-                    g = Github(auth=Auth.Token(token))
-                    repo = g.get_repo(repo_name)
+                    storage = get_storage()
 
                     try:
-                        contents = repo.get_contents(
+                        contents = storage.get(
                             "data_Digipay/DIGIPAY_MASTER.xlsx"
                         )
 
-                        repo.delete_file(
+                        storage.delete(
                             contents.path,
                             "Delete DIGIPAY_MASTER.xlsx",
-                            contents.sha
+                            expected_sha=contents.sha
                         )
 
                     except Exception:
@@ -10246,7 +11622,7 @@ def page_admin():
             df_selected = st.session_state.data_storage.get(period_to_download)
             if df_selected is not None:
                 filename = f"IKPA_{period_to_download[0]}_{period_to_download[1]}.xlsx"
-                excel_bytes = to_excel_bytes(df_selected)  # pastikan fungsi ini sudah ada
+                excel_bytes = to_excel_bytes(expand_ikpa_period(df_selected))  # pastikan fungsi ini sudah ada
                 st.download_button(
                     label=f"Download {filename}",
                     data=excel_bytes,
@@ -10260,60 +11636,57 @@ def page_admin():
         st.markdown("---")
         st.subheader("📥 Download Data IKPA KPPN")
 
+        # Gagal di sini tidak menghentikan halaman (download DIPA, KKP,
+        # template di bawahnya tetap tampil)
         try:
-            token = st.secrets["GITHUB_TOKEN"]
-            repo_name = st.secrets["GITHUB_REPO"]
-
-            g = Github(auth=Auth.Token(token))
-            repo = g.get_repo(repo_name)
+            storage = get_storage()
 
-            contents = repo.get_contents("data_kppn")
+            contents = storage.list("data_kppn")
 
             files_kppn = [
                 c.name for c in contents
                 if c.name.startswith("IKPA_KPPN_") and c.name.endswith(".xlsx")
             ]
 
+        except FileNotFoundError:
+            files_kppn = []
         except Exception as e:
             st.error(f"❌ Gagal membaca data dari GitHub: {e}")
-            st.stop()
+            files_kppn = None
 
         # ===============================
         # JIKA BELUM ADA DATA
         # ===============================
-        if not files_kppn:
+        if files_kppn is not None and not files_kppn:
             st.info("ℹ️ Belum ada data IKPA KPPN tersedia untuk diunduh.")
-            st.stop()
 
-        # ===============================
-        # PILIH FILE
-        # ===============================
-        selected_file = st.selectbox(
-            "Pilih data IKPA KPPN",
-            sorted(files_kppn, reverse=True)
-        )
+        elif files_kppn:
+            # ===============================
+            # PILIH FILE
+            # ===============================
+            selected_file = st.selectbox(
+                "Pilih data IKPA KPPN",
+                sorted(files_kppn, reverse=True)
+            )
 
-        # ===============================
-        # AMBIL FILE DARI GITHUB
-        # ===============================
-        try:
-            file_path = f"data_kppn/{selected_file}"
-            file_content = repo.get_contents(file_path)
-            file_bytes = file_content.decoded_content
-        except Exception as e:
-            st.error(f"❌ Gagal mengambil file: {e}")
-            st.stop()
+            # ===============================
+            # AMBIL FILE DARI GITHUB
+            # ===============================
+            try:
+                file_bytes = storage.read(f"data_kppn/{selected_file}")
+            except Exception as e:
+                st.error(f"❌ Gagal mengambil file: {e}")
+            else:
+                # ===============================
+                # DOWNLOAD BUTTON
+                # ===============================
+                st.download_button(
+                    label="📥 Download File IKPA KPPN",
+                    data=file_bytes,
+                    file_name=selected_file,
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
 
-        # ===============================
-        # DOWNLOAD BUTTON
-        # ===============================
-        st.download_button(
-            label="📥 Download File IKPA KPPN",
-            data=file_bytes,
-            file_name=selected_file,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-                
         # ===========================
         # Submenu Download Data DIPA
         # ===========================
@@ -10406,7 +11779,7 @@ def page_admin():
             buffer = io.BytesIO()
 
             with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-                st.session_state.kkp_master.to_excel(
+                without_satker_id(st.session_state.kkp_master).to_excel(
                     writer,
                     index=False,
                     sheet_name="Data KKP"
@@ -10433,7 +11806,7 @@ def page_admin():
             buffer = io.BytesIO()
 
             with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-                st.session_state.digipay_master.to_excel(
+                without_satker_id(st.session_state.digipay_master).to_excel(
                     writer,
                     index=False,
                     sheet_name="DIGIPAY_109_BATURAJA"
@@ -10494,7 +11867,7 @@ def page_admin():
                 buffer = io.BytesIO()
 
                 with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
-                    df_download.to_excel(writer, index=False)
+                    without_satker_id(df_download).to_excel(writer, index=False)
 
                 buffer.seek(0)
 
@@ -10529,12 +11902,9 @@ def page_admin():
         st.subheader("📋 Download Template")
         st.markdown("### 📘 Template IKPA")
         try:
-            token = st.secrets["GITHUB_TOKEN"]
-            repo_name = st.secrets["GITHUB_REPO"]
-            g = Github(auth=Auth.Token(token))
-            repo = g.get_repo(repo_name)
-            file_content = repo.get_contents("templates/Template_IKPA.xlsx")
-            template_data = base64.b64decode(file_content.content)
+            storage = get_storage()
+            file_content = storage.get("templates/Template_IKPA.xlsx")
+            template_data = storage.read(file_content)
         except Exception:
             template_data = get_template_file()
 
@@ -10555,13 +11925,10 @@ def page_admin():
         else:
             # fallback: try load from GitHub
             try:
-                token = st.secrets["GITHUB_TOKEN"]
-                repo_name = st.secrets["GITHUB_REPO"]
-                g = Github(auth=Auth.Token(token))
-                repo = g.get_repo(repo_name)
-                ref_content = repo.get_contents("templates/Template_Data_Referensi.xlsx")
-                ref_data = base64.b64decode(ref_content.content)
-                template_ref = pd.read_excel(io.BytesIO(ref_data))
+                storage = get_storage()
+                ref_content = storage.get("templates/Template_Data_Referensi.xlsx")
+                ref_data = storage.read(ref_content)
+                template_ref = read_workbook(io.BytesIO(ref_data))
             except Exception:
                 template_ref = pd.DataFrame({
                     'No': [],
@@ -10599,7 +11966,7 @@ def page_admin():
         
         st.subheader("📥 Download Data Referensi Terbaru")
         try:
-            df_ref, repo, existing_file = load_template_referensi_from_github()
+            df_ref, storage, existing_file = load_template_referensi_from_github()
 
             add_notification("Data referensi berhasil dimuat dari GitHub")
 
@@ -10714,220 +12081,357 @@ st.markdown("""
     
     
 # ===============================
-# MAIN APP
+# LAZY LOADER DATASET PER HALAMAN
 # ===============================
-def main():
-    
-    # flag aplikasi baru dibuka
-    if "show_system_status" not in st.session_state:
-        st.session_state.show_system_status = True
-    
-    loading_placeholder = st.empty()
+# Setiap dataset punya loader + dependensi. Halaman cukup memanggil
+# ensure_datasets(*PAGE_DATASETS[...]) → hanya dataset yang belum ada
+# di store bersama yang diambil, urut sesuai dependensi.
+DatasetSpec = namedtuple("DatasetSpec", ["label", "deps", "loaded", "load"])
 
-    with loading_placeholder.container():
-        show_loading_logo()
 
-    # ============================================================
-    # 1️⃣ LOAD REFERENCE DATA (SEKALI SAJA)
-    # ============================================================
-    if "reference_df" not in st.session_state:
+def render_system_status(messages):
+    """Panel ringkas daftar proses loading yang baru saja dijalankan."""
+    if not messages:
+        return
 
-        token = st.secrets.get("GITHUB_TOKEN")
-        repo_name = st.secrets.get("GITHUB_REPO")
+    st.markdown("""
+    <style>
 
-        if not token or not repo_name:
-            st.session_state.reference_df = pd.DataFrame({
-                'Kode BA': [], 'K/L': [], 'Kode Satker': [],
-                'Uraian Satker-SINGKAT': [], 'Uraian Satker-LENGKAP': []
-            })
-        else:
-            try:
-                g = Github(auth=Auth.Token(token))
-                repo = g.get_repo(repo_name)
-                ref_path = "templates/Template_Data_Referensi.xlsx"
+    /* SYSTEM STATUS BOX */
+    .system-status{
+        background:#f1f5f9;
+        border-radius:10px;
+        border:1px solid #e2e8f0;
 
-                ref_file = repo.get_contents(ref_path)
-                ref_data = base64.b64decode(ref_file.content)
+        padding:10px 16px;   /* sebelumnya lebih besar */
+        margin-bottom:8px;   /* lebih rapat ke elemen bawah */
+    }
 
-                ref_df = pd.read_excel(io.BytesIO(ref_data))
-                ref_df.columns = [c.strip() for c in ref_df.columns]
+    /* JUDUL */
+    .system-title{
+        font-size:15px;      /* sebelumnya sekitar 18-20 */
+        font-weight:600;
+        margin-bottom:3px;
+    }
 
-                st.session_state.reference_df = ref_df
+    /* TEXT STATUS */
+    .status-item{
+        font-size:13px;
+        line-height:1.4;
+    }
 
-            except Exception:
-                st.session_state.reference_df = pd.DataFrame({
-                    'Kode BA': [], 'K/L': [], 'Kode Satker': [],
-                    'Uraian Satker-SINGKAT': [], 'Uraian Satker-LENGKAP': []
-                })
+    /* DOT HIJAU */
+    .status-ok{
+        color:#16a34a;
+        margin-right:6px;
+    }
 
-    # ============================================================
-    # 🔄 REPROCESS IKPA SETELAH REFERENCE SIAP (1x)
-    # ============================================================
-    if st.session_state.get("_force_fix_ringkas", True):
-        load_data_from_github.clear()
-        st.session_state.data_storage = load_data_from_github(
-            _cache_buster=int(time.time())
-        )
-        st.session_state.ikpa_dipa_merged = False
-        st.session_state["_force_fix_ringkas"] = False
+    </style>
+    """, unsafe_allow_html=True)
 
+    with st.expander("Detail proses loading sistem"):
 
-    # ============================================================
-    #  AUTO LOAD DATA IKPA
-    # ============================================================
-    if not st.session_state.data_storage:
-            st.session_state.data_storage = load_data_from_github()
+        for msg in messages:
+
+            st.markdown(f"""
+            <div class="status-item">
+            <span class="status-ok">●</span> {msg}
+            </div>
+            """, unsafe_allow_html=True)
+
+
+def load_reference_dataset():
+    publish_datasets(reference_df=load_reference_satker())
+
+
+def load_ikpa_dataset():
+    if sync_ikpa_storage():
+        publish_datasets(ikpa_dipa_merged=False)
 
     if st.session_state.data_storage:
-        add_notification("Data IKPA berhasil dimuat dari GitHub")
+        add_notification(
+            "Data IKPA berhasil dimuat dari GitHub" + format_loader_stats("ikpa")
+        )
     else:
         st.warning("⚠️ Data IKPA belum tersedia")
 
+    for fname, err in get_loader_stats().get("ikpa", {}).get("errors", {}).items():
+        add_notification(f"File IKPA {fname} gagal dimuat: {err}")
 
-    # ===============================
-    # LOAD IKPA KPPN DARI GITHUB
-    # ===============================
-    if "data_storage_kppn" not in st.session_state:
-        st.session_state.data_storage_kppn = {}
 
-    if not st.session_state.data_storage_kppn:
-        st.session_state.data_storage_kppn = load_data_ikpa_kppn_from_github()
+def load_kppn_dataset():
+    publish_datasets(data_storage_kppn=load_data_ikpa_kppn_from_github())
 
-    # ===============================
-    # NOTIF BERHASIL LOAD (SEKALI)
-    # ===============================
-    if st.session_state.data_storage_kppn and not st.session_state.get("_kppn_loaded_notif"):
+    if st.session_state.data_storage_kppn:
         add_notification("Data IKPA KPPN berhasil dimuat dari GitHub")
-        st.session_state["_kppn_loaded_notif"] = True
 
-    # ============================================================
-    # 3️⃣ AUTO LOAD DATA DIPA (HASIL PROCESSING STREAMLIT)
-    # ============================================================
-    if not st.session_state.DATA_DIPA_by_year:
-            load_DATA_DIPA_from_github()
 
-    # ============================================================
-    # 4️⃣ FINALISASI DATA DIPA (AMAN)
-    # ============================================================
-    if st.session_state.DATA_DIPA_by_year:
-        for tahun, df in st.session_state.DATA_DIPA_by_year.items():
-            df = df.copy()
-            if "Uraian Satker" in df.columns:
-                df["Uraian Satker-RINGKAS"] = (
-                    df["Uraian Satker"]
-                    .fillna("-")
-                    .astype(str)
-                    .str[:30]
-                )
-            else:
-                df["Uraian Satker-RINGKAS"] = "-"
-            st.session_state.DATA_DIPA_by_year[tahun] = df
+def finalize_dipa_by_year():
+    """Tambah kolom Uraian Satker-RINGKAS pada tahun yang belum punya."""
+    pending_dipa = {}
+    for tahun, df in st.session_state.DATA_DIPA_by_year.items():
+        if "Uraian Satker-RINGKAS" in df.columns:
+            continue
+        df = df.copy()
+        if "Uraian Satker" in df.columns:
+            df["Uraian Satker-RINGKAS"] = (
+                df["Uraian Satker"]
+                .fillna("-")
+                .astype(str)
+                .str[:30]
+            )
+        else:
+            df["Uraian Satker-RINGKAS"] = "-"
+        pending_dipa[tahun] = df
 
-    # ============================================================
-    # 5️⃣ AUTO MERGE IKPA + DIPA 
-    # ============================================================
-    if (
-        st.session_state.data_storage and
-        st.session_state.DATA_DIPA_by_year and
-        not st.session_state.ikpa_dipa_merged
-    ):
-            merge_ikpa_dipa_auto()
-            
-    # ============================================================
-    # NOTIF GLOBAL STATUS DATA (MUNCUL SAAT APP DIBUKA)
-    # ============================================================
-    if st.session_state.get("ikpa_dipa_merged", False):
-        add_notification("Data IKPA & DIPA berhasil dimuat dan siap digunakan")
-        
+    if pending_dipa:
+        update_dataset_items("DATA_DIPA_by_year", pending_dipa)
 
-    # ============================================================
-    # AUTO LOAD KKP SAAT PAGE DIBUKA
-    # ============================================================
-    if "kkp_master" not in st.session_state:
-        kkp_count = load_kkp_from_github()
 
-        if kkp_count > 0:
-            add_notification("Database utama KKP berhasil dimuat dari GitHub")
+def load_dipa_dataset():
+    if load_DATA_DIPA_from_github():
+        finalize_dipa_by_year()
 
 
-    # ============================================================
-    # AUTO LOAD CMS & DIGIPAY
-    # ============================================================
-    if "auto_loaded_cms" not in st.session_state:
-        cms_count = load_cms_from_github()
-        st.session_state.auto_loaded_cms = True
+def ikpa_dipa_ready():
+    # tanpa data di salah satu sisi tidak ada yang perlu di-merge
+    return (
+        st.session_state.get("ikpa_dipa_merged", False)
+        or not st.session_state.get("data_storage")
+        or not st.session_state.get("DATA_DIPA_by_year")
+    )
 
-        if cms_count > 0:
-            add_notification("Data CMS berhasil dimuat")
 
-    if "auto_loaded_digipay" not in st.session_state:
-        digipay_count = load_digipay_from_github()
-        st.session_state.auto_loaded_digipay = True
+def load_ikpa_dipa_dataset():
+    merge_ikpa_dipa_auto()
+    add_notification("Data IKPA & DIPA berhasil dimuat dan siap digunakan")
 
-        if digipay_count > 0:
-            add_notification("Data DIGIPAY berhasil dimuat")
 
-    if (
-        st.session_state.get("auto_loaded_cms") or
-        st.session_state.get("auto_loaded_digipay")
-    ):
-        add_notification("Data CMS & DIGIPAY berhasil dimuat dan siap digunakan")
-        
-    loading_placeholder.empty()
+def load_kkp_dataset():
+    if load_kkp_master_from_github():
+        add_notification("Database utama KKP berhasil dimuat dari GitHub")
+    else:
+        st.info("ℹ️ Belum ada database utama KKP di GitHub")
 
-    # ===============================
-    # PANEL STATUS SISTEM
-    # ===============================
-    if st.session_state.show_system_status and "loading_notifications" in st.session_state:
 
-        st.markdown("""
-        <style>
+def load_cms_dataset():
+    if load_cms_from_github() > 0:
+        add_notification("Data CMS berhasil dimuat")
 
-        /* SYSTEM STATUS BOX */
-        .system-status{
-            background:#f1f5f9;
-            border-radius:10px;
-            border:1px solid #e2e8f0;
 
-            padding:10px 16px;   /* sebelumnya lebih besar */
-            margin-bottom:8px;   /* lebih rapat ke elemen bawah */
-        }
+def load_digipay_dataset():
+    if load_digipay_from_github() > 0:
+        add_notification("Data DIGIPAY berhasil dimuat")
 
-        /* JUDUL */
-        .system-title{
-            font-size:15px;      /* sebelumnya sekitar 18-20 */
-            font-weight:600;
-            margin-bottom:3px;
-        }
 
-        /* TEXT STATUS */
-        .status-item{
-            font-size:13px;
-            line-height:1.4;
-        }
+DATASET_LOADERS = {
+    "reference": DatasetSpec(
+        "referensi satker", [],
+        lambda: dataset_loaded("reference_df"), load_reference_dataset,
+    ),
+    "ikpa": DatasetSpec(
+        "IKPA Satker", ["reference"],
+        lambda: dataset_loaded("ikpa_file_index"), load_ikpa_dataset,
+    ),
+    "kppn": DatasetSpec(
+        "IKPA KPPN", [],
+        lambda: dataset_loaded("data_storage_kppn"), load_kppn_dataset,
+    ),
+    "dipa": DatasetSpec(
+        "DIPA", ["reference"],
+        lambda: dataset_loaded("DATA_DIPA_by_year"), load_dipa_dataset,
+    ),
+    "ikpa_dipa": DatasetSpec(
+        "merge IKPA + DIPA", ["ikpa", "dipa"],
+        ikpa_dipa_ready, load_ikpa_dipa_dataset,
+    ),
+    "kkp": DatasetSpec(
+        "KKP", [],
+        lambda: dataset_loaded("kkp_master"), load_kkp_dataset,
+    ),
+    "cms": DatasetSpec(
+        "CMS", [],
+        lambda: dataset_loaded("cms_master"), load_cms_dataset,
+    ),
+    "digipay": DatasetSpec(
+        "DIGIPAY", [],
+        lambda: dataset_loaded("digipay_master"), load_digipay_dataset,
+    ),
+}
 
-        /* DOT HIJAU */
-        .status-ok{
-            color:#16a34a;
-            margin-right:6px;
-        }
+# Kebutuhan data per halaman / sub-menu
+PAGE_DATASETS = {
+    "Dashboard Utama/IKPA": ["reference", "ikpa_dipa"],
+    "Dashboard Utama/Digitalisasi": ["reference", "ikpa", "kkp", "digipay", "cms"],
+    "Dashboard Internal/EWS": ["reference", "ikpa_dipa"],
+    "Dashboard Internal/IKPA KPPN": ["kppn"],
+    "Admin": ["reference", "ikpa_dipa", "kppn", "kkp", "digipay", "cms"],
+}
 
-        </style>
-        """, unsafe_allow_html=True)
 
-        with st.expander("Detail proses loading sistem"):
+def resolve_datasets(names):
+    """Urutkan dataset beserta dependensinya (dependensi lebih dulu)."""
+    order = []
 
-            for msg in st.session_state.loading_notifications:
+    def visit(name):
+        if name in order:
+            return
+        for dep in DATASET_LOADERS[name].deps:
+            visit(dep)
+        order.append(name)
+
+    for name in names:
+        visit(name)
+    return order
+
+
+def ensure_datasets(*names):
+    """
+    Pastikan dataset `names` (+ dependensinya) sudah ada di store bersama.
+    Layar loading hanya muncul jika ada yang benar-benar harus diambil.
+    """
+    attach_datasets()
+    pending = [n for n in resolve_datasets(names) if not DATASET_LOADERS[n].loaded()]
+    if not pending:
+        return
+
+    store = get_dataset_store()
+    notif_start = len(st.session_state.get("loading_notifications", []))
+
+    placeholder = st.empty()
+    with placeholder.container():
+        show_loading_logo()
+        progress = st.progress(0.0)
+
+        for i, name in enumerate(pending):
+            spec = DATASET_LOADERS[name]
+            progress.progress(i / len(pending), text=f"Memuat {spec.label}...")
+
+            # sesi lain bisa saja sedang memuat dataset yang sama
+            with store.loading(f"ensure:{name}"):
+                attach_datasets()
+                if not spec.loaded():
+                    spec.load()
+
+    placeholder.empty()
+    render_system_status(st.session_state.get("loading_notifications", [])[notif_start:])
+
+
+# ===============================
+# PREFETCH DATASET DI LATAR BELAKANG
+# ===============================
+# Setelah halaman pembuka tampil, dataset sekunder dihangatkan di thread
+# pool milik proses. Job memakai lock yang sama dengan ensure_datasets,
+# jadi halaman yang butuh data saat prefetch berjalan cukup menunggu job
+# tersebut (tidak download dobel). Job tidak menyentuh st.* / session.
+PREFETCH_MAX_WORKERS = int(st.secrets.get("PREFETCH_MAX_WORKERS", 2))
+
+# nama dataset (DATASET_LOADERS) → (key di store, fetch(storage) → nilai)
+PREFETCH_JOBS = {
+    "kkp": ("kkp_master", fetch_kkp_master),
+    "digipay": (
+        "digipay_master",
+        lambda storage: fetch_master_folder(storage, "data_Digipay", "digipay")[0],
+    ),
+    "cms": (
+        "cms_master",
+        lambda storage: fetch_master_folder(storage, "data_CMS", "cms")[0],
+    ),
+    "kppn": ("data_storage_kppn", fetch_ikpa_kppn),
+}
+
+
+@st.cache_resource
+def get_prefetch_state():
+    """Thread pool + status job prefetch (bersama untuk semua sesi)."""
+    return {
+        "pool": ThreadPoolExecutor(
+            max_workers=PREFETCH_MAX_WORKERS, thread_name_prefix="prefetch"
+        ),
+        "jobs": {},
+    }
+
+
+def run_prefetch_job(name, storage, store, status):
+    key, fetch = PREFETCH_JOBS[name]
+    started = time.perf_counter()
+
+    with store.loading(f"ensure:{name}"):
+        if key in store.current()[1]:
+            status.update(state="skip", seconds=0.0)
+            return
+
+        status["state"] = "running"
+        try:
+            store.publish(**{key: fetch(storage)})
+        except Exception as e:
+            status.update(state="error", error=f"{type(e).__name__}: {e}")
+            return
+
+    status.update(state="done", seconds=time.perf_counter() - started)
+
+
+def start_prefetch():
+    """Jadwalkan prefetch untuk dataset yang belum ada / belum dijadwalkan."""
+    storage = get_storage()
+    if storage is None:
+        return
+
+    store = get_dataset_store()
+    state = get_prefetch_state()
+    snapshot = store.current()[1]
+
+    for name, (key, _) in PREFETCH_JOBS.items():
+        job = state["jobs"].get(name)
+        if key in snapshot or (job and job["state"] in ("queued", "running")):
+            continue
+
+        status = {"state": "queued"}
+        state["jobs"][name] = status
+        state["pool"].submit(run_prefetch_job, name, storage, store, status)
+
+
+def render_prefetch_status():
+    """Progress prefetch di panel status (diperbarui setiap rerun)."""
+    jobs = get_prefetch_state()["jobs"]
+    if not jobs:
+        return
+
+    labels = {
+        "queued": "menunggu",
+        "running": "sedang dimuat",
+        "done": "siap",
+        "skip": "sudah tersedia",
+        "error": "gagal",
+    }
+    done = sum(job["state"] in ("done", "skip") for job in jobs.values())
+
+    with st.expander(f"Data latar belakang: {done}/{len(jobs)} siap"):
+        st.progress(done / len(jobs))
+
+        for name, job in jobs.items():
+            text = f"{DATASET_LOADERS[name].label}: {labels[job['state']]}"
+            if job["state"] == "done":
+                text += f" ({job['seconds']:.1f} detik)"
+            elif job["state"] == "error":
+                text += f" — {job['error']}"
+
+            st.markdown(f"""
+            <div class="status-item">
+            <span class="status-ok">●</span> {text}
+            </div>
+            """, unsafe_allow_html=True)
+
+
+# ===============================
+# MAIN APP
+# ===============================
+def main():
+
+    # Data dimuat per halaman (lihat PAGE_DATASETS) → halaman pembuka
+    # tidak menunggu seluruh dataset.
+    attach_datasets()
 
-                st.markdown(f"""
-                <div class="status-item">
-                <span class="status-ok">●</span> {msg}
-                </div>
-                """, unsafe_allow_html=True)
-        
-        st.session_state.show_system_status = False
-            
-            
     # ============================================================
     # Sidebar + Routing halaman
     # ============================================================
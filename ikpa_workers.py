@@ -0,0 +1,859 @@
+"""
+Worker parse untuk process pool aplikasi (get_parse_pool di
+ikpa_dashboardtiga): baca Excel / Parquet, parser upload IKPA Satker &
+DIGIPAY, sidecar Parquet, beserta helper kode / nama satker yang dipakainya.
+
+Modul ini tidak meng-import streamlit dan tidak membaca Secrets, sehingga
+worker cukup meng-import modul ini — skrip Streamlit tidak pernah dijalankan
+ulang di proses worker (lihat parse_pool_context). Nilai dari Secrets
+diteruskan lewat configure_workers (juga initializer pool).
+"""
+import functools
+import hashlib
+import io
+import itertools
+import multiprocessing.context as mp_context
+import os
+import re
+import sys
+import threading
+import time
+import types
+
+import numpy as np
+import openpyxl
+import pandas as pd
+from openpyxl.cell.cell import ERROR_CODES
+from pandas.io.parsers import TextParser
+
+# Parquet (sidecar kolumnar) opsional: tanpa pyarrow loader tetap pakai xlsx
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# Engine Excel cepat opsional: tanpa python-calamine semua baca Excel pakai default pandas
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+# Copy-on-Write pandas (default sejak pandas 3.0): subset / salinan berbagi data
+# sampai salah satunya diubah → salinan defensif di helper & halaman tidak
+# lagi menggandakan frame periode aktif tiap rerun.
+PANDAS_COW_DEFAULT = int(pd.__version__.split(".")[0]) >= 3
+if not PANDAS_COW_DEFAULT:
+    pd.set_option("mode.copy_on_write", True)
+
+
+def copy_on_write_active():
+    return PANDAS_COW_DEFAULT or pd.get_option("mode.copy_on_write") is True
+
+
+def cow_copy(df):
+    """
+    Salinan df yang aman diubah tanpa menyentuh aslinya (mis. snapshot store):
+    lazy bila Copy-on-Write aktif, deep copy bila tidak.
+    """
+    return df.copy(deep=not copy_on_write_active())
+
+
+# ============================================================
+#  KONFIGURASI WORKER (DARI SECRETS APLIKASI)
+# ============================================================
+# EXCEL_ENGINE: "auto" / "calamine" / "openpyxl" (lihat excel_engine)
+# UPLOAD_CHUNK_ROWS: baris per chunk pembaca streaming
+EXCEL_ENGINE = "auto"
+UPLOAD_CHUNK_ROWS = 20_000
+HEADER_SCAN_ROWS = 20
+
+
+def configure_workers(excel_engine=None, chunk_rows=None):
+    """Set konfigurasi modul (proses aplikasi & tiap worker pool); None = tetap."""
+    global EXCEL_ENGINE, UPLOAD_CHUNK_ROWS
+    if excel_engine is not None:
+        EXCEL_ENGINE = str(excel_engine).lower()
+    if chunk_rows is not None:
+        UPLOAD_CHUNK_ROWS = int(chunk_rows)
+
+
+# ============================================================
+#  CONTEXT PROCESS POOL (WORKER TANPA __main__)
+# ============================================================
+# spawn / forkserver meng-import ulang modul __main__ di tiap worker. Di
+# bawah `streamlit run`, __main__ = skrip aplikasi → worker menjalankan
+# seluruh aplikasi (st.*, Secrets, loader). Saat worker dibuat __main__
+# diganti modul kosong sebentar, jadi worker hanya meng-import modul ini.
+_MAIN_SWAP_LOCK = threading.Lock()
+
+
+def _start_without_main(start):
+    with _MAIN_SWAP_LOCK:
+        original = sys.modules["__main__"]
+        stub = types.ModuleType("__main__")
+        sys.modules["__main__"] = stub
+        try:
+            start()
+        finally:
+            # skrip lain bisa mengganti __main__ di sela-sela → jangan ditimpa
+            if sys.modules.get("__main__") is stub:
+                sys.modules["__main__"] = original
+
+
+class _WithoutMain:
+    """Mixin Process: start() dengan __main__ kosong (lihat _start_without_main)."""
+
+    def start(self):
+        _start_without_main(super().start)
+
+
+class SpawnWorkerProcess(_WithoutMain, mp_context.SpawnProcess):
+    pass
+
+
+class SpawnWorkerContext(mp_context.SpawnContext):
+    Process = SpawnWorkerProcess
+
+
+if hasattr(mp_context, "ForkServerContext"):
+    class ForkServerWorkerProcess(_WithoutMain, mp_context.ForkServerProcess):
+        pass
+
+    class ForkServerWorkerContext(mp_context.ForkServerContext):
+        Process = ForkServerWorkerProcess
+
+
+def parse_pool_context(method):
+    """
+    Context multiprocessing `method` ("forkserver" / "spawn") untuk
+    ProcessPoolExecutor: worker tidak meng-import __main__; pada forkserver
+    modul ini (pandas, openpyxl) di-preload sekali di server.
+    """
+    if method == "forkserver":
+        ctx = ForkServerWorkerContext()
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return SpawnWorkerContext()
+
+
+# ============================================================
+#  KODE SATKER & KUNCI INTEGER (satker_id)
+# ============================================================
+def normalize_kode_satker(k, width=6):
+    if pd.isna(k):
+        return ''
+    s = str(k).strip()
+    digits = re.findall(r'\d+', s)
+    if not digits:
+        return ''
+    kod = digits[0].zfill(width)
+    return kod
+
+
+def normalize_kode_satker_series(values, width=6):
+    """
+    Versi Series dari normalize_kode_satker: deret angka pertama di-zfill;
+    NaN / tanpa angka → ''. Regex hanya dijalankan sekali per teks unik.
+    """
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values.astype(str))
+
+    kode = (
+        pd.Series(uniques, dtype=object)
+        .str.extract(r"(\d+)", expand=False)
+        .str.zfill(width)
+        .fillna("")
+        .to_numpy(dtype=object)
+    )
+    return pd.Series(kode[codes], index=values.index).where(values.notna(), "")
+
+
+# Kode satker 6 digit → int32 (diturunkan dari kode, bukan nomor urut)
+SATKER_ID = "satker_id"
+SATKER_ID_UNKNOWN = -1
+
+
+def satker_id_series(values):
+    """Kode satker (teks / angka, belum rapi) → satker_id int32; kosong / tidak valid → -1."""
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values.astype(str))
+
+    # normalisasi + konversi hanya sekali per teks unik
+    ids = pd.to_numeric(normalize_kode_satker_series(uniques), errors="coerce")
+    ids = ids.where(ids <= np.iinfo(np.int32).max)
+    ids = ids.fillna(SATKER_ID_UNKNOWN).astype("int32").to_numpy()
+    return pd.Series(ids[codes], index=values.index)
+
+
+def satker_ids(df, kode_col="Kode Satker"):
+    """Array satker_id df: kolom satker_id bila sudah ada, selain itu dihitung dari kode."""
+    if SATKER_ID in df.columns and df[SATKER_ID].dtype == "int32":
+        return df[SATKER_ID].to_numpy()
+    return satker_id_series(df[kode_col]).to_numpy()
+
+
+def without_satker_id(df):
+    """satker_id hanya kunci di memori → dibuang sebelum ekspor / simpan file."""
+    return df.drop(columns=[SATKER_ID], errors="ignore")
+
+
+# ============================================================
+#  ENGINE EXCEL (SEMUA BACA EXCEL LEWAT read_workbook)
+# ============================================================
+def excel_engine(engine=None):
+    """Nilai `engine` untuk pd.read_excel (None = pilihan default pandas)."""
+    engine = (engine or EXCEL_ENGINE).lower()
+    if engine in ("auto", "calamine") and CALAMINE_AVAILABLE:
+        return "calamine"
+    return None
+
+
+def read_workbook(source, engine=None, **kwargs):
+    """pd.read_excel dengan engine terpilih; argumen lain diteruskan apa adanya."""
+    return pd.read_excel(source, engine=excel_engine(engine), **kwargs)
+
+
+# ============================================================
+#  PEMBACA STREAMING (openpyxl read_only, PER CHUNK)
+# ============================================================
+# Sama dengan na_values default pandas → nilai sel identik dengan pd.read_excel
+EXCEL_NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+}
+
+
+def excel_cell_value(value):
+    """Konversi nilai sel openpyxl seperti reader openpyxl milik pandas."""
+    if value is None:
+        return np.nan
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and (value in EXCEL_NA_STRINGS or value in ERROR_CODES):
+        return np.nan
+    return value
+
+
+def excel_cell_text(value):
+    """Nilai sel seperti pd.read_excel(dtype=str): kosong/NA → NaN, selain itu str."""
+    value = excel_cell_value(value)
+    return value if value is np.nan else str(value)
+
+
+def _excel_text_row(row):
+    values = [excel_cell_text(v) for v in row]
+    # sel kosong di ujung kanan dibuang seperti reader pandas
+    while values and values[-1] is np.nan:
+        values.pop()
+    return values
+
+
+def iter_excel_chunks(uploaded_file, find_header, sheet_name=0, chunk_rows=None):
+    """
+    Baca xlsx secara streaming → (sheet, header, chunk).
+
+    find_header(head) menerima DataFrame HEADER_SCAN_ROWS baris pertama sheet
+    (nilai seperti read_excel(header=None, dtype=str)) dan mengembalikan posisi
+    baris header, atau None → sheet dilewati.
+    header = list nilai sel baris header; chunk = DataFrame object maksimal
+    `chunk_rows` baris data, kolom 0..n-1 selebar header (sel di luar itu diabaikan).
+    Baris kosong di akhir sheet dibuang seperti pd.read_excel.
+    sheet_name: indeks sheet, atau None → semua sheet berurutan.
+    """
+    chunk_rows = chunk_rows or UPLOAD_CHUNK_ROWS
+
+    uploaded_file.seek(0)
+    wb = openpyxl.load_workbook(uploaded_file, read_only=True, data_only=True)
+    try:
+        sheets = wb.worksheets if sheet_name is None else [wb.worksheets[sheet_name]]
+
+        for ws in sheets:
+            ws.reset_dimensions()
+            rows = (_excel_text_row(r) for r in ws.iter_rows(values_only=True))
+
+            head = list(itertools.islice(rows, HEADER_SCAN_ROWS))
+            width = max((len(r) for r in head), default=0)
+            head = [r + [np.nan] * (width - len(r)) for r in head]
+
+            header_row = find_header(pd.DataFrame(head, dtype=object)) if head else None
+            if header_row is None:
+                continue
+
+            header = head[header_row]
+            batch = []
+            blank_run = 0
+
+            for values in itertools.chain(head[header_row + 1:], rows):
+                if not values or all(v is np.nan for v in values):
+                    blank_run += 1
+                    continue
+
+                # baris kosong di tengah tetap ada (seperti read_excel)
+                batch.extend([[np.nan] * width] * blank_run)
+                blank_run = 0
+
+                values = values[:width]
+                batch.append(values + [np.nan] * (width - len(values)))
+
+                if len(batch) >= chunk_rows:
+                    yield ws.title, header, pd.DataFrame(batch, columns=range(width), dtype=object)
+                    batch = []
+
+            if batch:
+                yield ws.title, header, pd.DataFrame(batch, columns=range(width), dtype=object)
+    finally:
+        wb.close()
+
+
+def excel_header_names(header):
+    """Nama kolom dari nilai sel header, sama dengan read_excel(header=N)."""
+    values = ["" if v is np.nan else v for v in header]
+    return TextParser([values], header=0, skip_blank_lines=False).read().columns
+
+
+# ============================================================
+#  DIGIPAY (WORKER PER SHEET)
+# ============================================================
+DIGIPAY_COLUMNS = [
+    "TAHUN","KDKANWIL","NMKANWIL","KDKPPN","NMKPPN",
+    "KDSATKER","NMSATKER","NOINVOICE","NOMINVOICE",
+    "NMVENDOR","STSBAYAR","TGLBAYAR","BULAN",
+    "TGLINVOICE","KATEGORI","BANK_SATKER",
+    "BANK_VENDOR","SUBKATEGORI","CARA BAYAR"
+]
+
+DIGIPAY_UNIQUE_KEY = [
+    "TAHUN",
+    "KDSATKER",
+    "NOINVOICE",
+    "NOMINVOICE",
+    "TGLINVOICE"
+]
+
+
+def digipay_sheet_frame(path, sheet_index, streaming=False, chunk_rows=None):
+    """
+    Worker satu sheet DIGIPAY: baca (penuh atau streaming per chunk) lalu
+    normalize_digipay_rows. Return dict: df, rows (baris mentah), valid, seconds.
+    """
+    started = time.perf_counter()
+
+    if streaming:
+        parts = []
+        raw_rows = 0
+        with open(path, "rb") as f:
+            for _, header, chunk in iter_excel_chunks(
+                f, lambda head: 0, sheet_name=sheet_index, chunk_rows=chunk_rows
+            ):
+                raw_rows += len(chunk)
+                part = normalize_digipay_rows(chunk.set_axis(excel_header_names(header), axis=1))
+                if not part.empty:
+                    parts.append(part)
+        df = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+    else:
+        df_sheet = read_workbook(path, sheet_name=sheet_index, dtype=str)
+        raw_rows = len(df_sheet)
+        df = normalize_digipay_rows(df_sheet)
+
+    return {
+        "df": df,
+        "rows": raw_rows,
+        "valid": len(df),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def normalize_digipay_rows(df_sheet):
+    """Normalisasi + filter satu sheet / satu chunk upload DIGIPAY."""
+    df_all = df_sheet.copy()
+
+    # ====================================
+    # NORMALISASI KOLOM
+    # ====================================
+    df_all.columns = (
+        df_all.columns.astype(str)
+        .str.strip()
+        .str.upper()
+    )
+
+    # ==========================================
+    # 🔥 POTONG KOLOM SEBELUM "TAHUN"
+    # ==========================================
+    if "TAHUN" in df_all.columns:
+        start_index = df_all.columns.get_loc("TAHUN")
+        df_all = df_all.iloc[:, start_index:]
+
+    # ====================================
+    #  PERBAIKI LEADING ZERO OTOMATIS
+    # ====================================
+    for col, width in [("KDKANWIL", 2), ("KDKPPN", 3), ("KDSATKER", 6)]:
+        if col in df_all.columns:
+            df_all[col] = (
+                df_all[col]
+                .astype(str)
+                .str.replace(".0", "", regex=False)
+                .str.strip()
+                .str.zfill(width)
+            )
+
+    # ==========================================
+    # AMBIL HANYA KOLOM RESMI DIGIPAY
+    # ==========================================
+    df_all = df_all[[col for col in DIGIPAY_COLUMNS if col in df_all.columns]]
+
+    # sheet tanpa kolom KPPN / invoice tidak punya baris yang lolos filter
+    if not {"KDKPPN", "NMKPPN", "NOINVOICE"} <= set(df_all.columns):
+        return df_all.iloc[0:0]
+
+    # ====================================
+    # FILTER OTOMATIS KPPN 109 BATURAJA
+    # ====================================
+    df_all = df_all[
+        (df_all["KDKPPN"] == "109") &
+        (df_all["NMKPPN"].str.upper() == "BATURAJA")
+    ]
+
+    # ====================================
+    # FILTER HANYA STATUS SUDAH DIBAYAR
+    # ====================================
+    if "STSBAYAR" in df_all.columns:
+
+        df_all["STSBAYAR"] = (
+            df_all["STSBAYAR"]
+            .fillna("")
+            .astype(str)
+            .str.upper()
+            .str.strip()
+        )
+
+        df_all = df_all[
+            df_all["STSBAYAR"].str.contains("SUDAH", na=False)
+        ]
+
+    df_all = df_all[
+        df_all["NOINVOICE"].notna() &
+        (df_all["NOINVOICE"].astype(str).str.strip() != "")
+    ]
+
+    return df_all.drop_duplicates(
+        subset=[col for col in DIGIPAY_UNIQUE_KEY if col in df_all.columns]
+    )
+
+
+# ============================================================
+#  PARSER IKPA SATKER
+# ============================================================
+VALID_MONTHS = {
+    "JANUARI": "JANUARI",
+    "FEBRUARI": "FEBRUARI",
+    "PEBRUARI": "FEBRUARI",
+    "MARET": "MARET",
+    "APRIL": "APRIL",
+    "MEI": "MEI",
+    "JUNI": "JUNI",
+    "JULI": "JULI",
+    "JULY": "JULI",
+    "AGUSTUS": "AGUSTUS",
+    "AGUSTUSS": "AGUSTUS",
+    "SEPTEMBER": "SEPTEMBER",
+    "SEPT": "SEPTEMBER",
+    "OKTOBER": "OKTOBER",
+    "NOVEMBER": "NOVEMBER",
+    "NOPEMBER": "NOVEMBER",
+    "DESEMBER": "DESEMBER",
+}
+
+
+def ikpa_month_from_raw(df_raw):
+    # ===============================
+    # 1️⃣ AMBIL BULAN (AMAN)
+    # ===============================
+    try:
+        month_text = str(df_raw.iloc[1, 0])
+        month_raw = month_text.split(":")[-1].strip().upper()
+    except Exception:
+        month_raw = "JULI"
+
+    return VALID_MONTHS.get(month_raw, "JULI")
+
+
+# kolom hasil → (baris blok, kolom sheet); baris 0 = NILAI, 3 = NILAI ASPEK
+IKPA_SATKER_BLOCK_COLUMNS = {
+    "Kualitas Perencanaan Anggaran": (3, 6),
+    "Kualitas Pelaksanaan Anggaran": (3, 8),
+    "Kualitas Hasil Pelaksanaan Anggaran": (3, 12),
+
+    "Revisi DIPA": (0, 6),
+    "Deviasi Halaman III DIPA": (0, 7),
+    "Penyerapan Anggaran": (0, 8),
+    "Belanja Kontraktual": (0, 9),
+    "Penyelesaian Tagihan": (0, 10),
+    "Pengelolaan UP dan TUP": (0, 11),
+    "Capaian Output": (0, 12),
+
+    "Nilai Total": (0, 13),
+    "Konversi Bobot": (0, 14),
+    "Dispensasi SPM (Pengurang)": (0, 15),
+    "Nilai Akhir (Nilai Total/Konversi Bobot)": (0, 16),
+}
+
+
+def parse_ikpa_satker_blocks(df_raw, month, upload_year):
+    """
+    Versi vektor dari loop blok 4 baris (NILAI, BOBOT, NILAI AKHIR, ASPEK).
+    Setiap jenis baris diambil sekaligus lewat iloc[k::4], lalu kode satker
+    dibersihkan & difilter dalam 1 operasi kolom.
+    """
+    # ===============================
+    # 2️⃣ DATA MULAI BARIS KE-5
+    # ===============================
+    df_data = df_raw.iloc[4:].reset_index(drop=True)
+    df_data.columns = range(len(df_data.columns))
+
+    # hanya blok lengkap (sama dengan while i + 3 < len(df_data))
+    df_data = df_data.iloc[: len(df_data) // 4 * 4]
+    blocks = [df_data.iloc[k::4].reset_index(drop=True) for k in range(4)]
+    nilai = blocks[0]
+
+    if nilai.empty:
+        return pd.DataFrame()
+
+    # ===============================
+    # 🔴 FILTER AWAL (CEGAH NILAI/BOBOT)
+    # ===============================
+    kode_satker = normalize_kode_satker_series(
+        nilai[3].astype(str)
+        .str.replace("\u00a0", "", regex=False)   # hapus NBSP (spasi tak terlihat dari Excel)
+        .str.strip()
+    )
+    uraian_satker = nilai[4].astype(str).str.strip()
+
+    valid = (
+        kode_satker.str.fullmatch(r"\d{6}")
+        & (kode_satker != "000000")
+        & ~uraian_satker.str.upper().isin(["NILAI", "BOBOT", "NILAI AKHIR"])
+    )
+
+    if not valid.any():
+        return pd.DataFrame()
+
+    blocks = [block[valid].reset_index(drop=True) for block in blocks]
+    nilai = blocks[0]
+
+    # ===============================
+    # 3️⃣ DATAFRAME FINAL (1x BANGUN)
+    # ===============================
+    columns = {
+        "No": nilai[0],
+        "Kode KPPN": nilai[1].astype(str).str.strip("'"),
+        "Kode BA": nilai[2].astype(str).str.strip("'"),
+        "Kode Satker": kode_satker[valid].reset_index(drop=True),
+        "Uraian Satker": uraian_satker[valid].reset_index(drop=True),
+    }
+    for name, (row, col) in IKPA_SATKER_BLOCK_COLUMNS.items():
+        columns[name] = blocks[row][col]
+
+    df_final = pd.DataFrame(
+        {name: values.to_numpy(dtype=object) for name, values in columns.items()}
+    ).infer_objects()
+
+    df_final["Bulan"] = month
+    df_final["Tahun"] = upload_year
+
+    return df_final
+
+
+def process_excel_file(uploaded_file, upload_year):
+    """
+    PARSER IKPA SATKER — SATU-SATUNYA YANG BOLEH MEMBACA EXCEL MENTAH
+    (Sudah difilter baris invalid & bulan dinormalisasi)
+    """
+    df_raw = read_workbook(uploaded_file, header=None)
+    month = ikpa_month_from_raw(df_raw)
+
+    return parse_ikpa_satker_blocks(df_raw, month, upload_year), month, upload_year
+
+
+# ============================================================
+#  NAMA RINGKAS SATKER
+# ============================================================
+# Aturan AUTO-RINGKAS untuk nama satker yang tidak punya nama singkat
+# (urutan penting: "KOTA" harus setelah "KABUPATEN")
+SATKER_ABBREVIATIONS = [
+    ("KANTOR KEMENTERIAN AGAMA", "Kemenag"),
+    ("PENGADILAN AGAMA", "PA"),
+    ("RUMAH TAHANAN NEGARA", "Rutan"),
+    ("LEMBAGA PEMASYARAKATAN", "Lapas"),
+    ("BADAN PUSAT STATISTIK", "BPS"),
+    ("KANTOR PELAYANAN PERBENDAHARAAN NEGARA", "KPPN"),
+    ("KANTOR PELAYANAN PAJAK PRATAMA", "KPP Pratama"),
+    ("KABUPATEN", "Kab."),
+    ("KOTA", "Kota"),
+]
+
+# Batas cache AUTO-RINGKAS per nama (dipakai bersama semua sesi & thread;
+# nama satker wilayah KPPN jauh di bawah batas ini)
+SATKER_ABBREVIATION_CACHE_SIZE = 8192
+
+
+@functools.lru_cache(maxsize=SATKER_ABBREVIATION_CACHE_SIZE)
+def abbreviate_satker_name(name):
+    """Nama panjang → nama AUTO-RINGKAS (aturan SATKER_ABBREVIATIONS berurutan)."""
+    for long_name, short_name in SATKER_ABBREVIATIONS:
+        name = name.replace(long_name, short_name)
+    return name
+
+
+def abbreviate_satker_names(values):
+    """
+    AUTO-RINGKAS vektor: abbreviate_satker_name dijalankan sekali per nama
+    unik (LRU, aman antar thread), lalu dipetakan balik per baris.
+    Nilai bukan teks → NaN (sama seperti .str.replace).
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+
+    mapped = np.array(
+        [abbreviate_satker_name(u) if isinstance(u, str) else np.nan for u in uniques] + [np.nan],
+        dtype=object,
+    )
+    return mapped[codes]   # kode -1 (NaN) → elemen terakhir (NaN)
+
+
+def compile_reference_index(ref):
+    """
+    Referensi → Series {satker_id: Uraian Satker-SINGKAT} (kunci unik,
+    kode ganda → baris pertama, kode tidak valid dibuang). Nama referensi
+    sekaligus di-AUTO-RINGKAS ke cache supaya panggilan berikutnya tinggal map.
+    """
+    ids = satker_id_series(ref["Kode Satker"]).to_numpy()
+    keep = (ids != SATKER_ID_UNKNOWN) & ~pd.Index(ids).duplicated()
+    index = pd.Series(
+        np.asarray(ref["Uraian Satker-SINGKAT"], dtype=object)[keep],
+        index=pd.Index(ids[keep], name=SATKER_ID),
+    )
+
+    for col in ("Uraian Satker-LENGKAP", "Uraian Satker-SINGKAT"):
+        if col in ref.columns:
+            abbreviate_satker_names(ref[col])
+
+    return index
+
+
+def map_reference_short_names(df, ref, short_name_index=compile_reference_index):
+    """
+    Inti apply_reference_short_names (tanpa session_state): isi
+    'Uraian Satker-RINGKAS' / 'Uraian Satker Final' dari referensi `ref`
+    (None / kolom tidak lengkap → nama asli). short_name_index(ref) →
+    Series {satker_id: nama singkat}; aplikasi memakai indeks yang
+    dikompilasi sekali per versi referensi, worker pool compile_reference_index.
+    """
+    df = cow_copy(df)
+
+    # Ensure period columns exist
+    if 'Bulan' not in df.columns:
+        df['Bulan'] = ''
+    if 'Tahun' not in df.columns:
+        df['Tahun'] = ''
+
+    # If no reference, fallback silently to original names
+    if ref is None:
+        if 'Uraian Satker-RINGKAS' not in df.columns:
+            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
+        # also keep a final fallback column for compatibility
+        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
+        return df
+
+    # Normalize Kode Satker if column exists; else create empty codes to avoid crashes
+    if 'Kode Satker' in df.columns:
+        df['Kode Satker'] = normalize_kode_satker_series(df['Kode Satker'])
+    else:
+        df['Kode Satker'] = ''
+
+    if 'Kode Satker' not in ref.columns:
+        # If reference has no Kode Satker, cannot match — fallback
+        if 'Uraian Satker-RINGKAS' not in df.columns:
+            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
+        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
+        return df
+
+    # If the reference does not contain the expected short-name column, fallback
+    if 'Uraian Satker-SINGKAT' not in ref.columns:
+        if 'Uraian Satker-RINGKAS' not in df.columns:
+            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
+        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
+        return df
+
+    # Map on satker_id against the reference index; an existing short-name column is replaced instead
+    # of clashing (_x/_y)
+    try:
+        short_names = short_name_index(ref)
+        df_merged = df.drop(columns=['Uraian Satker-RINGKAS'], errors='ignore')
+        df_merged['Uraian Satker-RINGKAS'] = short_names.reindex(satker_ids(df_merged)).to_numpy()
+
+        # Create final name column using reference when available, otherwise fallback to original
+        df_merged['Uraian Satker-RINGKAS'] = df_merged['Uraian Satker-RINGKAS'].fillna(
+            df_merged.get('Uraian Satker', '')
+        )
+
+        # ======================================================
+        # AUTO-RINGKAS: jika ringkas == nama panjang
+        # ======================================================
+        orig = df_merged.get('Uraian Satker', '').fillna('').astype(str)
+        ring = df_merged['Uraian Satker-RINGKAS'].fillna('').astype(str)
+
+        mask = ring == orig
+
+        # Abbreviation rules come from the per-name cache (no str.replace chain per call)
+        df_merged.loc[mask, 'Uraian Satker-RINGKAS'] = abbreviate_satker_names(
+            df_merged.loc[mask, 'Uraian Satker-RINGKAS']
+        )
+
+        # Keep a generic final field for backward compatibility
+        df_merged['Uraian Satker Final'] = df_merged['Uraian Satker-RINGKAS']
+
+        # Drop the reference short-name column in case it remains under other names
+        df_merged = df_merged.drop(columns=['Uraian Satker-SINGKAT'], errors='ignore')
+
+        return df_merged
+
+    except Exception:
+        # Silent fallback (tanpa warning)
+        df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
+        df['Uraian Satker Final'] = df['Uraian Satker-RINGKAS']
+        return df
+
+
+def create_satker_column(df):
+    """
+    Creates 'Satker' column consistently across all data sources.
+    Should be called after apply_reference_short_names() / map_reference_short_names().
+    """
+    if 'Uraian Satker-RINGKAS' not in df.columns:
+        # fallback to older field names
+        if 'Uraian Satker Final' in df.columns:
+            df['Uraian Satker-RINGKAS'] = df['Uraian Satker Final']
+        else:
+            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
+
+    # Create Satker display using ringkas
+    df['Satker'] = (
+        df['Uraian Satker-RINGKAS'].astype(str) + 
+        ' (' + df['Kode Satker'].astype(str) + ')'
+    )
+    # Keep backward compatible column
+    df['Uraian Satker Final'] = df['Uraian Satker-RINGKAS']
+    return df
+
+
+# ============================================================
+#  SIDECAR PARQUET
+# ============================================================
+def git_blob_sha(content_bytes):
+    """SHA blob git (sama dengan sha di listing GitHub) untuk bytes file."""
+    header = f"blob {len(content_bytes)}\0".encode()
+    return hashlib.sha1(header + content_bytes).hexdigest()
+
+
+def sidecar_name(filename):
+    return f"{os.path.splitext(filename)[0]}.parquet"
+
+
+def to_parquet_bytes(df, source_sha=None):
+    """
+    DataFrame → bytes Parquet.
+    Kolom object campuran (mis. angka + teks) diseragamkan dulu agar bisa
+    ditulis Arrow; source_sha = SHA blob xlsx asal (disimpan di metadata).
+    """
+    df = without_satker_id(df)
+    df.columns = [str(c) for c in df.columns]
+
+    for col in df.columns[df.dtypes == object]:
+        kind = pd.api.types.infer_dtype(df[col], skipna=True)
+        if kind == "mixed-integer-float":
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        elif kind.startswith("mixed"):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+
+    if source_sha:
+        df.attrs["source_sha"] = source_sha
+
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False, engine="pyarrow")
+    return buf.getvalue()
+
+
+def read_table_bytes(raw, name, read_kwargs=None):
+    """Baca bytes file data: .parquet via Arrow, selain itu via read_excel."""
+    if name.lower().endswith(".parquet"):
+        return pd.read_parquet(io.BytesIO(raw))
+    return read_workbook(io.BytesIO(raw), **(read_kwargs or {}))
+
+
+def sidecar_files(df, excel_bytes, filename, folder):
+    """
+    {path: bytes} xlsx + sidecar-nya untuk ditulis dalam 1 commit.
+    Sidecar tidak bisa dibuat → path sidecar bernilai None: sidecar lama
+    ikut dihapus di commit yang sama (tidak tersaji data basi).
+    """
+    return {
+        f"{folder}/{filename}": excel_bytes,
+        f"{folder}/{sidecar_name(filename)}": parquet_sidecar_bytes(df, excel_bytes),
+    }
+
+
+def parquet_sidecar_bytes(df, excel_bytes):
+    """Bytes sidecar untuk xlsx `excel_bytes`; None jika tidak bisa dibuat."""
+    if not PARQUET_AVAILABLE:
+        return None
+
+    try:
+        return to_parquet_bytes(df, source_sha=git_blob_sha(excel_bytes))
+    except Exception:
+        return None
+
+
+# ============================================================
+#  UPLOAD IKPA SATKER (WORKER PER FILE)
+# ============================================================
+def prepare_ikpa_upload(content, name, upload_year, reference_df):
+    """
+    Bagian CPU satu file upload IKPA Satker (worker process pool, tanpa
+    session_state): parse → normalisasi → xlsx + sidecar Parquet.
+    Return dict: name, df, month, year, files {path: bytes} — atau name, error.
+    """
+    started = time.perf_counter()
+    try:
+        df_final, month, year = process_excel_file(io.BytesIO(content), upload_year)
+
+        if df_final is None or month == "UNKNOWN":
+            return {"name": name, "error": "bulan tidak terdeteksi"}
+
+        # NORMALISASI KODE SATKER
+        if "Kode Satker" in df_final.columns:
+            df_final["Kode Satker"] = normalize_kode_satker_series(
+                df_final["Kode Satker"].astype(str)
+            )
+
+        # NORMALISASI NAMA SATKER (WAJIB)
+        df_final = map_reference_short_names(df_final, reference_df)
+        df_final = create_satker_column(df_final)
+
+        # SIAPKAN FILE (xlsx + sidecar)
+        excel_bytes = io.BytesIO()
+        with pd.ExcelWriter(excel_bytes, engine="openpyxl") as writer:
+            df_final.to_excel(writer, index=False, sheet_name="Data IKPA")
+        excel_bytes = excel_bytes.getvalue()
+
+        filename = f"IKPA_{month}_{year}.xlsx"
+        files = sidecar_files(df_final, excel_bytes, filename, "data")
+
+        return {
+            "name": name, "df": df_final, "month": month, "year": year,
+            "files": files, "seconds": time.perf_counter() - started,
+        }
+
+    except Exception as e:
+        return {"name": name, "error": f"gagal diproses: {e}"}
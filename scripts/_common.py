@@ -0,0 +1,65 @@
+"""
+Bantuan bersama skrip offline di folder scripts/:
+import ikpa_dashboardtiga di luar `streamlit run` dan pengukuran waktu.
+
+Skrip ini TIDAK dijalankan di server Streamlit: benchmark / profil yang
+berat atau yang mengubah opsi global pandas cukup dijalankan dari terminal.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def load_app(storage_dir=None):
+    """
+    Import modul aplikasi dengan secrets sementara: storage lokal
+    (default: checkout repo ini) dan cache blob di folder temp.
+    Proses pindah ke folder temp tersebut → resolve path argumen dulu.
+    """
+    run_dir = Path(tempfile.mkdtemp(prefix="ikpa-scripts-"))
+    (run_dir / ".streamlit").mkdir()
+    (run_dir / ".streamlit" / "secrets.toml").write_text(
+        f"STORAGE_BACKEND = \"local\"\n"
+        f"LOCAL_STORAGE_DIR = {json.dumps(str(Path(storage_dir or REPO_ROOT).resolve()))}\n"
+        f"DATA_CACHE_DIR = {json.dumps(str(run_dir / 'cache'))}\n"
+    )
+    os.chdir(run_dir)
+
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    import ikpa_dashboardtiga
+    return ikpa_dashboardtiga
+
+
+def time_call(fn, *args, repeat=3, **kwargs):
+    """Durasi terbaik (detik) dari `repeat` kali pemanggilan + hasil terakhir."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def frames_identical(left, right):
+    """Sama persis: kolom, dtype, index dan nilai (NaN dianggap sama)."""
+    try:
+        pd.testing.assert_frame_equal(left, right, check_exact=True)
+        return True
+    except AssertionError:
+        return False
+
+
+def print_report(title, df):
+    """Cetak tabel hasil ke terminal."""
+    print(f"\n=== {title} ===")
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(df.to_string(index=False) if len(df) else "(tidak ada data)")
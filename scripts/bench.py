@@ -0,0 +1,384 @@
+"""
+Benchmark parser & jalur data (offline). Kecocokan hasil diuji di tests/;
+skrip ini hanya mengukur durasi / memori dan mencetak tabel ke terminal.
+
+    python scripts/bench.py              # semua benchmark
+    python scripts/bench.py ikpa_parser satker_join
+    python scripts/bench.py --list
+
+Workbook repo (DATA_DIPA, folder upload) dibaca dari --storage
+(default: checkout ini).
+"""
+import argparse
+import io
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from _common import load_app, print_report, time_call
+
+
+def benchmark_ikpa_parser(n_satker=5000, repeat=3):
+    """Durasi parser lama vs vektor pada sheet sintetis n_satker satker."""
+    df_raw = synthetic.synthetic_ikpa_satker_sheet(n_satker)
+
+    t_old, old = time_call(legacy.parse_ikpa_satker_blocks_legacy, df_raw, "AGUSTUS", 2025, repeat=repeat)
+    t_new, new = time_call(workers.parse_ikpa_satker_blocks, df_raw, "AGUSTUS", 2025, repeat=repeat)
+
+    return pd.DataFrame([
+        {"Parser": "loop 4 baris (lama)", "Satker": len(old), "Detik": round(t_old, 4), "Speedup": 1.0},
+        {"Parser": "vektor iloc[k::4]", "Satker": len(new), "Detik": round(t_new, 4),
+         "Speedup": round(t_old / t_new, 1)},
+    ])
+
+
+def benchmark_normalize_kode(n=100_000):
+    """normalize_kode_* lewat .apply vs versi Series."""
+    rows = []
+
+    for n_unique in (2_000, None):
+        values = synthetic.synthetic_kode_values(n, n_unique)
+
+        for name, scalar, vector in [
+            ("Kode Satker", app.normalize_kode_satker, app.normalize_kode_satker_series),
+            ("Kode BA", app.normalize_kode_ba, app.normalize_kode_ba_series),
+        ]:
+            t_old, _ = time_call(values.apply, scalar)
+            t_new, _ = time_call(vector, values)
+            rows.append({
+                "Fungsi": name,
+                "Kode": n,
+                "Satker unik": n_unique or "semua",
+                ".apply (detik)": round(t_old, 4),
+                "Series (detik)": round(t_new, 4),
+                "Speedup": round(t_old / t_new, 1),
+            })
+
+    return pd.DataFrame(rows)
+
+
+def benchmark_satker_join(n_rows=500_000, n_satker=2_000, views=5):
+    """
+    Nama referensi ke `views` view: merge teks Kode Satker (normalisasi ulang
+    tiap view) vs satker_id yang ditempel sekali saat publish + satker_lookup.
+    """
+    rng = np.random.default_rng(0)
+    pool = rng.choice(np.arange(1, 999_999), n_satker, replace=False)
+    ref = pd.DataFrame({
+        "Kode Satker": [f"{k:06d}" for k in pool],
+        "Uraian Satker-SINGKAT": [f"SATKER {k}" for k in pool],
+    })
+    # ~10% kode di luar referensi
+    facts = pd.DataFrame({"Kode Satker": rng.choice(np.append(pool, pool[:200] + 1), n_rows).astype(str)})
+
+    def old_views():
+        out = None
+        for _ in range(views):
+            df = facts.assign(**{"Kode Satker": facts["Kode Satker"].astype(str).str.zfill(6)})
+            out = df.merge(ref, on="Kode Satker", how="left")["Uraian Satker-SINGKAT"]
+        return out
+
+    def new_views(keyed):
+        key_ids = app.satker_id_series(ref["Kode Satker"])
+        out = None
+        for _ in range(views):
+            out = app.satker_lookup(app.satker_ids(keyed), key_ids, ref["Uraian Satker-SINGKAT"])
+        return out
+
+    t_old, _ = time_call(old_views, repeat=1)
+    t_attach, keyed = time_call(app.attach_satker_id, facts, repeat=1)
+    t_new, _ = time_call(new_views, keyed)
+
+    return pd.DataFrame([{
+        "Baris": n_rows,
+        "View": views,
+        "Merge teks (detik)": round(t_old, 3),
+        "Tempel satker_id, sekali (detik)": round(t_attach, 3),
+        "Lookup satker_id (detik)": round(t_new, 3),
+        "Speedup": round(t_old / max(t_attach + t_new, 1e-9), 1),
+    }])
+
+
+def benchmark_id_number_parser(n_rows=100_000, n_cols=8):
+    """Loop per kolom lama vs parse_id_numbers sekali blok."""
+    block = synthetic.synthetic_id_number_block(n_rows, n_cols)
+
+    t_new, _ = time_call(app.parse_id_numbers, block)
+    rows = []
+    for style, label in [("nominal", "clean_nominal / CMS"), ("kppn", "applymap KPPN")]:
+        t_old, _ = time_call(legacy.id_numbers_legacy, block, style, repeat=1)
+        rows.append({
+            "Versi lama": label,
+            "Sel": n_rows * n_cols,
+            "Lama (detik)": round(t_old, 3),
+            "parse_id_numbers (detik)": round(t_new, 3),
+            "Speedup": round(t_old / t_new, 1),
+        })
+
+    return pd.DataFrame(rows)
+
+
+def benchmark_ikpa_fact_table(n_satker=400, views=3):
+    """
+    `views` view membangun concat sendiri vs tabel fakta dibangun sekali +
+    query_ikpa_facts per view; plus memori.
+    """
+    storage = synthetic.synthetic_ikpa_storage(n_satker)
+
+    def old_views():
+        return [legacy.ikpa_concat_legacy(storage) for _ in range(views)]
+
+    def new_views(facts):
+        return [app.query_ikpa_facts(facts=facts) for _ in range(views)]
+
+    t_old, old = time_call(old_views, repeat=1)
+    # tabel fakta dibangun sekali per versi data; rerun berikutnya hanya query
+    t_build, facts = time_call(app.build_ikpa_fact_table, storage, repeat=1)
+    t_new, _ = time_call(new_views, facts)
+    t_query, _ = time_call(app.query_ikpa_facts, 202401, 202412, facts=facts)
+
+    return pd.DataFrame([{
+        "Periode": len(storage),
+        "Baris": len(facts),
+        f"Concat lama × {views} view (detik)": round(t_old, 3),
+        "Bangun fakta, sekali (detik)": round(t_build, 3),
+        f"Query × {views} view (detik)": round(t_new, 3),
+        "Query 1 tahun (detik)": round(t_query, 4),
+        "Memori concat (MB)": round(old[0].memory_usage(deep=True).sum() / 1e6, 1),
+        "Memori fakta (MB)": round(facts.memory_usage(deep=True).sum() / 1e6, 1),
+    }])
+
+
+def benchmark_reference_short_names(n_satker=1_000, years=(2022, 2023, 2024, 2025)):
+    """
+    apply_reference_short_names pada histori 4 tahun: per periode (seperti
+    saat load) + sekali pada frame tren gabungan. Lama: referensi dinormalisasi
+    dan rantai str.replace tiap panggilan; baru: indeks referensi + cache singkatan.
+    """
+    storage, ref = synthetic.synthetic_reference_storage(n_satker, years=years)
+    trend = pd.concat(storage.values(), ignore_index=True)
+
+    def run(fn):
+        return [fn(df, ref=ref) for df in storage.values()] + [fn(trend, ref=ref)]
+
+    t_compile, _ = time_call(app.compile_reference_index, ref, repeat=1)
+    t_old, _ = time_call(run, legacy.apply_reference_short_names_legacy, repeat=1)
+    t_new, _ = time_call(run, app.apply_reference_short_names)
+
+    return pd.DataFrame([{
+        "Periode": len(storage),
+        "Baris tren": len(trend),
+        "Lama (detik)": round(t_old, 3),
+        "Kompilasi referensi, sekali (detik)": round(t_compile, 4),
+        "Indeks + map (detik)": round(t_new, 3),
+        "Speedup": round(t_old / max(t_new, 1e-9), 1),
+    }])
+
+
+def report_ikpa_storage_memory(n_satker=1_000, years=(2022, 2023, 2024, 2025)):
+    """Memori per periode data_storage sintetis: frame tampilan lengkap vs skema ringkas."""
+    storage = synthetic.synthetic_ikpa_storage(n_satker, years=years)
+
+    rows = []
+    for (bulan, tahun), df in storage.items():
+        full = app.expand_ikpa_period(df)
+        compact = app.compact_ikpa_period(full)
+        rows.append({
+            "Periode": f"{bulan} {tahun}",
+            "Baris": len(full),
+            "Sebelum (KB)": round(full.memory_usage(deep=True).sum() / 1024, 1),
+            "Sesudah (KB)": round(compact.memory_usage(deep=True).sum() / 1024, 1),
+        })
+
+    report = pd.DataFrame(rows)
+    report.loc[len(report)] = {
+        "Periode": "TOTAL",
+        "Baris": int(report["Baris"].sum()),
+        "Sebelum (KB)": round(report["Sebelum (KB)"].sum(), 1),
+        "Sesudah (KB)": round(report["Sesudah (KB)"].sum(), 1),
+    }
+    report["Hemat (%)"] = (100 * (1 - report["Sesudah (KB)"] / report["Sebelum (KB)"])).round(1)
+    return report
+
+
+def benchmark_upload_grid():
+    """Workbook upload di storage: baca ulang read_workbook per header/dtype vs grid sekali baca."""
+    storage = app.get_storage()
+
+    rows = []
+    for folder in ["data_kppn", "data_kkp", "DATA_DIPA", "data_CMS", "data_Digipay"]:
+        try:
+            files = [f for f in storage.list(folder) if f.name.endswith(".xlsx")]
+        except FileNotFoundError:
+            continue
+
+        for f in files:
+            content = storage.read(f)
+            t_grid, grids = time_call(app.read_excel_grid, io.BytesIO(content), None, repeat=1)
+
+            t_reread = 0.0
+            for sheet, grid in grids.items():
+                for header_row in (None, 0, 1, 2):
+                    if header_row is not None and header_row >= len(grid):
+                        continue
+                    for dtype in (None, str):
+                        t, _ = time_call(
+                            app.read_workbook, io.BytesIO(content),
+                            sheet_name=sheet, header=header_row, dtype=dtype, repeat=1,
+                        )
+                        t_reread += t
+                        t, _ = time_call(app.frame_from_grid, grid, header_row, dtype, repeat=1)
+                        t_grid += t
+
+            rows.append({
+                "File": f"{folder}/{f.name}",
+                "Sheet": len(grids),
+                "Baca ulang (detik)": round(t_reread, 3),
+                "Grid + potong (detik)": round(t_grid, 3),
+            })
+
+    return pd.DataFrame(rows)
+
+
+def benchmark_streaming_upload(n_rows=60_000):
+    """Upload KKP & DIGIPAY sintetis: grid penuh vs streaming — durasi dan puncak memori."""
+    cases = [
+        ("KKP", synthetic.synthetic_kkp_upload(n_rows), app.process_excel_file_kkp),
+        ("DIGIPAY", synthetic.synthetic_digipay_upload(n_rows), app.process_digipay_upload),
+    ]
+
+    rows = []
+    for name, buf, parser in cases:
+        content = buf.getvalue()
+
+        for streaming in (False, True):
+            t, result = time_call(parser, io.BytesIO(content), streaming=streaming, repeat=1)
+
+            # puncak memori diukur terpisah (tracemalloc memperlambat parser)
+            tracemalloc.start()
+            parser(io.BytesIO(content), streaming=streaming)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+            rows.append({
+                "Upload": name,
+                "Mode": "streaming" if streaming else "grid penuh",
+                "Baris file": n_rows,
+                "Baris valid": len(result),
+                "Detik": round(t, 2),
+                "Puncak memori (MB)": round(peak / 1024 / 1024, 1),
+            })
+
+    return pd.DataFrame(rows)
+
+
+def benchmark_digipay_sheets(n_sheets=24, rows_per_sheet=5_000):
+    """Upload DIGIPAY multi sheet: berurutan vs parse pool."""
+    buf = synthetic.synthetic_digipay_upload(n_sheets * rows_per_sheet, n_sheets=n_sheets)
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(buf.getvalue())
+        t_seq, sequential = time_call(
+            lambda: [app.digipay_sheet_frame(path, i) for i in range(n_sheets)], repeat=1,
+        )
+    finally:
+        os.remove(path)
+
+    # pool dibuat (dan worker di-import) di luar pengukuran
+    app.get_parse_pool()
+    sheets = []
+    t_pool, df = time_call(
+        app.process_digipay_upload, buf, streaming=False,
+        on_sheet=lambda result, done, total: sheets.append(result["seconds"]),
+        repeat=1,
+    )
+
+    return pd.DataFrame([
+        {"Mode": "berurutan", "Sheet": n_sheets, "Detik total": round(t_seq, 2),
+         "Sheet terlama (detik)": round(max(r["seconds"] for r in sequential), 2)},
+        {"Mode": "parse pool", "Sheet": n_sheets,
+         "Baris valid": len(df), "Detik total": round(t_pool, 2),
+         "Sheet terlama (detik)": round(max(sheets), 2)},
+    ])
+
+
+def benchmark_dipa_format_detection():
+    """
+    Format DIPA tiap workbook DATA_DIPA di storage: fingerprint registry
+    (DIPA_FINGERPRINT_ROWS baris awal) vs scan marker OMSPAN seluruh sheet.
+    """
+    storage = app.get_storage()
+    try:
+        files = [f for f in storage.list("DATA_DIPA") if f.name.endswith(".xlsx")]
+    except FileNotFoundError:
+        return pd.DataFrame()
+
+    rows = []
+    for f in files:
+        grid = app.read_excel_grid(io.BytesIO(storage.read(f)))
+
+        t_full, _ = time_call(
+            app.header_keyword_hits, grid, ["OMSPAN", "PAGU_RUPIAH", "KODE_SATKER"], max_rows=None,
+        )
+        t_fp, (key, header_row) = time_call(app.detect_dipa_format, grid)
+        t_parse, df = (0.0, None) if key is None else time_call(
+            app.DIPA_FORMATS[key].parser, grid, header_row, repeat=1,
+        )
+
+        rows.append({
+            "File": f.name,
+            "Baris": len(grid),
+            "Format": app.DIPA_FORMATS[key].label if key else "❌ tidak dikenali",
+            "Header (baris)": None if header_row is None else header_row + 1,
+            "Scan penuh (detik)": round(t_full, 4),
+            "Fingerprint (detik)": round(t_fp, 4),
+            "Parse (detik)": round(t_parse, 3),
+            "Baris hasil": 0 if df is None else len(df),
+        })
+
+    return pd.DataFrame(rows)
+
+
+BENCHMARKS = {
+    "ikpa_parser": ("Parser IKPA Satker — 5.000 satker", benchmark_ikpa_parser),
+    "normalize_kode": ("Normalisasi kode satker / BA — 100 ribu kode", benchmark_normalize_kode),
+    "satker_join": ("Join satker — merge teks vs satker_id", benchmark_satker_join),
+    "id_numbers": ("Angka format Indonesia — 800 ribu sel", benchmark_id_number_parser),
+    "ikpa_fact_table": ("Tabel fakta IKPA — concat per view vs sekali bangun", benchmark_ikpa_fact_table),
+    "reference_short_names": ("Nama ringkas referensi — histori 4 tahun", benchmark_reference_short_names),
+    "ikpa_storage_memory": ("Memori data_storage — lengkap vs skema ringkas", report_ikpa_storage_memory),
+    "upload_grid": ("Workbook upload — grid sekali baca vs read_excel", benchmark_upload_grid),
+    "streaming_upload": ("Upload KKP / DIGIPAY — grid penuh vs streaming", benchmark_streaming_upload),
+    "digipay_sheets": ("Upload DIGIPAY — 24 sheet, berurutan vs parse pool", benchmark_digipay_sheets),
+    "dipa_format": ("Format DIPA — fingerprint registry vs scan penuh", benchmark_dipa_format_detection),
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("names", nargs="*", metavar="NAMA", help="benchmark yang dijalankan (default: semua)")
+    parser.add_argument("--list", action="store_true", help="tampilkan daftar benchmark")
+    parser.add_argument("--storage", help="root storage lokal (default: checkout ini)")
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (title, _) in BENCHMARKS.items():
+            print(f"{name:24} {title}")
+        raise SystemExit
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"benchmark tidak dikenal: {', '.join(unknown)} (lihat --list)")
+
+    app = load_app(args.storage)
+    import ikpa_workers as workers
+    from tests import legacy, synthetic
+
+    for name in args.names or BENCHMARKS:
+        title, fn = BENCHMARKS[name]
+        print_report(title, fn())
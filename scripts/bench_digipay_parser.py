@@ -0,0 +1,47 @@
+"""
+Throughput parser DIGIPAY (offline — loop lama 1 juta baris ±40 detik CPU):
+- parse in-memory --rows baris (loop lama vs kolom)
+- baca + parse xlsx --file-rows baris (read_excel penuh vs streaming + pushdown tahun)
+
+    python scripts/bench_digipay_parser.py [--rows 1000000] [--file-rows 50000]
+"""
+import argparse
+
+import pandas as pd
+
+from _common import load_app, print_report, time_call
+
+
+def benchmark_digipay_parser(n_rows=1_000_000, n_file_rows=50_000):
+    df_raw = synthetic.synthetic_digipay_export(n_rows)
+    t_old, _ = time_call(legacy.process_excel_digipay_legacy, df_raw, 2025, repeat=1)
+    t_new, _ = time_call(app.parse_digipay_rows, df_raw, 2025, repeat=1)
+
+    buf = synthetic.to_xlsx_buffer(synthetic.synthetic_digipay_export(n_file_rows))
+    t_read_old, _ = time_call(
+        lambda: app.parse_digipay_rows(pd.read_excel(buf, header=None), 2025), repeat=1
+    )
+    t_read_new, _ = time_call(app.process_excel_digipay, buf, 2025, repeat=1)
+
+    return pd.DataFrame([
+        {"Tahap": f"parse {n_rows:,} baris — loop lama", "Detik": round(t_old, 3),
+         "Baris/detik": int(n_rows / t_old), "Speedup": 1.0},
+        {"Tahap": f"parse {n_rows:,} baris — kolom", "Detik": round(t_new, 3),
+         "Baris/detik": int(n_rows / t_new), "Speedup": round(t_old / t_new, 1)},
+        {"Tahap": f"xlsx {n_file_rows:,} baris — read_excel penuh", "Detik": round(t_read_old, 3),
+         "Baris/detik": int(n_file_rows / t_read_old), "Speedup": 1.0},
+        {"Tahap": f"xlsx {n_file_rows:,} baris — streaming + filter tahun", "Detik": round(t_read_new, 3),
+         "Baris/detik": int(n_file_rows / t_read_new), "Speedup": round(t_read_old / t_read_new, 1)},
+    ])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000, help="baris parse in-memory")
+    parser.add_argument("--file-rows", type=int, default=50_000, help="baris workbook xlsx")
+    args = parser.parse_args()
+
+    app = load_app()
+    from tests import legacy, synthetic
+
+    print_report("Parser DIGIPAY", benchmark_digipay_parser(args.rows, args.file_rows))
@@ -0,0 +1,66 @@
+"""
+Engine Excel — durasi baca (header=None, semua sheet) tiap workbook per engine,
+dan apakah hasil calamine identik dengan openpyxl.
+
+    python scripts/bench_excel_engines.py FOLDER [--recursive]
+
+Workbook dibaca langsung dari disk (mis. checkout repo data atau folder
+unduhan); tanpa python-calamine hanya openpyxl yang diukur.
+"""
+import argparse
+import io
+from pathlib import Path
+
+import pandas as pd
+
+from _common import frames_identical, print_report, time_call
+
+try:
+    import python_calamine  # noqa: F401
+    CALAMINE_AVAILABLE = True
+except ImportError:
+    CALAMINE_AVAILABLE = False
+
+
+def benchmark_excel_engines(folder, recursive=False):
+    engines = ["openpyxl"] + (["calamine"] if CALAMINE_AVAILABLE else [])
+    paths = sorted(folder.rglob("*.xlsx") if recursive else folder.glob("*.xlsx"))
+
+    rows = []
+    for path in paths:
+        if path.name.startswith("~$"):   # file kunci Excel
+            continue
+        content = path.read_bytes()
+        row = {"File": str(path.relative_to(folder))}
+        frames = {}
+
+        for engine in engines:
+            t, frames[engine] = time_call(
+                pd.read_excel, io.BytesIO(content),
+                engine=engine, sheet_name=None, header=None, repeat=1,
+            )
+            row[f"{engine} (detik)"] = round(t, 3)
+
+        if "calamine" in frames:
+            row["Speedup"] = round(row["openpyxl (detik)"] / max(row["calamine (detik)"], 1e-9), 1)
+            row["Identik"] = frames["openpyxl"].keys() == frames["calamine"].keys() and all(
+                frames_identical(frames["openpyxl"][sheet], frames["calamine"][sheet])
+                for sheet in frames["openpyxl"]
+            )
+        rows.append(row)
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder", type=Path, help="folder berisi workbook .xlsx")
+    parser.add_argument("--recursive", action="store_true", help="ikut sub-folder")
+    args = parser.parse_args()
+
+    folder = args.folder.resolve()
+    if not folder.is_dir():
+        parser.error(f"folder tidak ditemukan: {folder}")
+
+    print_report("Engine Excel — openpyxl vs calamine",
+                 benchmark_excel_engines(folder, args.recursive))
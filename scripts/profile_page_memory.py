@@ -0,0 +1,174 @@
+"""
+Profil alokasi satu rerun per halaman: Copy-on-Write pandas mati vs aktif.
+
+Jalur data tiap halaman (tanpa elemen UI, urutan helper sama dengan halaman
+aslinya) dijalankan 2x di proses skrip ini: CoW mati (cow_copy = deep copy,
+setara salinan defensif lama) lalu CoW aktif; puncak diukur tracemalloc.
+Opsi CoW diubah di proses offline ini saja — jangan dijalankan di server
+Streamlit (opsi pandas bersifat global untuk semua sesi).
+
+    python scripts/profile_page_memory.py [--storage DIR] [--synthetic]
+
+Data diambil dari storage lokal (default: checkout ini); --synthetic atau
+folder data/ kosong → data IKPA sintetis 4 tahun.
+"""
+import argparse
+import io
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from _common import frames_identical, load_app, print_report
+
+
+def latest_ikpa_key(storage):
+    return max(storage, key=lambda k: (int(k[1]), app.ikpa_month_number(k[0])))
+
+
+def profile_dashboard_utama(state):
+    storage = state["data_storage"]
+    df = app.expand_ikpa_period(storage[latest_ikpa_key(storage)])
+
+    df["Kode BA"] = app.normalize_kode_ba_series(df["Kode BA"])
+    df = app.apply_filter_ba(df)
+    if "Satker" not in df.columns:
+        df = app.create_satker_column(df)
+    df["Jenis Satker"] = df["Jenis Satker"].astype(str)
+
+    nilai_col = "Nilai Akhir (Nilai Total/Konversi Bobot)"
+    for jenis in ("KECIL", "SEDANG", "BESAR"):
+        app.get_top_bottom_unique(df[df["Jenis Satker"] == jenis], nilai_col)
+
+    problem_col = "Deviasi Halaman III DIPA"
+    df[problem_col] = pd.to_numeric(df[problem_col], errors="coerce")
+    df_problem = df[df[problem_col].notna() & (df[problem_col] < 90)]
+    if not df_problem.empty:
+        app.create_problem_chart(df_problem, column=problem_col, threshold=90, title="")
+    return df
+
+
+def profile_ews_satker(state):
+    storage = state["data_storage"]
+    df_trend = app.apply_reference_short_names(
+        app.query_ikpa_facts(facts=state["ikpa_facts"]), ref=state.get("reference_df")
+    )
+
+    df_latest = app.expand_ikpa_period(storage[latest_ikpa_key(storage)])
+    df_latest["Kode BA"] = app.normalize_kode_ba_series(df_latest["Kode BA"])
+    df_latest["Satker_Internal"] = (
+        "[" + df_latest["Kode BA"] + "] "
+        + df_latest["Uraian Satker-RINGKAS"].astype(str)
+        + " (" + df_latest["Kode Satker"].astype(str) + ")"
+    )
+
+    for column in ("Pengelolaan UP dan TUP", "Capaian Output"):
+        df_chart = app.cow_copy(df_latest)
+        df_chart["Satker"] = df_chart["Satker_Internal"]
+        app.create_internal_problem_chart_vertical(df_chart, column=column, threshold=100, title="")
+    return df_trend
+
+
+def profile_detail_kkp(state):
+    df_master = app.cow_copy(state["kkp_master"])
+    df_master["PERIODE"] = df_master["PERIODE"].astype(str)
+    df_master["TAHUN"] = df_master["PERIODE"].str[:4].astype(int)
+    df_master["BULAN"] = df_master["PERIODE"].str[5:7].astype(int)
+
+    df_pivot = app.generate_kkp_from_session(
+        df_master, periode="Bulanan", tipe="Jumlah Nominal",
+        tahun_filter=df_master["TAHUN"].max(),
+    )
+    df_pivot["Kode Satker"] = df_pivot["Kode Satker"].astype(str).str.zfill(6)
+    df_pivot = app.add_kkp_pagu_column(df_pivot, df_master)
+    return app.add_kkp_percentage_columns(df_pivot, df_master)
+
+
+PAGE_PROFILES = {
+    "Dashboard Utama — periode aktif": (("data_storage",), profile_dashboard_utama),
+    "Dashboard Internal — EWS satker": (("data_storage",), profile_ews_satker),
+    "Detail — KKP bulanan": (("kkp_master",), profile_detail_kkp),
+}
+
+
+def traced_peak(fn, state):
+    """(puncak alokasi tracemalloc dalam byte, hasil) untuk fn(state)."""
+    tracemalloc.start()
+    try:
+        result = fn(state)
+        return tracemalloc.get_traced_memory()[1], result
+    finally:
+        tracemalloc.stop()
+
+
+def load_state(synthetic=False):
+    """Dataset halaman dari storage lokal (via DatasetStore, seperti aplikasi)."""
+    storage = app.get_storage()
+    store = app.get_dataset_store()
+
+    if not synthetic:
+        app.sync_ikpa_storage()
+        try:
+            store.publish(kkp_master=app.fetch_kkp_master(storage))
+        except FileNotFoundError:
+            pass
+        try:
+            ref = app.read_workbook(
+                io.BytesIO(storage.read("templates/Template_Data_Referensi.xlsx")), dtype=str
+            )
+            store.publish(reference_df=ref)
+        except FileNotFoundError:
+            pass
+
+    state = dict(store.current()[1])
+    if not state.get("data_storage"):
+        ikpa = synthetic_ikpa_storage(1_000, years=(2022, 2023, 2024, 2025))
+        store.publish(data_storage={
+            key: app.classify_jenis_satker(app.merge_ikpa_with_dipa(app.create_satker_column(df)))
+            for key, df in ikpa.items()
+        })
+        state = dict(store.current()[1])
+
+    # tabel fakta dibangun sekali per versi data → di luar pengukuran
+    state["ikpa_facts"] = app.build_ikpa_fact_table(state["data_storage"])
+    return state
+
+
+def profile_page_memory(state):
+    rows = []
+    for page, (datasets, fn) in PAGE_PROFILES.items():
+        if any(state.get(name) is None or len(state[name]) == 0 for name in datasets):
+            rows.append({"Halaman": page, "Catatan": "dataset belum dimuat"})
+            continue
+
+        if workers.PANDAS_COW_DEFAULT:   # pandas ≥ 3: CoW tidak bisa dimatikan
+            before, old = np.nan, None
+        else:
+            with pd.option_context("mode.copy_on_write", False):
+                before, old = traced_peak(fn, state)
+        after, new = traced_peak(fn, state)
+
+        rows.append({
+            "Halaman": page,
+            "Puncak CoW mati (MB)": round(before / 1e6, 2),
+            "Puncak CoW aktif (MB)": round(after / 1e6, 2),
+            "Turun (%)": round(100 * (1 - after / before), 1),
+            "Identik": old is None or frames_identical(old, new),
+            "Catatan": "",
+        })
+
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--storage", help="root storage lokal (default: checkout ini)")
+    parser.add_argument("--synthetic", action="store_true", help="pakai data IKPA sintetis")
+    args = parser.parse_args()
+
+    app = load_app(args.storage)
+    import ikpa_workers as workers
+    from tests.synthetic import synthetic_ikpa_storage
+
+    print_report("Alokasi per halaman — Copy-on-Write mati vs aktif",
+                 profile_page_memory(load_state(args.synthetic)))
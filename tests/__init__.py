@@ -0,0 +1,8 @@
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def repo_workbooks(*folders):
+    """Workbook .xlsx di folder data repo (folder tidak ada → dilewati)."""
+    return [path for folder in folders for path in sorted((REPO_ROOT / folder).glob("*.xlsx"))]
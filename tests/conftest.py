@@ -0,0 +1,22 @@
+"""
+Modul aplikasi butuh st.secrets saat import → secrets sementara dibuat
+sebelum test mana pun meng-import ikpa_dashboardtiga: storage lokal =
+checkout repo ini, cache blob di folder temp.
+
+    python -m pytest -q
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from tests import REPO_ROOT
+
+_run_dir = Path(tempfile.mkdtemp(prefix="ikpa-tests-"))
+(_run_dir / ".streamlit").mkdir()
+(_run_dir / ".streamlit" / "secrets.toml").write_text(
+    f"STORAGE_BACKEND = \"local\"\n"
+    f"LOCAL_STORAGE_DIR = {json.dumps(str(REPO_ROOT))}\n"
+    f"DATA_CACHE_DIR = {json.dumps(str(_run_dir / 'cache'))}\n"
+)
+os.chdir(_run_dir)
@@ -0,0 +1,205 @@
+"""
+Implementasi lama (loop per baris / per kolom) sebagai acuan: versi vektor
+di aplikasi harus menghasilkan frame yang identik. Dipakai test dan
+benchmark di scripts/, tidak dipakai aplikasi.
+"""
+import pandas as pd
+
+import ikpa_dashboardtiga as app
+
+
+def parse_ikpa_satker_blocks_legacy(df_raw, month, upload_year):
+    """Parser lama (loop per 4 baris) — acuan parse_ikpa_satker_blocks."""
+    df_data = df_raw.iloc[4:].reset_index(drop=True)
+    df_data.columns = range(len(df_data.columns))
+
+    processed_rows = []
+    i = 0
+
+    while i + 3 < len(df_data):
+
+        nilai = df_data.iloc[i]
+        nilai_aspek = df_data.iloc[i + 3]
+
+        kode_satker = (
+            str(nilai[3])
+            .replace("\u00a0", "")   # hapus NBSP (spasi tak terlihat dari Excel)
+            .strip()                # hapus spasi kiri/kanan
+        )
+
+        kode_satker = app.normalize_kode_satker(kode_satker)
+
+        uraian_satker = str(nilai[4]).strip()
+
+        if (
+            not kode_satker.isdigit()
+            or len(kode_satker) != 6
+            or kode_satker == "000000"
+            or uraian_satker.upper() in ["NILAI", "BOBOT", "NILAI AKHIR"]
+        ):
+            i += 4
+            continue
+
+        row = {
+            "No": nilai[0],
+            "Kode KPPN": str(nilai[1]).strip("'"),
+            "Kode BA": str(nilai[2]).strip("'"),
+            "Kode Satker": kode_satker,
+            "Uraian Satker": uraian_satker,
+
+            "Kualitas Perencanaan Anggaran": nilai_aspek[6],
+            "Kualitas Pelaksanaan Anggaran": nilai_aspek[8],
+            "Kualitas Hasil Pelaksanaan Anggaran": nilai_aspek[12],
+
+            "Revisi DIPA": nilai[6],
+            "Deviasi Halaman III DIPA": nilai[7],
+            "Penyerapan Anggaran": nilai[8],
+            "Belanja Kontraktual": nilai[9],
+            "Penyelesaian Tagihan": nilai[10],
+            "Pengelolaan UP dan TUP": nilai[11],
+            "Capaian Output": nilai[12],
+
+            "Nilai Total": nilai[13],
+            "Konversi Bobot": nilai[14],
+            "Dispensasi SPM (Pengurang)": nilai[15],
+            "Nilai Akhir (Nilai Total/Konversi Bobot)": nilai[16],
+
+            "Bulan": month,
+            "Tahun": upload_year
+        }
+
+        processed_rows.append(row)
+        i += 4
+
+    return pd.DataFrame(processed_rows)
+
+
+def process_excel_digipay_legacy(df_raw, upload_year):
+    """Parser lama (loop per baris) — acuan parse_digipay_rows."""
+    processed_rows = []
+
+    for i in range(len(df_raw)):
+
+        row = df_raw.iloc[i]
+
+        try:
+            tahun_row = int(row[0])
+        except Exception:
+            continue
+
+        if tahun_row != upload_year:
+            continue
+
+        kode_satker = app.normalize_kode_satker(str(row[3]).strip())
+
+        if (
+            not kode_satker
+            or not kode_satker.isdigit()
+            or len(kode_satker) != 6
+            or kode_satker == "000000"
+        ):
+            continue
+
+        processed_rows.append({
+            "Tahun": tahun_row,
+            "Kode Satker": kode_satker,
+            "Nama Satker": str(row[4]).strip(),
+            "Nilai Digipay": row[5],
+        })
+
+    return pd.DataFrame(processed_rows)
+
+
+def id_numbers_legacy(df, style):
+    """
+    Normalisasi angka lama per kolom — acuan parse_id_numbers:
+    "ikpa" = post_process_ikpa_satker, "kppn" = applymap koma → titik,
+    "nominal" = clean_nominal / loop CMS.
+    """
+    out = df.copy()
+    for col in out.columns:
+        s = out[col]
+        if style == "ikpa":
+            s = s.astype(str).str.replace(",", ".", regex=False).str.replace(".", "", regex=False)
+        elif style == "kppn":
+            s = s.map(lambda x: str(x).replace(",", ".") if isinstance(x, str) else x)
+        else:
+            s = s.astype(str).str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+        out[col] = pd.to_numeric(s, errors="coerce")
+
+    return out
+
+
+def ikpa_concat_legacy(data_storage):
+    """Pola lama tiap view: copy + concat seluruh data_storage lalu normalisasi BA."""
+    all_data = []
+    for (bulan, tahun), df in data_storage.items():
+        df_copy = df.copy()
+        df_copy["Period_Sort"] = f"{int(tahun):04d}-{app.MONTH_ORDER.get(bulan, 0):02d}"
+        all_data.append(df_copy)
+
+    df_all = pd.concat(all_data, ignore_index=True)
+    df_all["Kode BA"] = app.normalize_kode_ba_series(df_all["Kode BA"])
+    return df_all
+
+
+def apply_reference_short_names_legacy(df, ref):
+    """Versi lama: referensi dinormalisasi + rantai str.replace tiap panggilan."""
+    df = df.copy()
+
+    if 'Bulan' not in df.columns:
+        df['Bulan'] = ''
+    if 'Tahun' not in df.columns:
+        df['Tahun'] = ''
+
+    if ref is None:
+        if 'Uraian Satker-RINGKAS' not in df.columns:
+            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
+        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
+        return df
+
+    if 'Kode Satker' in df.columns:
+        df['Kode Satker'] = app.normalize_kode_satker_series(df['Kode Satker'])
+    else:
+        df['Kode Satker'] = ''
+
+    if 'Kode Satker' not in ref.columns or 'Uraian Satker-SINGKAT' not in ref.columns:
+        if 'Uraian Satker-RINGKAS' not in df.columns:
+            df['Uraian Satker-RINGKAS'] = df.get('Uraian Satker', '')
+        df['Uraian Satker Final'] = df.get('Uraian Satker', '')
+        return df
+
+    df_merged = df.drop(columns=['Uraian Satker-RINGKAS'], errors='ignore')
+    df_merged['Uraian Satker-RINGKAS'] = app.satker_lookup(
+        app.satker_ids(df_merged),
+        app.satker_id_series(ref['Kode Satker']),
+        ref['Uraian Satker-SINGKAT'],
+    )
+
+    df_merged['Uraian Satker-RINGKAS'] = df_merged['Uraian Satker-RINGKAS'].fillna(
+        df_merged.get('Uraian Satker', '')
+    )
+
+    # AUTO-RINGKAS: jika ringkas == nama panjang
+    orig = df_merged.get('Uraian Satker', '').fillna('').astype(str)
+    ring = df_merged['Uraian Satker-RINGKAS'].fillna('').astype(str)
+
+    mask = ring == orig
+
+    df_merged.loc[mask, 'Uraian Satker-RINGKAS'] = (
+        df_merged.loc[mask, 'Uraian Satker-RINGKAS']
+            .str.replace("KANTOR KEMENTERIAN AGAMA", "Kemenag", regex=False)
+            .str.replace("PENGADILAN AGAMA", "PA", regex=False)
+            .str.replace("RUMAH TAHANAN NEGARA", "Rutan", regex=False)
+            .str.replace("LEMBAGA PEMASYARAKATAN", "Lapas", regex=False)
+            .str.replace("BADAN PUSAT STATISTIK", "BPS", regex=False)
+            .str.replace("KANTOR PELAYANAN PERBENDAHARAAN NEGARA", "KPPN", regex=False)
+            .str.replace("KANTOR PELAYANAN PAJAK PRATAMA", "KPP Pratama", regex=False)
+            .str.replace("KABUPATEN", "Kab.", regex=False)
+            .str.replace("KOTA", "Kota", regex=False)
+    )
+
+    df_merged['Uraian Satker Final'] = df_merged['Uraian Satker-RINGKAS']
+    df_merged = df_merged.drop(columns=['Uraian Satker-SINGKAT'], errors='ignore')
+
+    return df_merged
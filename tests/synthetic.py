@@ -0,0 +1,236 @@
+"""
+Data sintetis berbentuk export / upload asli (termasuk sel kotor) untuk
+test dan benchmark di scripts/. Semua deterministik lewat `seed`.
+"""
+import io
+
+import numpy as np
+import pandas as pd
+
+import ikpa_dashboardtiga as app
+
+
+def to_xlsx_buffer(df_raw):
+    buf = io.BytesIO()
+    df_raw.to_excel(buf, header=False, index=False)
+    buf.seek(0)
+    return buf
+
+
+def synthetic_ikpa_satker_sheet(n_satker, seed=0):
+    """
+    Sheet mentah IKPA Satker (header=None) berisi n_satker blok 4 baris,
+    termasuk kasus kotor: NBSP, kutip, baris NILAI/BOBOT, kode kosong / 000000.
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = 4 + n_satker * 4
+    raw = np.full((n_rows, 17), np.nan, dtype=object)
+
+    raw[0, 0] = "LAPORAN INDIKATOR KINERJA PELAKSANAAN ANGGARAN"
+    raw[1, 0] = "Periode : Agustus"
+    raw[3, :5] = ["No", "Kode KPPN", "Kode BA", "Kode Satker", "Uraian Satker"]
+
+    kode = rng.integers(1, 999999, n_satker)
+    scores = rng.uniform(50, 100, (n_satker * 4, 12)).round(2)
+    raw[4:, 5:] = scores
+    raw[4::4, 0] = np.arange(1, n_satker + 1)
+    raw[4::4, 1] = "'109"
+    raw[4::4, 2] = [f"'{k % 100:03d}" for k in kode]
+    raw[4::4, 3] = [f"\u00a0{k:06d} " for k in kode]
+    # NBSP di tepi kanan dan di tengah kode ("12\u00a03456" harus tetap 123456)
+    raw[16:n_rows:28, 3] = [f" {k:06d}\u00a0" for k in kode[3::7]]
+    raw[20:n_rows:44, 3] = [f"{k:06d}"[:2] + "\u00a0" + f"{k:06d}"[2:] for k in kode[4::11]]
+    raw[4::4, 4] = [f" SATKER {k} " for k in kode]
+    raw[5::4, 4] = "BOBOT"
+    raw[6::4, 4] = "NILAI AKHIR"
+
+    # blok yang harus dibuang parser
+    raw[4:n_rows:40, 3] = "000000"
+    raw[8:n_rows:52, 3] = np.nan
+    raw[12:n_rows:68, 4] = "NILAI"
+
+    return pd.DataFrame(raw)
+
+
+def synthetic_digipay_export(n_rows, seed=0):
+    """
+    Ekspor DIGIPAY mentah (header=None): baris judul + n_rows transaksi
+    2023–2025, tahun campuran (angka / teks / desimal), kode satker kotor.
+    """
+    rng = np.random.default_rng(seed)
+
+    years = rng.choice([2023, 2024, 2025], n_rows).astype(object)
+    as_text = rng.random(n_rows) < 0.05
+    years[as_text] = [f" {y} " for y in years[as_text]]
+    years[rng.random(n_rows) < 0.02] = "TOTAL"
+
+    kode = np.array([f"{k:06d}" for k in rng.integers(0, 999999, n_rows)], dtype=object)
+    kode[rng.random(n_rows) < 0.03] = "000000"
+    kode[rng.random(n_rows) < 0.03] = np.nan
+
+    raw = pd.DataFrame({
+        0: years,
+        1: "06",
+        2: "PROVINSI SUMATERA SELATAN",
+        3: kode,
+        4: [f" SATKER {i % 997} " for i in range(n_rows)],
+        5: rng.integers(10_000, 50_000_000, n_rows),
+    })
+    header = pd.DataFrame([["TAHUN", "KDKANWIL", "NMKANWIL", "KDSATKER", "NMSATKER", "NOMINVOICE"]])
+    return pd.concat([header, raw], ignore_index=True)
+
+
+def synthetic_kode_values(n, n_unique=None, seed=0):
+    """
+    Campuran kode mentah: int, float, teks ber-NBSP / berawalan, NaN, None.
+    n_unique = jumlah satker berbeda (None → hampir semua unik).
+    """
+    rng = np.random.default_rng(seed)
+    pool = rng.integers(0, 999999, n_unique or n)
+    kode = rng.choice(pool, n)
+    variants = [
+        lambda k: int(k),
+        lambda k: float(k),
+        lambda k: f"{k:06d}",
+        lambda k: f"\u00a0{k}\u00a0",
+        lambda k: f"'{k % 1000:03d}",
+        lambda k: f"SATKER {k}",
+        lambda k: f" {k % 1000}.0 ",
+        lambda k: np.nan,
+        lambda k: None,
+        lambda k: "-",
+    ]
+    picks = rng.integers(0, len(variants), n)
+    return pd.Series([variants[p](k) for p, k in zip(picks, kode)], dtype=object)
+
+
+def synthetic_id_number_block(n_rows, n_cols=8, seed=0):
+    """Blok teks nominal format Indonesia ("1.234.567,89"), ~2% sel kosong."""
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(0, 1e9, n_rows).round(2)
+    text = np.array(
+        [f"{v:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".") for v in values],
+        dtype=object,
+    )
+    text[rng.random(n_rows) < 0.02] = ""
+
+    return pd.DataFrame({f"NILAI {i + 1}": rng.permutation(text) for i in range(n_cols)})
+
+
+def synthetic_ikpa_storage(n_satker=400, years=(2023, 2024, 2025), seed=0):
+    """data_storage sintetis {(BULAN, TAHUN): DataFrame} seperti hasil loader IKPA Satker."""
+    rng = np.random.default_rng(seed)
+    kode = [f"{600000 + i:06d}" for i in range(n_satker)]
+    ba = [f"{b:03d}" for b in rng.choice([5, 15, 18, 25, 40, 89], n_satker)]
+    nama = [f"SATKER SINTETIS NOMOR {i}" for i in range(n_satker)]
+
+    storage = {}
+    for tahun in years:
+        for bulan in app.IKPA_MONTHS:
+            df = pd.DataFrame({
+                "No": np.arange(1, n_satker + 1),
+                "Kode BA": ba,
+                "Kode Satker": kode,
+                "Uraian Satker": nama,
+                "Uraian Satker-RINGKAS": [n.title() for n in nama],
+                **{col: rng.uniform(50, 100, n_satker).round(2) for col in app.IKPA_INDICATORS},
+                "Bulan": bulan,
+                "Tahun": str(tahun),
+                "Source": "Synthetic",
+            })
+            storage[(bulan, str(tahun))] = df
+
+    return storage
+
+
+def synthetic_reference_storage(n_satker=1_000, years=(2022, 2023, 2024, 2025), coverage=0.7):
+    """
+    data_storage dengan nama satker berawalan instansi (kena AUTO-RINGKAS)
+    + referensi yang memuat `coverage` bagian satker → (storage, ref).
+    """
+    prefixes = [
+        "KANTOR KEMENTERIAN AGAMA KABUPATEN", "PENGADILAN AGAMA KOTA",
+        "LEMBAGA PEMASYARAKATAN KOTA", "RUMAH TAHANAN NEGARA KABUPATEN",
+        "BADAN PUSAT STATISTIK KABUPATEN", "SATKER SINTETIS",
+    ]
+    nama = [f"{prefixes[i % len(prefixes)]} NOMOR {i}" for i in range(n_satker)]
+    storage = {
+        key: df.assign(**{"Uraian Satker": nama})
+        for key, df in synthetic_ikpa_storage(n_satker, years=years).items()
+    }
+
+    first = next(iter(storage.values()))
+    covered = first.iloc[: int(n_satker * coverage)]
+    ref = pd.DataFrame({
+        "Kode Satker": covered["Kode Satker"].astype(int).astype(str),
+        "Uraian Satker-SINGKAT": covered["Uraian Satker"].str.title(),
+        "Uraian Satker-LENGKAP": covered["Uraian Satker"],
+    })
+    return storage, ref
+
+
+def synthetic_kkp_upload(n_rows, seed=0):
+    """
+    Workbook upload KKP: 2 baris judul, header, n_rows transaksi
+    (sebagian satker tidak valid / NO kosong → harus dibuang parser).
+    """
+    rng = np.random.default_rng(seed)
+    kode = rng.integers(0, 999999, n_rows)
+
+    satker = np.array([f"{k:06d} SATKER {k % 97}" for k in kode], dtype=object)
+    satker[rng.random(n_rows) < 0.03] = "-"
+    no = np.arange(1, n_rows + 1).astype(object)
+    no[rng.random(n_rows) < 0.01] = np.nan
+
+    rows = pd.DataFrame({
+        0: no,
+        1: [f"{k % 100:03d} KEMENTERIAN {k % 100}" for k in kode],
+        2: satker,
+        3: rng.integers(10**15, 10**16, n_rows),
+        4: [f"PEMEGANG {k % 1000}" for k in kode],
+        5: rng.choice([5_000_000, 10_000_000, 50_000_000], n_rows),
+        6: rng.choice(["BELANJA BARANG OPERASIONAL ATAU BELANJA MODAL", "BELANJA PERJALANAN DINAS"], n_rows),
+        7: rng.choice(["BANK RAKYAT INDONESIA", "BANK MANDIRI"], n_rows),
+        8: rng.choice([f"2025-{m:02d}" for m in range(1, 13)], n_rows),
+        9: rng.integers(0, 50_000_000, n_rows),
+        10: rng.integers(0, 50_000_000, n_rows),
+    })
+    head = pd.DataFrame([
+        ["LAPORAN TRANSAKSI KKP"] + [np.nan] * 10,
+        [np.nan] * 11,
+        ["NO", "BA/KL", "SATKER", "NOMOR KARTU", "NAMA PEMEGANG KKP", "LIMIT KKP",
+         "JENIS KKP", "BANK PENERBIT KKP", "PERIODE",
+         "TOTAL TRANSAKSI (NILAI TAGIHAN TERKAIT APBN)", "NILAI TRANSAKSI (NILAI SPM)"],
+    ])
+    return to_xlsx_buffer(pd.concat([head, rows], ignore_index=True))
+
+
+def synthetic_digipay_upload(n_rows, n_sheets=3, seed=0):
+    """Workbook upload DIGIPAY admin: n_sheets sheet, campuran KPPN & status bayar."""
+    rng = np.random.default_rng(seed)
+    buf = io.BytesIO()
+
+    with pd.ExcelWriter(buf) as writer:
+        for i in range(n_sheets):
+            n = n_rows // n_sheets
+            kode = rng.integers(0, 999999, n)
+            df = pd.DataFrame({
+                "NO": np.arange(1, n + 1),
+                "TAHUN": rng.choice([2024, 2025], n),
+                "KDKANWIL": 6,
+                "NMKANWIL": "PROVINSI SUMATERA SELATAN",
+                "KDKPPN": rng.choice([109, 110, 111], n),
+                "NMKPPN": rng.choice(["BATURAJA", "Baturaja", "LAHAT"], n),
+                "KDSATKER": kode,
+                "NMSATKER": [f"SATKER {k % 997}" for k in kode],
+                "NOINVOICE": [f"{k:06d}/01/{j}" for j, k in enumerate(kode)],
+                "NOMINVOICE": rng.integers(10_000, 50_000_000, n),
+                "STSBAYAR": rng.choice(["5 - VA sudah dibayar", "1 - Belum Bayar", None], n),
+                "TGLINVOICE": pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, n), "D"),
+                "KATEGORI": "BARANG",
+            })
+            df.loc[rng.random(n) < 0.02, "NOINVOICE"] = None
+            df.to_excel(writer, sheet_name=f"Sheet{i + 1}", index=False)
+
+    buf.seek(0)
+    return buf
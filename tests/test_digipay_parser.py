@@ -0,0 +1,44 @@
+import io
+
+import pandas as pd
+import pytest
+
+import ikpa_dashboardtiga as app
+from tests import repo_workbooks
+from tests.legacy import process_excel_digipay_legacy
+from tests.synthetic import synthetic_digipay_export, to_xlsx_buffer
+
+
+def workbook_cases():
+    for path in repo_workbooks("data_Digipay"):
+        yield pytest.param(path.read_bytes, id=path.name)
+    for n in (0, 50, 3000):
+        yield pytest.param(lambda n=n: to_xlsx_buffer(synthetic_digipay_export(n, seed=n)).getvalue(),
+                           id=f"sintetis_{n}_baris")
+
+
+@pytest.mark.parametrize("make_content", list(workbook_cases()))
+def test_streaming_parser_matches_legacy_loop(make_content):
+    """Baca streaming + filter tahun vs read_excel penuh + loop baris lama, per tahun."""
+    content = make_content()
+    df_raw = pd.read_excel(io.BytesIO(content), header=None)
+
+    for year in (2023, 2024, 2025):
+        pd.testing.assert_frame_equal(
+            app.process_excel_digipay(io.BytesIO(content), year),
+            process_excel_digipay_legacy(df_raw, year),
+            check_exact=True,
+        )
+
+
+def scalar_year_match(value, year):
+    try:
+        return int(value) == year
+    except Exception:
+        return False
+
+
+def test_year_mask_matches_int_conversion():
+    values = pd.Series([2025, " 2025 ", 2025.0, 2025.7, "2025.0", "TOTAL", None, float("nan"), 2024, True])
+    expected = [scalar_year_match(v, 2025) for v in values]
+    assert app.digipay_year_mask(values, 2025).tolist() == expected
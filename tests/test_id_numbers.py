@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ikpa_dashboardtiga as app
+from tests.legacy import id_numbers_legacy
+from tests.synthetic import synthetic_id_number_block
+
+NAN = float("nan")
+
+ID_NUMBER_CASES = {
+    "teks ribuan": (["1.234.567", "12.500", "-2.000"], [1234567, 12500, -2000]),
+    "teks ribuan + desimal koma": (["12.500,75", "1.000,5", "999,99"], [12500.75, 1000.5, 999.99]),
+    "teks desimal koma": (["95,5", "87,05", "0,25"], [95.5, 87.05, 0.25]),
+    "teks desimal titik": (["95.5", "87.05", "0.1"], [95.5, 87.05, 0.1]),
+    "teks bulat": (["12345", " 42 ", "7"], [12345, 42, 7]),
+    "angka bulat": (np.array([12345, 42, 7], dtype="int64"), [12345, 42, 7]),
+    "angka desimal": (np.array([95.5, 87.05, np.nan]), [95.5, 87.05, NAN]),
+    "sel campuran": ([95.5, "87,05", 100], [95.5, 87.05, 100]),
+    "kosong / bukan angka": (["", None, "abc"], [NAN, NAN, NAN]),
+}
+
+
+@pytest.mark.parametrize("values, expected", ID_NUMBER_CASES.values(), ids=list(ID_NUMBER_CASES))
+def test_parse_id_numbers(values, expected):
+    got = app.parse_id_numbers(pd.Series(values)).astype(float)
+    pd.testing.assert_series_equal(got, pd.Series(expected, dtype=float), check_names=False)
+
+
+def test_numeric_columns_returned_unchanged():
+    block = pd.DataFrame({"a": [1, 2], "b": [1.5, 2.5], "c": ["1.000", "2,5"]})
+    out = app.parse_id_numbers(block)
+
+    pd.testing.assert_frame_equal(out[["a", "b"]], block[["a", "b"]])
+    assert out["c"].tolist() == [1000.0, 2.5]
+    assert block["c"].tolist() == ["1.000", "2,5"]   # input tidak diubah
+
+
+def test_block_matches_legacy_nominal():
+    """Nominal "1.234.567,89" (clean_nominal / CMS): satu blok vs loop per kolom."""
+    block = synthetic_id_number_block(5_000)
+    pd.testing.assert_frame_equal(
+        app.parse_id_numbers(block).fillna(0),
+        id_numbers_legacy(block, "nominal").fillna(0),
+        check_exact=True,
+    )
+
+
+KPPN_SCORE_CASES = {
+    "titik desimal tiga digit": (["95.125", "12.500", "100.000"], [95.125, 12.5, 100.0]),
+    "titik berulang": (["1.234.567"], [NAN]),
+    "koma desimal": (["87,5", "99,125"], [87.5, 99.125]),
+    "angka": ([95.125, 87, None], [95.125, 87, NAN]),
+}
+
+
+@pytest.mark.parametrize("values, expected", KPPN_SCORE_CASES.values(), ids=list(KPPN_SCORE_CASES))
+def test_parse_without_thousands(values, expected):
+    got = app.parse_id_numbers(pd.Series(values, dtype=object), thousands=False).astype(float)
+    pd.testing.assert_series_equal(got, pd.Series(expected, dtype=float), check_names=False)
+
+
+def test_without_thousands_matches_legacy_kppn():
+    """Aturan nilai KPPN lama (applymap koma → titik + to_numeric) tetap berlaku."""
+    cells = [v for values, _ in list(ID_NUMBER_CASES.values()) + list(KPPN_SCORE_CASES.values()) for v in values]
+    block = pd.DataFrame({"nilai": pd.Series(cells, dtype=object)})
+
+    pd.testing.assert_frame_equal(
+        app.parse_id_numbers(block, thousands=False).fillna(0),
+        id_numbers_legacy(block, "kppn").astype(float).fillna(0),
+        check_exact=True,
+    )
@@ -0,0 +1,46 @@
+import io
+
+import pandas as pd
+import pytest
+
+import ikpa_dashboardtiga as app
+import ikpa_workers as workers
+from tests import repo_workbooks
+from tests.legacy import parse_ikpa_satker_blocks_legacy
+from tests.synthetic import synthetic_ikpa_satker_sheet
+
+
+def raw_cases():
+    for path in repo_workbooks("data"):
+        yield pytest.param(lambda path=path: app.read_workbook(io.BytesIO(path.read_bytes()), header=None),
+                           id=path.name)
+    for n in (0, 1, 37, 500):
+        yield pytest.param(lambda n=n: synthetic_ikpa_satker_sheet(n, seed=n), id=f"sintetis_{n}_satker")
+
+
+@pytest.mark.parametrize("make_raw", list(raw_cases()))
+def test_parser_matches_legacy_loop(make_raw):
+    df_raw = make_raw()
+    month = workers.ikpa_month_from_raw(df_raw)
+
+    pd.testing.assert_frame_equal(
+        workers.parse_ikpa_satker_blocks(df_raw, month, 2025),
+        parse_ikpa_satker_blocks_legacy(df_raw, month, 2025),
+        check_exact=True,
+    )
+
+
+def test_parser_drops_invalid_blocks():
+    df = workers.parse_ikpa_satker_blocks(synthetic_ikpa_satker_sheet(100), "AGUSTUS", 2025)
+
+    assert df["Kode Satker"].str.fullmatch(r"\d{6}").all()
+    assert not df["Kode Satker"].eq("000000").any()
+    assert not df["Uraian Satker"].str.upper().isin(["NILAI", "BOBOT", "NILAI AKHIR"]).any()
+    assert not df["Kode BA"].str.startswith("'").any()
+
+
+def test_parser_removes_nbsp_inside_kode_satker():
+    df_raw = synthetic_ikpa_satker_sheet(1)
+    df_raw.iloc[4, 3] = "12\u00a03456"
+
+    assert workers.parse_ikpa_satker_blocks(df_raw, "AGUSTUS", 2025)["Kode Satker"].tolist() == ["123456"]
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+import ikpa_dashboardtiga as app
+from tests.legacy import ikpa_concat_legacy
+from tests.synthetic import synthetic_ikpa_storage
+
+
+@pytest.fixture(scope="module")
+def ikpa_storage():
+    return synthetic_ikpa_storage(60, years=(2023, 2024))
+
+
+@pytest.fixture(scope="module")
+def loaded_storage(ikpa_storage):
+    """Periode seperti hasil loader halaman (kolom Satker / Jenis Satker turunan)."""
+    return {
+        key: app.classify_jenis_satker(app.merge_ikpa_with_dipa(app.create_satker_column(df)))
+        for key, df in ikpa_storage.items()
+    }
+
+
+def test_fact_table_matches_concat_per_view(ikpa_storage):
+    facts = app.build_ikpa_fact_table(ikpa_storage)
+    cols = ["Period_Sort", "Kode BA", "Kode Satker"] + app.IKPA_INDICATORS
+
+    pd.testing.assert_frame_equal(
+        app.query_ikpa_facts(facts=facts)[cols],
+        ikpa_concat_legacy(ikpa_storage)[cols],
+        check_exact=True,
+    )
+
+
+def test_fact_query_filters_period_range(ikpa_storage):
+    facts = app.build_ikpa_fact_table(ikpa_storage)
+    df = app.query_ikpa_facts(202401, 202406, facts=facts)
+
+    assert set(df["Period_Sort"]) == {f"2024-{m:02d}" for m in range(1, 7)}
+    assert len(df) == 6 * 60
+
+
+@pytest.mark.parametrize("source", ["ikpa_storage", "loaded_storage"])
+def test_compact_period_roundtrip(source, request):
+    for df in request.getfixturevalue(source).values():
+        full = app.expand_ikpa_period(df)
+        compact = app.compact_ikpa_period(full)
+
+        assert compact.memory_usage(deep=True).sum() < full.memory_usage(deep=True).sum()
+        assert app.compact_ikpa_period(compact) is compact
+        pd.testing.assert_frame_equal(app.expand_ikpa_period(compact), full, check_exact=True)
+
+
+def test_publish_keys_and_compacts_data_storage(loaded_storage):
+    store = app.DatasetStore()
+    _, snapshot = store.publish(data_storage=loaded_storage)
+
+    for key, df in snapshot["data_storage"].items():
+        assert app.IKPA_SCHEMA_ATTR in df.attrs
+        assert df[app.SATKER_ID].dtype == "int32"
+        pd.testing.assert_frame_equal(
+            app.without_satker_id(app.expand_ikpa_period(df)), loaded_storage[key], check_exact=True,
+        )
+
+
+def test_dipa_upload_remerges_only_that_year(ikpa_storage):
+    kode = next(iter(ikpa_storage.values()))["Kode Satker"]
+
+    def dipa(scale):
+        return pd.DataFrame({"Kode Satker": kode, "Total Pagu": scale * (1.0 + kode.index)})
+
+    app.publish_datasets(
+        data_storage=ikpa_storage,
+        DATA_DIPA_by_year={2023: dipa(1e9), 2024: dipa(1e9)},
+        ikpa_dipa_merged=False,
+    )
+    app.merge_ikpa_dipa_auto()
+    assert app.st.session_state.ikpa_dipa_merged
+
+    # alur upload DIPA: tahun 2024 diganti lalu periode 2024 di-merge ulang
+    app.update_dataset_items("DATA_DIPA_by_year", {2024: dipa(5e9)})
+    app.merge_ikpa_dipa_auto(keys=app.ikpa_keys_for_year(2024))
+
+    state = app.st.session_state
+    assert state.ikpa_dipa_merged
+    for (_, tahun), df in state.data_storage.items():
+        scale = 5e9 if tahun == "2024" else 1e9
+        assert (df["Total Pagu"].to_numpy() == scale * (1.0 + kode.index)).all()
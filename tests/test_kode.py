@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ikpa_dashboardtiga as app
+from tests.synthetic import synthetic_kode_values
+
+KODE_EDGE_CASES = [
+    0, 5, -5, 1.5e20, -1.5e20, 2 ** 53 - 1, 2 ** 53, 2 ** 53 + 1, 2 ** 63, 1e300,
+    "١٢٣", "１２", " 7 ", " 089 ", "'005", "5.0", "abc", "", "-",
+    b"12", Decimal("12"), Decimal("1e20"), np.nan, None, float("inf"),
+]
+
+
+@pytest.mark.parametrize("n_unique", [2_000, None], ids=["2000_satker", "semua_unik"])
+@pytest.mark.parametrize("scalar, vector", [
+    (app.normalize_kode_satker, app.normalize_kode_satker_series),
+    (app.normalize_kode_ba, app.normalize_kode_ba_series),
+], ids=["satker", "ba"])
+def test_series_matches_scalar(scalar, vector, n_unique):
+    values = synthetic_kode_values(20_000, n_unique)
+    assert vector(values).tolist() == values.apply(scalar).astype(object).tolist()
+
+
+def test_kode_ba_series_edge_cases():
+    values = pd.Series(KODE_EDGE_CASES, dtype=object)
+    assert app.normalize_kode_ba_series(values).tolist() == [app.normalize_kode_ba(v) for v in values]
+
+
+def test_kode_ba_series_keeps_index():
+    values = pd.Series([5, "18"], index=[10, 20])
+    out = app.normalize_kode_ba_series(values)
+    assert out.index.tolist() == [10, 20]
+    assert out.tolist() == ["005", "018"]
@@ -0,0 +1,38 @@
+import io
+
+import pandas as pd
+import pytest
+
+import ikpa_dashboardtiga as app
+
+NILAI_COL = "Nilai Akhir (Nilai Total/Konversi Bobot)"
+
+
+def kppn_upload():
+    """Upload IKPA KPPN format ringkas dengan skor teks (titik / koma desimal)."""
+    df = pd.DataFrame({
+        "Nama KPPN": ["BATURAJA", "LAHAT", "PALEMBANG", "MUARA ENIM"],
+        "Revisi DIPA": ["100.000", "95,5", 90, ""],
+        NILAI_COL: ["95.125", "87,5", 90, "12.500"],
+    })
+    buf = io.BytesIO()
+    df.to_excel(buf, index=False)
+    buf.seek(0)
+    return buf
+
+
+@pytest.mark.parametrize("parser", [app.process_kppn_ringkas, app.process_excel_file_kppn],
+                         ids=["ringkas", "excel_file_kppn"])
+def test_kppn_scores_use_decimal_point(parser):
+    """
+    "95.125" tetap 95.125 (bukan 95125) seperti aturan lama; koma desimal
+    "87,5" → 87.5 di kedua parser (process_excel_file_kppn lama: 0).
+    """
+    df, _, _ = parser(kppn_upload(), 2025, "JULI")
+    nilai = df.set_index("Nama KPPN")[NILAI_COL]
+    revisi = df.set_index("Nama KPPN")["Revisi DIPA"]
+
+    assert nilai.to_dict() == {"BATURAJA": 95.125, "LAHAT": 87.5, "PALEMBANG": 90.0, "MUARA ENIM": 12.5}
+    assert revisi.to_dict() == {"BATURAJA": 100.0, "LAHAT": 95.5, "PALEMBANG": 90.0, "MUARA ENIM": 0.0}
+    assert df["Nama KPPN"].tolist() == ["BATURAJA", "PALEMBANG", "LAHAT", "MUARA ENIM"]
+    assert df["Peringkat"].tolist() == [1, 2, 3, 4]
@@ -0,0 +1,50 @@
+import pandas as pd
+
+import ikpa_dashboardtiga as app
+import ikpa_workers as workers
+from tests.legacy import apply_reference_short_names_legacy
+from tests.synthetic import synthetic_reference_storage
+
+
+def test_short_names_match_legacy():
+    """Per periode (seperti saat load) + sekali pada frame tren gabungan."""
+    storage, ref = synthetic_reference_storage(300, years=(2024, 2025))
+    frames = list(storage.values()) + [pd.concat(storage.values(), ignore_index=True)]
+
+    for df in frames:
+        pd.testing.assert_frame_equal(
+            app.apply_reference_short_names(df, ref=ref),
+            apply_reference_short_names_legacy(df, ref=ref),
+            check_exact=True,
+        )
+
+
+def test_reference_without_short_names_falls_back():
+    storage, ref = synthetic_reference_storage(20, years=(2025,))
+    df = next(iter(storage.values()))
+    out = app.apply_reference_short_names(df, ref=ref.drop(columns=["Uraian Satker-SINGKAT"]))
+
+    assert out["Uraian Satker Final"].tolist() == df["Uraian Satker"].tolist()
+
+
+def test_abbreviation_rules():
+    names = pd.Series(["KANTOR KEMENTERIAN AGAMA KABUPATEN OKU", "PENGADILAN AGAMA KOTA BATURAJA"])
+    assert workers.abbreviate_satker_names(names).tolist() == ["Kemenag Kab. OKU", "PA Kota BATURAJA"]
+
+
+def test_abbreviation_cache_is_bounded():
+    workers.abbreviate_satker_name.cache_clear()
+    names = pd.Series([f"KANTOR KEMENTERIAN AGAMA KABUPATEN {i}" for i in range(50)] * 3)
+
+    out = workers.abbreviate_satker_names(names)
+
+    info = workers.abbreviate_satker_name.cache_info()
+    assert info.maxsize == workers.SATKER_ABBREVIATION_CACHE_SIZE
+    assert info.currsize == 50 and info.misses == 50
+    assert out[0] == "Kemenag Kab. 0"
+
+
+def test_abbreviation_of_non_text_is_nan():
+    out = workers.abbreviate_satker_names(pd.Series(["PENGADILAN AGAMA KOTA X", None, 5, float("nan")]))
+    assert out[0] == "PA Kota X"
+    assert all(pd.isna(v) for v in out[1:])
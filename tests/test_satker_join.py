@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import ikpa_dashboardtiga as app
+
+
+def make_reference(n_satker=500, seed=0):
+    rng = np.random.default_rng(seed)
+    pool = rng.choice(np.arange(1, 999_999), n_satker, replace=False)
+    return pool, pd.DataFrame({
+        "Kode Satker": [f"{k:06d}" for k in pool],
+        "Uraian Satker-SINGKAT": [f"SATKER {k}" for k in pool],
+    })
+
+
+def test_lookup_matches_text_merge():
+    """Nama referensi lewat satker_id sama dengan merge teks Kode Satker (zfill)."""
+    pool, ref = make_reference()
+    rng = np.random.default_rng(1)
+    # ~10% kode di luar referensi, kode tanpa nol depan
+    facts = pd.DataFrame({"Kode Satker": rng.choice(np.append(pool, pool[:50] + 1), 20_000).astype(str)})
+
+    merged = facts.assign(**{"Kode Satker": facts["Kode Satker"].str.zfill(6)}).merge(
+        ref, on="Kode Satker", how="left"
+    )["Uraian Satker-SINGKAT"]
+    keyed = app.attach_satker_id(facts)
+    looked_up = app.satker_lookup(
+        app.satker_ids(keyed), app.satker_id_series(ref["Kode Satker"]), ref["Uraian Satker-SINGKAT"]
+    )
+
+    assert merged.fillna("").tolist() == pd.Series(looked_up).fillna("").tolist()
+
+
+def test_satker_id_unknown_and_duplicates():
+    ids = app.satker_id_series(pd.Series(["001234", "1234", " 001234 ", "", None, "abc", "000000"]))
+    assert ids.dtype == "int32"
+    assert ids.tolist()[:3] == [1234, 1234, 1234]
+    assert ids.tolist()[3:6] == [app.SATKER_ID_UNKNOWN] * 3
+
+    # kunci ganda → baris pertama; -1 tidak pernah cocok
+    got = app.satker_lookup([7, 8, app.SATKER_ID_UNKNOWN], [7, 7, app.SATKER_ID_UNKNOWN], ["a", "b", "c"])
+    assert got[0] == "a" and pd.isna(got[1]) and pd.isna(got[2])
+
+
+def test_attach_satker_id_is_idempotent():
+    df = pd.DataFrame({"Kode Satker": ["001234"]})
+    keyed = app.attach_satker_id(df)
+    assert app.SATKER_ID not in df.columns
+    assert app.attach_satker_id(keyed) is keyed
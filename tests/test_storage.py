@@ -0,0 +1,111 @@
+import json
+
+import pandas as pd
+import pytest
+import requests
+
+import ikpa_dashboardtiga as app
+
+
+def http_response(status, payload=None):
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = json.dumps(payload or {}).encode()
+    return resp
+
+
+class ScriptedGitHubStorage(app.GitHubStorage):
+    """GitHubStorage tanpa jaringan: Git Data API dijawab skrip, PATCH ref → ref_statuses."""
+
+    def __init__(self, ref_statuses):
+        super().__init__("token", "owner/repo", branch="main")
+        self.ref_statuses = list(ref_statuses)
+        self.ref_updates = 0
+
+    def _request(self, method, url, **kwargs):
+        if method == "PATCH":
+            self.ref_updates += 1
+            resp = http_response(self.ref_statuses.pop(0))
+            resp.raise_for_status()
+            return resp
+
+        payload = {
+            ("POST", "/git/blobs"): {"sha": "blob"},
+            ("GET", "/git/ref/heads/main"): {"object": {"sha": "head"}},
+            ("GET", "/git/commits/head"): {"tree": {"sha": "tree"}},
+            ("POST", "/git/trees"): {"sha": "new-tree"},
+            ("POST", "/git/commits"): {"sha": "commit"},
+        }[(method, url)]
+        return http_response(200, payload)
+
+
+def test_write_many_retries_non_fast_forward():
+    storage = ScriptedGitHubStorage([422, 200])
+    written = storage.write_many({"data/a.xlsx": b"a"}, "Update a")
+
+    assert storage.ref_updates == 2
+    assert written["data/a.xlsx"].sha == "blob"
+
+
+@pytest.mark.parametrize("status", [409, 422])
+def test_write_many_conflict_after_last_attempt(status):
+    storage = ScriptedGitHubStorage([status] * 3)
+    with pytest.raises(app.StorageConflictError):
+        storage.write_many({"data/a.xlsx": b"a"}, "Update a", max_attempts=3)
+    assert storage.ref_updates == 3
+
+
+@pytest.mark.parametrize("status", [401, 403, 500, 503])
+def test_write_many_passes_other_http_errors_through(status):
+    storage = ScriptedGitHubStorage([status])
+    with pytest.raises(requests.HTTPError) as info:
+        storage.write_many({"data/a.xlsx": b"a"}, "Update a")
+
+    assert not isinstance(info.value, app.StorageConflictError)
+    assert info.value.response.status_code == status
+    assert storage.ref_updates == 1
+
+
+class CountingStorage:
+    """Storage sidecar di memori; menghitung download blob."""
+
+    def __init__(self, blobs):
+        self.blobs = blobs
+        self.reads = 0
+
+    def read(self, f):
+        self.reads += 1
+        return self.blobs[f.sha]
+
+
+def repo_file(name, payload):
+    sha = app.git_blob_sha(payload)
+    return app.RepoFile(f"data/{name}", name, sha, len(payload))
+
+
+def test_sidecar_source_sha_survives_restart_without_download():
+    payload = app.to_parquet_bytes(pd.DataFrame({"a": [1, 2]}), source_sha="xlsx-sha-1")
+    sidecar = repo_file("a.parquet", payload)
+    storage = CountingStorage({sidecar.sha: payload})
+
+    assert app.sidecar_source_sha(storage, sidecar) == "xlsx-sha-1"
+    assert storage.reads == 1
+
+    # restart: memo proses kosong, cache disk tetap
+    app.get_sidecar_sources().clear()
+    assert app.sidecar_source_sha(storage, sidecar) == "xlsx-sha-1"
+    assert storage.reads == 1
+
+
+def test_saved_sidecar_needs_no_download(monkeypatch):
+    monkeypatch.setattr(app, "save_files_to_github", lambda files, message: {})
+    xlsx = b"xlsx-bytes"
+    files = app.sidecar_files(pd.DataFrame({"a": [3]}), xlsx, "b.xlsx", "data")
+    app.save_sidecar_files(files, "Update b.xlsx")
+
+    sidecar = repo_file("b.parquet", files["data/b.parquet"])
+    storage = CountingStorage({})
+
+    contents = [repo_file("b.xlsx", xlsx), sidecar]
+    assert app.prefer_sidecar_files(contents, storage=storage) == [sidecar]
+    assert storage.reads == 0
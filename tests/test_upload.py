@@ -0,0 +1,161 @@
+import io
+import sys
+import types
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+import ikpa_dashboardtiga as app
+import ikpa_workers as workers
+from tests import repo_workbooks
+from tests.synthetic import (
+    synthetic_digipay_upload,
+    synthetic_ikpa_satker_sheet,
+    synthetic_kkp_upload,
+    to_xlsx_buffer,
+)
+
+UPLOAD_FOLDERS = ("data_kppn", "data_kkp", "DATA_DIPA", "data_CMS", "data_Digipay")
+
+
+@pytest.mark.parametrize("path", repo_workbooks(*UPLOAD_FOLDERS), ids=lambda p: f"{p.parent.name}/{p.name}")
+def test_grid_slice_matches_read_excel(path):
+    """Grid sekali baca + potong header = read_workbook(header=N, dtype=...) baca ulang."""
+    content = path.read_bytes()
+    grids = app.read_excel_grid(io.BytesIO(content), None)
+
+    for sheet, grid in grids.items():
+        for header_row in (None, 0, 1, 2):
+            if header_row is not None and header_row >= len(grid):
+                continue
+            for dtype in (None, str):
+                pd.testing.assert_frame_equal(
+                    app.frame_from_grid(grid, header_row, dtype),
+                    app.read_workbook(io.BytesIO(content), sheet_name=sheet, header=header_row, dtype=dtype),
+                    check_exact=True,
+                )
+
+
+@pytest.mark.parametrize("make_upload, parser", [
+    (lambda: synthetic_kkp_upload(3_000), app.process_excel_file_kkp),
+    (lambda: synthetic_digipay_upload(3_000), app.process_digipay_upload),
+], ids=["KKP", "DIGIPAY"])
+def test_streaming_matches_full_grid(make_upload, parser):
+    content = make_upload().getvalue()
+
+    full = parser(io.BytesIO(content), streaming=False)
+    streamed = parser(io.BytesIO(content), streaming=True)
+
+    assert len(full) > 0
+    pd.testing.assert_frame_equal(streamed, full, check_exact=True)
+
+
+def test_kkp_streaming_chunk_boundaries():
+    buf = synthetic_kkp_upload(2_000)
+    pd.testing.assert_frame_equal(
+        app.process_excel_file_kkp_streaming(io.BytesIO(buf.getvalue()), chunk_rows=97),
+        app.process_excel_file_kkp(io.BytesIO(buf.getvalue()), streaming=False),
+        check_exact=True,
+    )
+
+
+@pytest.fixture
+def no_pool_fallback():
+    """Gagal jika ada tugas parse pool yang jatuh ke proses utama."""
+    stats = app.get_parse_pool_stats()
+    before = stats.fallbacks
+    yield
+    assert stats.fallbacks == before, stats.last_error
+
+
+def test_digipay_sheets_in_pool_match_sequential(tmp_path, no_pool_fallback):
+    """Sheet di parse pool = digipay_sheet_frame berurutan di proses ini."""
+    n_sheets = 4
+    buf = synthetic_digipay_upload(2_000, n_sheets=n_sheets)
+    path = tmp_path / "digipay.xlsx"
+    path.write_bytes(buf.getvalue())
+
+    sequential = [app.digipay_sheet_frame(str(path), i) for i in range(n_sheets)]
+    reported = []
+    df = app.process_digipay_upload(
+        io.BytesIO(buf.getvalue()), streaming=False,
+        on_sheet=lambda result, done, total: reported.append((result["index"], done, total)),
+    )
+
+    assert sorted(index for index, _, _ in reported) == list(range(n_sheets))
+    assert [done for _, done, _ in reported] == list(range(1, n_sheets + 1))
+    expected = pd.concat([r["df"] for r in sequential if not r["df"].empty], ignore_index=True)
+    expected = expected.drop_duplicates(subset=app.DIGIPAY_UNIQUE_KEY).reset_index(drop=True)
+    assert len(df) > 0
+    pd.testing.assert_frame_equal(df, expected, check_exact=True)
+
+
+def test_ikpa_uploads_in_pool_match_sequential(no_pool_fallback):
+    uploads = [
+        (f"ikpa_{i}.xlsx", to_xlsx_buffer(synthetic_ikpa_satker_sheet(40, seed=i)).getvalue())
+        for i in range(3)
+    ]
+    pooled = app.prepare_ikpa_uploads(uploads, 2025)
+
+    for (name, content), result in zip(uploads, pooled):
+        expected = workers.prepare_ikpa_upload(content, name, 2025, None)
+        assert result["name"] == name and "error" not in result
+        pd.testing.assert_frame_equal(result["df"], expected["df"], check_exact=True)
+
+
+def test_fetch_parses_in_pool(no_pool_fallback):
+    blobs = {
+        f"ikpa_{i}.xlsx": to_xlsx_buffer(synthetic_ikpa_satker_sheet(20, seed=i)).getvalue()
+        for i in range(3)
+    }
+    storage = types.SimpleNamespace(read=lambda f: blobs[f.name])
+    files = [app.RepoFile(f"data/{name}", name, app.git_blob_sha(raw), len(raw)) for name, raw in blobs.items()]
+
+    frames, errors = app.fetch_excel_files_parallel(files, read_kwargs={"header": None}, storage=storage)
+
+    assert not errors
+    for name, raw in blobs.items():
+        pd.testing.assert_frame_equal(frames[name], workers.read_table_bytes(raw, name, {"header": None}))
+
+
+def test_pool_workers_do_not_run_main_script(tmp_path, monkeypatch):
+    """Di bawah `streamlit run` __main__ = skrip aplikasi; worker tidak boleh menjalankannya."""
+    marker = tmp_path / "script-ran"
+    script = tmp_path / "streamlit_script.py"
+    script.write_text(f"open({str(marker)!r}, 'a').write('x')\n")
+    main = types.ModuleType("__main__")
+    main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, "__main__", main)
+
+    raw = to_xlsx_buffer(synthetic_ikpa_satker_sheet(10)).getvalue()
+    ctx = workers.parse_pool_context(app.PARSE_POOL_CONTEXT)
+    with ProcessPoolExecutor(max_workers=2, mp_context=ctx) as pool:
+        df = pool.submit(workers.read_table_bytes, raw, "a.xlsx", {"header": None}).result()
+
+    assert sys.modules["__main__"] is main
+    assert not marker.exists()
+    pd.testing.assert_frame_equal(df, workers.read_table_bytes(raw, "a.xlsx", {"header": None}))
+
+
+@pytest.mark.parametrize("path", repo_workbooks("DATA_DIPA"), ids=lambda p: p.name)
+def test_dipa_fingerprint_detects_repo_workbooks(path):
+    grid = app.read_excel_grid(io.BytesIO(path.read_bytes()))
+    key, header_row = app.detect_dipa_format(grid)
+
+    assert key in app.DIPA_FORMATS
+    assert not app.DIPA_FORMATS[key].parser(grid, header_row).empty
+
+
+@pytest.mark.skipif(not workers.CALAMINE_AVAILABLE, reason="python-calamine tidak terpasang")
+@pytest.mark.parametrize("path", repo_workbooks("templates", *UPLOAD_FOLDERS), ids=lambda p: f"{p.parent.name}/{p.name}")
+def test_calamine_matches_openpyxl(path):
+    content = path.read_bytes()
+    frames = {
+        engine: pd.read_excel(io.BytesIO(content), engine=engine, sheet_name=None, header=None)
+        for engine in ("openpyxl", "calamine")
+    }
+
+    assert frames["openpyxl"].keys() == frames["calamine"].keys()
+    for sheet, df in frames["openpyxl"].items():
+        pd.testing.assert_frame_equal(frames["calamine"][sheet], df, check_exact=True)